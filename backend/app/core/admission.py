@@ -0,0 +1,215 @@
+"""
+Admission control for the GHN backend application.
+Limits concurrent requests per route class and sheds the excess with 503s.
+
+Each route class gets a concurrency limit that adapts to observed latency,
+so when the backend slows down fewer requests are let in and queueing
+happens at the client instead of inside the process. The health class
+uses a fixed, separate lane so orchestrator probes and scrapes are never
+shed because the API is saturated.
+"""
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.logging import logger
+
+class GradientLimit:
+    """
+    Latency-gradient concurrency limit.
+
+    Compares each request's latency with a slowly moving baseline. While
+    they match the limit grows by about sqrt(limit) (additive increase);
+    once latency rises past ``tolerance`` times the baseline the limit is
+    scaled down by the ratio, at most halving per sample (multiplicative
+    decrease). The limit only grows while it is actually being used.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        baseline_window: int = 500,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self._baseline_alpha = 2 / (baseline_window + 1)
+        self.baseline: Optional[float] = None
+        self._limit = float(initial)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_sample(self, latency: float, inflight: int) -> None:
+        if latency <= 0:
+            return
+        if self.baseline is None:
+            self.baseline = latency
+        else:
+            self.baseline += self._baseline_alpha * (latency - self.baseline)
+            # Let the baseline recover quickly after a slow period ends
+            if self.baseline > 2 * latency:
+                self.baseline *= 0.95
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / latency))
+        if gradient == 1.0 and inflight < self._limit / 2:
+            return
+        target = self._limit * gradient + math.sqrt(self._limit)
+        smoothing = self.smoothing
+        new_limit = self._limit * (1 - smoothing) + target * smoothing
+        self._limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+class FixedLimit:
+    """Concurrency limit that does not adapt."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def on_sample(self, latency: float, inflight: int) -> None:
+        pass
+
+@dataclass
+class LaneStats:
+    """Counters for one admission lane."""
+    admitted: int = 0
+    shed: int = 0
+
+class Lane:
+    """Requests of one route class, admitted while under its limit."""
+
+    def __init__(self, name: str, limit):
+        self.name = name
+        self.limiter = limit
+        self.inflight = 0
+        self.stats = LaneStats()
+
+    @property
+    def limit(self) -> int:
+        return self.limiter.limit
+
+    def try_acquire(self) -> bool:
+        if self.inflight >= self.limiter.limit:
+            self.stats.shed += 1
+            return False
+        self.inflight += 1
+        self.stats.admitted += 1
+        return True
+
+    def release(self, latency: Optional[float]) -> None:
+        """Return the slot; latency is None for requests that failed."""
+        if latency is not None:
+            self.limiter.on_sample(latency, self.inflight)
+        self.inflight -= 1
+
+class AdmissionController:
+    """Lanes for every route class, with fixed limits for the reserved ones."""
+
+    def __init__(
+        self,
+        route_classes: Iterable[str],
+        reserved: Iterable[str],
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        reserved_limit: int,
+    ):
+        reserved = set(reserved)
+        self.lanes: Dict[str, Lane] = {}
+        for name in route_classes:
+            if name in reserved:
+                limiter = FixedLimit(reserved_limit)
+            else:
+                limiter = GradientLimit(initial_limit, min_limit, max_limit)
+            self.lanes[name] = Lane(name, limiter)
+
+    def lane(self, route_class: str) -> Lane:
+        return self.lanes[route_class]
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    from app.config import get_settings
+    from app.core.monitoring import ROUTE_CLASSES
+
+    settings = get_settings()
+    return AdmissionController(
+        ROUTE_CLASSES,
+        reserved=("health",),
+        initial_limit=settings.admission_initial_limit,
+        min_limit=settings.admission_min_limit,
+        max_limit=settings.admission_max_limit,
+        reserved_limit=settings.admission_reserved_limit,
+    )
+
+_SHED_BODY = b'{"detail":"Server busy, retry shortly"}'
+
+# Key in the request state (scope["state"]) marking a request whose
+# duration says nothing about backend health, e.g. a streamed upload
+_UNSAMPLED = "admission_unsampled"
+
+def skip_latency_sample(scope: Scope) -> None:
+    """Still count the request against its lane, but not its latency."""
+    scope.setdefault("state", {})[_UNSAMPLED] = True
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware that sheds requests over their lane's limit.
+
+    Shed requests get an immediate 503 with Retry-After and never reach the
+    application. Admitted requests report their latency back to the lane's
+    limit when the response has been sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        classify: Callable[[str], str],
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.controller = controller
+        self.classify = classify
+        self.shed_headers = (
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(_SHED_BODY)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.controller.lane(self.classify(scope["path"]))
+        if not lane.try_acquire():
+            logger.debug(
+                "Shed %s %s (%s lane at %d)",
+                scope["method"], scope["path"], lane.name, lane.limit,
+            )
+            # A fresh list: outer middleware may append to it
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": list(self.shed_headers),
+            })
+            await send({"type": "http.response.body", "body": _SHED_BODY})
+            return
+
+        start = time.perf_counter()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            if not scope.get("state", {}).get(_UNSAMPLED):
+                latency = time.perf_counter() - start
+        finally:
+            lane.release(latency)
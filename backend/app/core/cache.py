@@ -0,0 +1,167 @@
+"""
+Async caching utilities for the GHN backend application.
+Provides a per-key TTL cache with single-flight refresh and stale-while-revalidate.
+"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.logging import logger
+
+Loader = Callable[[], Awaitable[Any]]
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache is being used."""
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+class AsyncTTLCache:
+    """
+    Async cache with per-key TTL and single-flight loading.
+
+    - Concurrent misses for the same key share one in-flight load; everyone
+      else awaits its result instead of recomputing.
+    - For ``stale_ttl`` seconds after expiry, the previous value is served
+      immediately while a single background load refreshes it.
+    - Expiry uses a monotonic clock, so wall-clock jumps do not affect it.
+
+    Usage:
+        cache = AsyncTTLCache("health", ttl=30, stale_ttl=30)
+        value = await cache.get_or_load("key", load_value)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Loader,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for key, loading it with loader if needed."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = self._clock()
+            if now < entry.fresh_until:
+                self.stats.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self.stats.stale_hits += 1
+                self._start_load(key, loader, ttl, stale_ttl)
+                return entry.value
+
+        self.stats.misses += 1
+        # Shield the shared load so one cancelled caller does not cancel it
+        # for everyone else waiting on the same key.
+        return await asyncio.shield(self._start_load(key, loader, ttl, stale_ttl))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh or stale cached value without loading."""
+        entry = self._entries.get(key)
+        if entry is None or self._clock() >= entry.stale_until:
+            return None
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> None:
+        """Store a value for key."""
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        fresh_until = self._clock() + ttl
+        self._entries.pop(key, None)
+        self._entries[key] = _Entry(value, fresh_until, fresh_until + stale_ttl)
+        while len(self._entries) > self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest write.
+            self._entries.pop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the cached value for key."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        self._entries.clear()
+
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Loader,
+        ttl: Optional[float],
+        stale_ttl: Optional[float],
+    ) -> asyncio.Future:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return inflight
+
+        inflight = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+        self._inflight[key] = inflight
+
+        def _done(future: asyncio.Future) -> None:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            # Background refreshes may have no awaiting caller; retrieve the
+            # exception so it is not reported as never retrieved.
+            if not future.cancelled():
+                future.exception()
+
+        inflight.add_done_callback(_done)
+        return inflight
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Loader,
+        ttl: Optional[float],
+        stale_ttl: Optional[float],
+    ) -> Any:
+        self.stats.loads += 1
+        try:
+            value = await loader()
+        except Exception as e:
+            self.stats.load_errors += 1
+            logger.error(f"Error loading {self.name!r} cache key {key!r}: {e}")
+            raise
+        self.set(key, value, ttl, stale_ttl)
+        return value
@@ -0,0 +1,185 @@
+"""
+Error report rate limiting for the GHN backend application.
+Deduplicates repeated exceptions by fingerprint so an outage does not flood logs or Sentry.
+
+An exception's fingerprint is its type plus the code locations in its
+traceback, not its message, so the same failure with different ids or
+values in the message still counts as one. The first ``limit`` occurrences
+of a fingerprint in each window are reported in full. Later ones are only
+counted, and the count is attached to the first report of the next window.
+
+This module only imports the standard library; sentry_sdk is imported by
+recording_transport() when it is called.
+"""
+import hashlib
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+def exception_fingerprint(exc: BaseException) -> str:
+    """
+    Stable id for an exception: its type and the frames it was raised through.
+
+    The traceback grows as the exception propagates, so the fingerprint is
+    computed where the exception is first reported and kept on it; every
+    later reporter uses the same one.
+    """
+    fingerprint = getattr(exc, "__ghn_fingerprint__", None)
+    if fingerprint is not None:
+        return fingerprint
+    parts = [f"{type(exc).__module__}.{type(exc).__qualname__}"]
+    for frame, lineno in traceback.walk_tb(exc.__traceback__):
+        parts.append(f"{frame.f_code.co_filename}:{frame.f_code.co_name}:{lineno}")
+    fingerprint = hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+    try:
+        exc.__ghn_fingerprint__ = fingerprint  # type: ignore[attr-defined]
+    except AttributeError:
+        pass
+    return fingerprint
+
+def event_fingerprint(event: Dict[str, Any], hint: Dict[str, Any]) -> str:
+    """Fingerprint for a Sentry event, from its exception or its log message template."""
+    exc_info = hint.get("exc_info")
+    if exc_info and exc_info[1] is not None:
+        return exception_fingerprint(exc_info[1])
+    logentry = event.get("logentry") or {}
+    parts = [event.get("logger") or "", logentry.get("message") or event.get("message") or ""]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+def first_report(exc: BaseException, sink: str) -> bool:
+    """
+    True the first time an exception object is seen by ``sink``.
+
+    An exception re-raised through capture_error() and then the monitoring
+    middleware would otherwise be reported twice.
+    """
+    seen = getattr(exc, "__ghn_reported__", None)
+    if seen is None:
+        seen = set()
+        try:
+            exc.__ghn_reported__ = seen  # type: ignore[attr-defined]
+        except AttributeError:
+            # Exceptions without a __dict__ can't be marked; report them
+            return True
+    if sink in seen:
+        return False
+    seen.add(sink)
+    return True
+
+@dataclass
+class ErrorReportStats:
+    """Counters for one rate-limited sink."""
+    reported: int = 0
+    suppressed: int = 0
+    fingerprints: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class _Window:
+    __slots__ = ("started", "count", "suppressed")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.count = 0
+        self.suppressed = 0
+
+class ErrorRateLimiter:
+    """
+    Allows ``limit`` reports per fingerprint per ``window`` seconds.
+
+    Tracks at most ``max_fingerprints`` fingerprints, forgetting the least
+    recently seen. Safe to call from any thread.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        max_fingerprints: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.clock = clock
+        self.stats = ErrorReportStats()
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, fingerprint: str) -> Tuple[bool, int]:
+        """
+        Whether to report this occurrence, and how many occurrences of the
+        same fingerprint were suppressed in its previous window. The count
+        is only returned once, with the first report of a new window.
+        """
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(fingerprint)
+            carried = 0
+            if window is None or now - window.started >= self.window:
+                carried = window.suppressed if window is not None else 0
+                window = self._windows[fingerprint] = _Window(now)
+                if len(self._windows) > self.max_fingerprints:
+                    self._windows.popitem(last=False)
+            self._windows.move_to_end(fingerprint)
+            self.stats.fingerprints = len(self._windows)
+
+            if window.count < self.limit:
+                window.count += 1
+                self.stats.reported += 1
+                return True, carried
+            window.suppressed += 1
+            self.stats.suppressed += 1
+            return False, 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+            self.stats.fingerprints = 0
+
+@lru_cache()
+def get_error_limiter(sink: str) -> ErrorRateLimiter:
+    """The shared limiter for a sink: "log" or "sentry"."""
+    from app.config import get_settings
+    settings = get_settings()
+    return ErrorRateLimiter(settings.error_report_limit, settings.error_report_window)
+
+def recording_transport():
+    """
+    A Sentry transport that keeps everything in memory instead of sending it.
+
+    Pass it to setup_sentry(transport=...) to exercise the reporting path
+    locally; captured events are in ``.events`` and envelopes (transactions,
+    sessions) in ``.envelopes``.
+    """
+    from sentry_sdk.transport import Transport
+
+    class RecordingTransport(Transport):
+        def __init__(self):
+            super().__init__()
+            self.events: list = []
+            self.envelopes: list = []
+
+        def capture_event(self, event: Dict[str, Any]) -> None:
+            self.events.append(event)
+
+        def capture_envelope(self, envelope: Any) -> None:
+            self.envelopes.append(envelope)
+            event: Optional[Dict[str, Any]] = envelope.get_event()
+            if event is not None:
+                self.events.append(event)
+
+        def flush(self, timeout: float, callback: Any = None) -> None:
+            pass
+
+        def kill(self) -> None:
+            pass
+
+    return RecordingTransport()
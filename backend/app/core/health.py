@@ -3,22 +3,28 @@ Health check system for the GHN backend application.
 Provides comprehensive system health monitoring with caching and failure tolerance.
 """
 import asyncio
+import concurrent.futures
+import os
+import shutil
 import time
-import psutil
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
-from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional
 import logging
 
 from fastapi import Request, HTTPException
 from pydantic import BaseModel
 
-from app.config import get_settings
-from app.core.logging import logger, capture_error
+from app.config import get_settings, LOGS_DIR, LOG_FILE
+from app.core.cache import AsyncTTLCache
+from app.core.logging import logger, capture_error, sentry_enabled
+from app.core.responses import FastJSONResponse, model_response
 
 # Constants
 CACHE_TTL = 30  # seconds
 COMPONENT_TIMEOUT = 5  # seconds
+HEALTH_DEADLINE = 6  # seconds, for all component checks together
+DISK_FREE_WARN_PERCENT = 10
 
 class ComponentStatus(BaseModel):
     """Status information for a single system component."""
@@ -40,26 +46,127 @@ class HealthStatus(BaseModel):
 # Track application start time
 START_TIME = time.time()
 
-@lru_cache(maxsize=1)
-def get_cached_health(ttl_hash: int) -> HealthStatus:
-    """Get cached health status. TTL hash changes every CACHE_TTL seconds."""
-    return _get_health()
+# Health results are served stale for up to another CACHE_TTL while a single
+# background refresh runs, so callers never wait on an expired entry.
+health_cache = AsyncTTLCache("health", ttl=CACHE_TTL, stale_ttl=CACHE_TTL)
 
-async def check_component(name: str, check_func: callable) -> ComponentStatus:
+async def get_cached_health() -> HealthStatus:
+    """Get cached health status, refreshing it at most once per CACHE_TTL."""
+    return await health_cache.get_or_load("health", _get_health)
+
+class CircuitBreaker:
+    """
+    Stops calling a failing component check until a cool-down has passed.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    checks are skipped for ``reset_timeout`` seconds. The next check after
+    that is a trial: success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+@dataclass
+class ComponentCheck:
+    """A registered component check and its per-check state."""
+    name: str
+    func: Callable[[], Any]
+    timeout: float = COMPONENT_TIMEOUT
+    cache_ttl: float = 0.0
+    critical: bool = True
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    last_status: Optional[ComponentStatus] = None
+    last_run: float = 0.0
+    in_flight: Optional[concurrent.futures.Future] = None
+
+# Registry of component checks run by _get_health
+COMPONENT_CHECKS: Dict[str, ComponentCheck] = {}
+
+# Sync checks run on their own small pool so a hung dependency can only ever
+# occupy these threads, never the default executor used elsewhere.
+_check_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="health-check"
+)
+
+def register_component(
+    name: str,
+    timeout: float = COMPONENT_TIMEOUT,
+    cache_ttl: float = 0.0,
+    critical: bool = True,
+    failure_threshold: int = 3,
+    reset_timeout: float = 30.0,
+) -> Callable:
+    """
+    Decorator to register a component check.
+
+    The check may be sync or async and returns a dict of details. A
+    ``"status"`` key in the returned dict overrides the default "healthy".
+    Failures of non-critical components degrade the overall status instead
+    of marking it unhealthy.
+
+    Usage:
+        @register_component("database", timeout=2, cache_ttl=10)
+        async def check_database():
+            ...
+    """
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        COMPONENT_CHECKS[name] = ComponentCheck(
+            name=name,
+            func=func,
+            timeout=timeout,
+            cache_ttl=cache_ttl,
+            critical=critical,
+            breaker=CircuitBreaker(failure_threshold, reset_timeout),
+        )
+        return func
+    return decorator
+
+async def check_component(
+    name: str, check_func: callable, timeout: float = COMPONENT_TIMEOUT
+) -> ComponentStatus:
     """Run a component check with timeout."""
     start_time = time.time()
     try:
         # Run the check with timeout
         if asyncio.iscoroutinefunction(check_func):
-            result = await asyncio.wait_for(check_func(), timeout=COMPONENT_TIMEOUT)
+            result = await asyncio.wait_for(check_func(), timeout=timeout)
         else:
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, check_func
+            result = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(_check_executor, check_func),
+                timeout=timeout
             )
         
+        status = "healthy"
+        if isinstance(result, dict) and "status" in result:
+            result = dict(result)
+            status = result.pop("status")
+        
         latency = (time.time() - start_time) * 1000
         return ComponentStatus(
-            status="healthy",
+            status=status,
             latency_ms=latency,
             last_checked=datetime.now(timezone.utc),
             details=result
@@ -67,7 +174,7 @@ async def check_component(name: str, check_func: callable) -> ComponentStatus:
     except asyncio.TimeoutError:
         return ComponentStatus(
             status="unhealthy",
-            latency_ms=COMPONENT_TIMEOUT * 1000,
+            latency_ms=timeout * 1000,
             last_checked=datetime.now(timezone.utc),
             error="Component check timed out"
         )
@@ -80,49 +187,181 @@ async def check_component(name: str, check_func: callable) -> ComponentStatus:
             error=str(e)
         )
 
+async def run_component_check(
+    check: ComponentCheck, deadline: float = HEALTH_DEADLINE
+) -> ComponentStatus:
+    """Run a registered check, honouring its cache period and circuit breaker."""
+    now = time.monotonic()
+    if check.last_status is not None and now - check.last_run < check.cache_ttl:
+        return check.last_status
+    
+    if not check.breaker.allow():
+        return ComponentStatus(
+            status="unhealthy",
+            latency_ms=0,
+            last_checked=datetime.now(timezone.utc),
+            error="Circuit open; check skipped"
+        )
+    
+    func = check.func
+    if not asyncio.iscoroutinefunction(func):
+        # A timed-out sync check keeps running in its thread. Don't start
+        # another one until it returns, so hung calls can't pile up.
+        if check.in_flight is not None and not check.in_flight.done():
+            status = ComponentStatus(
+                status="unhealthy",
+                latency_ms=0,
+                last_checked=datetime.now(timezone.utc),
+                error="Previous check still running"
+            )
+            check.breaker.record_failure()
+            return status
+        
+        async def func():
+            check.in_flight = _check_executor.submit(check.func)
+            return await asyncio.wrap_future(check.in_flight)
+    
+    status = await check_component(check.name, func, timeout=min(check.timeout, deadline))
+    if status.status == "unhealthy":
+        check.breaker.record_failure()
+    else:
+        check.breaker.record_success()
+    
+    check.last_status = status
+    check.last_run = time.monotonic()
+    return status
+
+class ResourceSampler:
+    """
+    Samples CPU, memory and disk usage in the background.
+
+    The psutil calls run in a worker thread on the sampler's own interval and
+    the result replaces a shared snapshot, so readers only ever touch memory.
+    CPU usage is measured between consecutive samples instead of blocking on
+    ``psutil.cpu_percent(interval=1)``.
+    """
+
+    def __init__(self, interval: float, disk_path: str = "/"):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._snapshot: Dict[str, Any] = {}
+        self._sampled_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def sample(self) -> Dict[str, Any]:
+        """Collect a fresh resource snapshot. Blocking; run off the event loop."""
+        import psutil
+
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_total": memory.total,
+            "memory_available": memory.available,
+            "memory_percent": memory.percent,
+            "disk_total": disk.total,
+            "disk_free": disk.free,
+            "disk_percent": disk.percent,
+        }
+
+    @property
+    def snapshot(self) -> Dict[str, Any]:
+        """The most recent snapshot, or an empty dict before the first sample."""
+        return self._snapshot
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the last successful sample."""
+        if self._sampled_at is None:
+            return None
+        return time.monotonic() - self._sampled_at
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener with every new snapshot, e.g. to update metrics."""
+        self._listeners.append(listener)
+
+    def _store(self, snapshot: Dict[str, Any]) -> None:
+        self._snapshot = snapshot
+        self._sampled_at = time.monotonic()
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Error in resource sample listener: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self._store(await loop.run_in_executor(None, self.sample))
+            except Exception as e:
+                logger.error(f"Error sampling system resources: {e}")
+
+    def start(self) -> None:
+        """Take an initial sample and schedule periodic refreshes."""
+        if self.running:
+            return
+        # The first cpu_percent(interval=None) call only primes psutil's
+        # counters; it does not block.
+        try:
+            self._store(self.sample())
+        except Exception as e:
+            logger.error(f"Error sampling system resources: {e}")
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+resource_sampler = ResourceSampler(interval=get_settings().health_sample_interval)
+
 def check_system_resources() -> Dict[str, Any]:
-    """Check system resource usage."""
-    memory = psutil.virtual_memory()
+    """Return system resource usage from the background sampler's snapshot."""
+    snapshot = resource_sampler.snapshot
+    if not snapshot:
+        raise RuntimeError("System resources have not been sampled yet")
     return {
-        "memory_used_percent": memory.percent,
-        "cpu_percent": psutil.cpu_percent(interval=1),
-        "disk_usage_percent": psutil.disk_usage("/").percent
+        "memory_used_percent": snapshot["memory_percent"],
+        "cpu_percent": snapshot["cpu_percent"],
+        "disk_usage_percent": snapshot["disk_percent"],
+        "sample_age_seconds": round(resource_sampler.age_seconds or 0.0, 3),
     }
 
-def _get_health() -> HealthStatus:
+async def _get_health() -> HealthStatus:
     """Generate complete health status."""
     settings = get_settings()
     
-    # Get system resources
-    try:
-        resources = check_system_resources()
-        system_status = ComponentStatus(
-            status="healthy",
-            latency_ms=0,
-            last_checked=datetime.now(timezone.utc),
-            details=resources
-        )
-    except Exception as e:
-        logger.error(f"Error checking system resources: {e}")
-        system_status = ComponentStatus(
-            status="degraded",
-            latency_ms=0,
-            last_checked=datetime.now(timezone.utc),
-            error=str(e)
-        )
+    # Run all registered checks concurrently. Each is capped at the overall
+    # deadline, so total latency is bounded by the slowest check.
+    checks = list(COMPONENT_CHECKS.values())
+    statuses = await asyncio.gather(
+        *(run_component_check(check, HEALTH_DEADLINE) for check in checks)
+    )
     
     # Compile all component statuses
-    components = {
-        "system": system_status
-    }
+    components = {check.name: status for check, status in zip(checks, statuses)}
     
-    # Determine overall status
-    if any(c.status == "unhealthy" for c in components.values()):
-        overall_status = "unhealthy"
-    elif any(c.status == "degraded" for c in components.values()):
-        overall_status = "degraded"
-    else:
-        overall_status = "healthy"
+    # Determine overall status; non-critical failures only degrade it
+    overall_status = "healthy"
+    for check, status in zip(checks, statuses):
+        if status.status == "unhealthy" and check.critical:
+            overall_status = "unhealthy"
+            break
+        if status.status != "healthy":
+            overall_status = "degraded"
     
     return HealthStatus(
         status=overall_status,
@@ -133,8 +372,48 @@ def _get_health() -> HealthStatus:
         components=components
     )
 
+# Built-in component checks
+
+@register_component("system", critical=False)
+async def check_system() -> Dict[str, Any]:
+    """System resources from the background sampler."""
+    return check_system_resources()
+
+@register_component("disk", timeout=2, cache_ttl=60, critical=False)
+def check_disk() -> Dict[str, Any]:
+    """Free space on the volume holding the log directory."""
+    usage = shutil.disk_usage(LOGS_DIR)
+    free_percent = usage.free / usage.total * 100
+    return {
+        "status": "degraded" if free_percent < DISK_FREE_WARN_PERCENT else "healthy",
+        "path": str(LOGS_DIR.resolve()),
+        "free_percent": round(free_percent, 2),
+    }
+
+@register_component("log_file", timeout=2, cache_ttl=60, critical=False)
+def check_log_file() -> Dict[str, Any]:
+    """Whether the application log file can be written."""
+    target = LOG_FILE if LOG_FILE.exists() else LOG_FILE.parent
+    if not os.access(target, os.W_OK):
+        raise PermissionError(f"{target} is not writable")
+    return {"path": str(LOG_FILE)}
+
+@register_component("cache", critical=False)
+async def check_cache() -> Dict[str, Any]:
+    """Health result cache counters."""
+    return {"entries": len(health_cache), **health_cache.stats.as_dict()}
+
+@register_component("sentry", critical=False)
+async def check_sentry() -> Dict[str, Any]:
+    """Sentry client configuration. Does not contact the Sentry server."""
+    enabled = sentry_enabled()
+    return {
+        "status": "healthy" if enabled or not get_settings().sentry_dsn else "degraded",
+        "enabled": enabled,
+    }
+
 @capture_error
-async def get_health_status(request: Request) -> Dict[str, Any]:
+async def get_health_status(request: Request) -> FastJSONResponse:
     """
     Get system health status with caching.
     
@@ -146,13 +425,14 @@ async def get_health_status(request: Request) -> Dict[str, Any]:
     - System resource usage
     
     The health check is cached for CACHE_TTL seconds to prevent
-    excessive resource usage from frequent monitoring calls.
+    excessive resource usage from frequent monitoring calls. Concurrent
+    callers share a single refresh when the cached value expires.
     """
-    # Simple time-based cache key
-    cache_key = int(time.time() / CACHE_TTL)
-    
     # Get cached or fresh health status
-    health = get_cached_health(cache_key)
+    health = await get_cached_health()
     
-    # Convert to dict for response
-    return health.model_dump()
+    # Already validated; serialize it directly instead of dumping to a dict
+    # for response_model to validate again. Unhealthy (a critical component
+    # failed) is a 503 so load balancers can act on the status code alone.
+    status_code = 503 if health.status == "unhealthy" else 200
+    return model_response(health, status_code=status_code)
@@ -0,0 +1,223 @@
+"""
+HTTP caching for the GHN backend application.
+Adds strong ETags, Cache-Control and 304 responses for routes declared cacheable.
+
+Routes opt in with the ``@cacheable`` decorator. For those,
+HTTPCacheMiddleware buffers the 200 response, tags it with an ETag derived
+from the body (or the one the route set), answers a matching
+``If-None-Match`` with an empty 304, and, when ``max_age`` is positive,
+keeps the response for that long so repeat requests skip the route
+entirely. Cacheable routes must not depend on who is asking: cached
+responses are shared between clients.
+
+The OpenAPI document is static for the life of the process, so
+PrecomputedOpenAPI renders it to bytes once at startup and serves those in
+place of FastAPI's handler, which re-serializes it on every request.
+"""
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import AsyncTTLCache
+from app.core.responses import dumps
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+Headers = List[Tuple[bytes, bytes]]
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long clients and the server may reuse a route's response."""
+    max_age: int = 0
+    public: bool = True
+
+    @property
+    def cache_control(self) -> bytes:
+        if self.max_age <= 0:
+            # Reusable, but only after revalidating with If-None-Match
+            return b"no-cache"
+        scope = "public" if self.public else "private"
+        return f"{scope}, max-age={self.max_age}".encode()
+
+def cacheable(max_age: int = 0, public: bool = True) -> Callable:
+    """
+    Mark a GET endpoint's responses as cacheable for ``max_age`` seconds.
+
+    Apply it below the route decorator:
+
+        @router.get("/check")
+        @cacheable(max_age=5)
+        async def health_check(): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        func.__cache_policy__ = CachePolicy(max_age=max_age, public=public)  # type: ignore[attr-defined]
+        return func
+    return decorator
+
+def strong_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if if_none_match.strip() == b"*":
+        return True
+    opaque = etag[2:] if etag.startswith(b"W/") else etag
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+@dataclass
+class CachedResponse:
+    """A buffered 200 response with its validators."""
+    headers: Headers
+    body: bytes
+    etag: bytes
+    policy: CachePolicy
+    route: Any = None  # scope["route"] of the request that filled the entry
+
+@dataclass
+class HTTPCacheStats:
+    """Counters for conditional and server-cached responses."""
+    served_from_cache: int = 0
+    not_modified: int = 0
+    stored: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+# Shared by HTTPCacheMiddleware instances; exported by app.core.monitoring
+response_cache = AsyncTTLCache("http", ttl=0, max_entries=256)
+http_cache_stats = HTTPCacheStats()
+
+class HTTPCacheMiddleware:
+    """
+    Pure ASGI middleware applying the cache policy of ``@cacheable`` routes.
+
+    Only GET requests are considered. Responses of other routes, and non-200
+    responses, pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: AsyncTTLCache = response_cache,
+        stats: HTTPCacheStats = http_cache_stats,
+    ):
+        self.app = app
+        self.cache = cache
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope.get("root_path", ""), scope["path"], scope["query_string"])
+        cached: Optional[CachedResponse] = self.cache.get(key)
+        if cached is not None:
+            self.stats.served_from_cache += 1
+            # Lets the metrics and profiling middleware label the request
+            scope["route"] = cached.route
+            await self._send(scope, send, cached)
+            return
+
+        start: Optional[Message] = None
+        policy: Optional[CachePolicy] = None
+        passthrough = False
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, policy, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                policy = getattr(scope.get("endpoint"), "__cache_policy__", None)
+                if policy is None or message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = [(name, value) for name, value in start["headers"] if name not in (b"etag", b"cache-control")]
+            etag = next((value for name, value in start["headers"] if name == b"etag"), None) or strong_etag(body)
+            entry = CachedResponse(headers, body, etag, policy, scope.get("route"))
+            if policy.max_age > 0:
+                self.cache.set(key, entry, ttl=policy.max_age)
+                self.stats.stored += 1
+            await self._send(scope, send, entry)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send(self, scope: Scope, send: Send, entry: CachedResponse) -> None:
+        validators = [(b"etag", entry.etag), (b"cache-control", entry.policy.cache_control)]
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+            self.stats.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": entry.headers + validators})
+        await send({"type": "http.response.body", "body": entry.body})
+
+class PrecomputedOpenAPI:
+    """
+    Serves the application's OpenAPI document from bytes rendered once.
+
+    install() replaces FastAPI's ``openapi_url`` route; call it after all
+    routers are included. render() builds the document and is called at
+    startup, so no request pays for it.
+    """
+
+    def __init__(self) -> None:
+        self.app: Optional["FastAPI"] = None
+        self.body: Optional[bytes] = None
+        self.etag: Optional[bytes] = None
+
+    def render(self) -> None:
+        app = self.app
+        if app is None:
+            return
+        # FastAPI adds the mount point to the servers on first request
+        root_path = app.root_path.rstrip("/")
+        if root_path and app.root_path_in_servers and root_path not in {s.get("url") for s in app.servers}:
+            app.servers.insert(0, {"url": root_path})
+        self.body = dumps(app.openapi())
+        self.etag = strong_etag(self.body)
+
+    def install(self, app: "FastAPI") -> None:
+        self.app = app
+        url = app.openapi_url
+        if not url:
+            return
+        self.app.router.routes[:] = [
+            route for route in self.app.router.routes if getattr(route, "path", None) != url
+        ]
+
+        @cacheable()
+        async def openapi(request: Request) -> Response:
+            if self.body is None:
+                self.render()
+            return Response(self.body, media_type="application/json", headers={"ETag": self.etag.decode()})
+
+        self.app.add_route(url, openapi, include_in_schema=False)
@@ -0,0 +1,679 @@
+"""
+Log search for the GHN backend application.
+Indexes the rotated log files and searches them by time, level, path, status and text.
+
+The log writer keeps ``ghn.log`` plus up to ``log_backup_count`` rotated
+copies of ``log_max_bytes`` each, so an incident can mean gigabytes to
+grep. Instead, each file gets a sidecar index describing it in blocks of
+about BLOCK_BYTES. Blocks start on a record boundary and note the time
+range, the levels and the response statuses of their records, and their
+request paths, up to PATH_LIMIT of them. A query reads the indexes, skips
+every block that cannot match, and reads the remaining blocks through
+mmap, so only those regions of the files are paged in.
+
+Both log formats are understood: ``log_format`` text, where a record is a
+line starting with a timestamp plus the lines following it (tracebacks),
+and the one-object-per-line output of ``log_json``. Text timestamps are
+local time, as written by logging.Formatter.
+
+Rotation renames files, so sidecars are named after a fingerprint of a
+file's first bytes rather than its name, and kept in ``logs/.index``.
+The active file is only ever appended to; its index is extended from the
+last indexed block whenever it has grown.
+
+Usage (from backend/):
+    python -m app.core.log_search --since 30m --level WARNING
+    python -m app.core.log_search --since "2025-02-08 04:00" --until "2025-02-08 05:00" --path /auth --status 5xx
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # pragma: no cover - stdlib fallback
+    import json
+    _loads = json.loads
+
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+from app.core.logging import logger
+
+INDEX_VERSION = 1
+BLOCK_BYTES = 64 * 1024
+PATH_LIMIT = 32  # distinct paths listed per block; more and the block lists none
+FINGERPRINT_BYTES = 4096
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_LEVEL_INDEX = {name: index for index, name in enumerate(LEVELS)}
+# Records at or above these are listed individually in the index
+NOTABLE_LEVEL = _LEVEL_INDEX["WARNING"]
+NOTABLE_STATUS = 400
+
+# Start of a text record: a line beginning with an asctime-style timestamp
+_RECORD_START = re.compile(rb"^(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)(?:[,.](\d{1,6}))?", re.M)
+_LEVEL = re.compile(rb"\b(DEBUG|INFO|WARNING|ERROR|CRITICAL)\b")
+# The request log line written by RequestMetricsMiddleware
+_COMPLETED = re.compile(rb"Completed [A-Z]+ (\S+) - (\d{3})\b")
+_HEAD_BYTES = 4096  # fields are only looked for in a record's first line, up to this
+
+# One record as scanned: byte range, timestamp, level index, path and status
+_Raw = Tuple[int, int, Optional[float], Optional[int], Optional[str], Optional[int]]
+
+class Block(NamedTuple):
+    """A run of whole records and what they contain."""
+    start: int
+    end: int
+    first: Optional[float]  # earliest and latest record timestamps
+    last: Optional[float]
+    levels: int  # bit i set when a record has level LEVELS[i]
+    statuses: List[int]
+    paths: Optional[List[str]]  # None when there were more than PATH_LIMIT
+    notable: List[int]  # offsets of records at NOTABLE_LEVEL or NOTABLE_STATUS and up
+
+@dataclass
+class FileIndex:
+    """The blocks of one log file, up to ``size`` bytes."""
+    fingerprint: str
+    format: str  # "text" or "json"
+    size: int
+    blocks: List[Block]
+
+    def dumps(self) -> bytes:
+        return _dumps({
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "format": self.format,
+            "size": self.size,
+            "blocks": [list(block) for block in self.blocks],
+        })
+
+    @classmethod
+    def loads(cls, data: bytes) -> Optional["FileIndex"]:
+        try:
+            raw = _loads(data)
+            if raw.get("version") != INDEX_VERSION:
+                return None
+            return cls(raw["fingerprint"], raw["format"], raw["size"], [Block(*row) for row in raw["blocks"]])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+@dataclass
+class LogEntry:
+    """One log record found by a search."""
+    file: str
+    offset: int
+    timestamp: Optional[float]
+    level: Optional[str]
+    path: Optional[str]
+    status: Optional[int]
+    text: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["timestamp"] = format_time(self.timestamp)
+        return data
+
+@dataclass
+class SearchStats:
+    """How much of the logs one search had to read."""
+    files: int = 0
+    blocks: int = 0
+    blocks_scanned: int = 0
+    bytes_scanned: int = 0
+    matches: int = 0
+    elapsed_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class LogQuery:
+    """
+    Filters for a search. Records must match all of the given ones.
+
+    ``level`` is a minimum, ``path`` a prefix, ``statuses`` inclusive
+    ranges and ``contains`` a substring of the record's raw text. Records
+    without a timestamp never match a time filter.
+    """
+    since: Optional[float] = None
+    until: Optional[float] = None
+    level: Optional[int] = None
+    path: Optional[str] = None
+    statuses: List[Tuple[int, int]] = field(default_factory=list)
+    contains: Optional[bytes] = None
+    limit: Optional[int] = None
+
+    def _status_matches(self, status: Optional[int]) -> bool:
+        return status is not None and any(low <= status <= high for low, high in self.statuses)
+
+    @property
+    def only_notable(self) -> bool:
+        """Whether every matching record is one of the blocks' notable records."""
+        return (self.level is not None and self.level >= NOTABLE_LEVEL) or (
+            bool(self.statuses) and all(low >= NOTABLE_STATUS for low, _ in self.statuses)
+        )
+
+    def block_matches(self, block: Block) -> bool:
+        if self.only_notable and not block.notable:
+            return False
+        if self.since is not None or self.until is not None:
+            if block.first is None:
+                return False
+            if self.since is not None and block.last < self.since:
+                return False
+            if self.until is not None and block.first > self.until:
+                return False
+        if self.level is not None and not block.levels >> self.level:
+            return False
+        if self.statuses and not any(self._status_matches(status) for status in block.statuses):
+            return False
+        if self.path is not None and block.paths is not None:
+            return any(path.startswith(self.path) for path in block.paths)
+        return True
+
+    def record_matches(self, raw: _Raw) -> bool:
+        _, _, timestamp, level, path, status = raw
+        if self.since is not None and (timestamp is None or timestamp < self.since):
+            return False
+        if self.until is not None and (timestamp is None or timestamp > self.until):
+            return False
+        if self.level is not None and (level is None or level < self.level):
+            return False
+        if self.statuses and not self._status_matches(status):
+            return False
+        if self.path is not None and (path is None or not path.startswith(self.path)):
+            return False
+        return True
+
+    def needles(self, file_format: str) -> List[Pattern[bytes]]:
+        """
+        Patterns of which every matching record contains at least one, if
+        the filters give any. Searching for them skips over records that
+        cannot match without parsing them. Each starts with a literal, so
+        the regex engine can search for it quickly; an alternation could
+        not.
+        """
+        is_json = file_format == "json"
+        if self.contains is not None:
+            return [re.compile(re.escape(self.contains))]
+        codes = []
+        for low, high in self.statuses:
+            if low == high:
+                codes.append(b"%d" % low)
+            elif low % 100 == 0 and high == low + 99:
+                codes.append(b"%d\\d\\d" % (low // 100))
+        if codes and len(codes) == len(self.statuses):
+            prefix = b'"status_code":' if is_json else b" - "
+            return [re.compile(re.escape(prefix) + code + rb"\b") for code in codes]
+        if self.level is not None and self.level >= _LEVEL_INDEX["WARNING"]:
+            return [
+                re.compile(re.escape(b'"level":"' + name.encode() + b'"' if is_json else name.encode()))
+                for name in LEVELS[self.level:]
+            ]
+        if self.path is not None and self.path.isascii() and not any(c in self.path for c in '"\\'):
+            return [re.compile(re.escape(self.path.encode()))]
+        return []
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """
+    A point in time as epoch seconds: an ISO 8601 date or datetime (local
+    time unless it has an offset), or an age such as ``90s``, ``15m``,
+    ``2h`` or ``1d``.
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value.strip())
+    if match:
+        seconds = float(match.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+        return (time.time() if now is None else now) - seconds
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r}") from None
+
+def parse_statuses(value: str) -> List[Tuple[int, int]]:
+    """Comma-separated status codes and classes, e.g. ``404,5xx``."""
+    ranges = []
+    for part in value.split(","):
+        part = part.strip().lower()
+        if re.fullmatch(r"[1-5]\d\d", part):
+            ranges.append((int(part), int(part)))
+        elif re.fullmatch(r"[1-5]xx", part):
+            ranges.append((int(part[0]) * 100, int(part[0]) * 100 + 99))
+        else:
+            raise ValueError(f"Invalid status: {part!r}")
+    return ranges
+
+def parse_level(value: str) -> int:
+    try:
+        return _LEVEL_INDEX[value.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Invalid level: {value!r}, expected one of {', '.join(LEVELS)}") from None
+
+def format_time(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec="milliseconds")
+
+@lru_cache(maxsize=4096)
+def _text_second(second: bytes) -> float:
+    # Fixed layout, matched by _RECORD_START; strptime is several times slower
+    return datetime(
+        int(second[0:4]), int(second[5:7]), int(second[8:10]),
+        int(second[11:13]), int(second[14:16]), int(second[17:19]),
+    ).timestamp()
+
+def _text_time(second: bytes, fraction: Optional[bytes]) -> float:
+    return _text_second(second) + (int(fraction) / 10 ** len(fraction) if fraction else 0.0)
+
+def _scan_text(mm: mmap.mmap, pos: int, end: int) -> Iterator[_Raw]:
+    starts = _RECORD_START.finditer(mm, pos, end)
+    current = next(starts, None)
+    if pos < end and (current is None or current.start() > pos):
+        # Lines before the first timestamp belong to no record we can date
+        yield (pos, current.start() if current else end, None, None, None, None)
+    while current is not None:
+        following = next(starts, None)
+        start = current.start()
+        record_end = following.start() if following else end
+        timestamp = _text_time(current.group(1), current.group(2))
+
+        head_end = min(record_end, start + _HEAD_BYTES)
+        line_end = mm.find(b"\n", start, head_end)
+        head = mm[current.end():line_end if line_end >= 0 else head_end]
+        level_match = _LEVEL.search(head)
+        level = _LEVEL_INDEX[level_match.group(1).decode()] if level_match else None
+        completed = _COMPLETED.search(head)
+        if completed:
+            path = completed.group(1).decode("utf-8", "replace")
+            status: Optional[int] = int(completed.group(2))
+        else:
+            path = status = None
+        yield (start, record_end, timestamp, level, path, status)
+        current = following
+
+def _scan_json(mm: mmap.mmap, pos: int, end: int) -> Iterator[_Raw]:
+    while pos < end:
+        newline = mm.find(b"\n", pos, end)
+        line_end = end if newline < 0 else newline
+        timestamp = level = path = status = None
+        try:
+            data = _loads(mm[pos:line_end])
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            timestamp = _json_time(data.get("timestamp"))
+            level = _LEVEL_INDEX.get(data.get("level"))
+            path = data.get("path") if isinstance(data.get("path"), str) else None
+            status = data.get("status_code") if isinstance(data.get("status_code"), int) else None
+        yield (pos, line_end, timestamp, level, path, status)
+        pos = line_end + 1
+
+def _json_time(value: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+# Block summaries come from a few scans over the whole block, not from
+# parsing each record. They may include more than the block's records
+# would report (a level named in a message, say), never less, so a block
+# is only skipped when none of its records can match.
+_TEXT_STAMP = re.compile(rb"\n(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)(?:[,.](\d{1,6}))?")
+# JSONFormatter writes the timestamp first, and always in UTC, so
+# timestamps order as strings
+_JSON_STAMP = re.compile(rb'\n\{"timestamp":"(\d{4}-\d\d-\d\dT[^"]*)"')
+_JSON_STATUS = re.compile(rb'"status_code":(\d{3})\b')
+_JSON_PATH = re.compile(rb'"path":("(?:[^"\\]|\\.)*")')
+_LEVEL_WORDS = [(index, name.encode()) for index, name in enumerate(LEVELS)]
+
+Summary = Tuple[Optional[float], Optional[float], int, List[int], Optional[List[str]]]
+
+def _summary(first: Optional[float], last: Optional[float], levels: int, statuses: set, paths: set) -> Summary:
+    return (first, last, levels, sorted(statuses), sorted(paths) if len(paths) <= PATH_LIMIT else None)
+
+def _summarize_text(data: bytes) -> Summary:
+    # The newline lets the first record match like the others
+    stamps = _TEXT_STAMP.findall(b"\n" + data)
+    completed = set(_COMPLETED.findall(data))
+    return _summary(
+        _text_time(*min(stamps)) if stamps else None,
+        _text_time(*max(stamps)) if stamps else None,
+        sum(1 << index for index, word in _LEVEL_WORDS if word in data),
+        {int(status) for _, status in completed},
+        {path.decode("utf-8", "replace") for path, _ in completed},
+    )
+
+def _summarize_json(data: bytes) -> Summary:
+    stamps = _JSON_STAMP.findall(b"\n" + data)
+    paths = set()
+    for raw in set(_JSON_PATH.findall(data)):
+        try:
+            paths.add(_loads(raw))
+        except ValueError:
+            continue
+    return _summary(
+        _json_time(min(stamps).decode()) if stamps else None,
+        _json_time(max(stamps).decode()) if stamps else None,
+        sum(1 << index for index, word in _LEVEL_WORDS if b'"level":"' + word + b'"' in data),
+        {int(status) for status in _JSON_STATUS.findall(data)},
+        paths,
+    )
+
+def _text_record_start(mm: mmap.mmap, pos: int, lower: int) -> int:
+    # Back to the header line of the record that pos falls in
+    while pos > lower:
+        line = max(mm.rfind(b"\n", lower, pos) + 1, lower)
+        if _RECORD_START.match(mm, line):
+            return line
+        pos = line - 1
+    return lower
+
+def _text_next_record(mm: mmap.mmap, pos: int, end: int) -> int:
+    # Line by line: a multiline ^ search tries every byte
+    if pos > 0 and mm[pos - 1] != ord("\n"):
+        pos = mm.find(b"\n", pos, end) + 1 or end
+    while pos < end:
+        if _RECORD_START.match(mm, pos, end):
+            return pos
+        pos = mm.find(b"\n", pos, end) + 1 or end
+    return end
+
+def _json_record_start(mm: mmap.mmap, pos: int, lower: int) -> int:
+    return max(mm.rfind(b"\n", lower, pos) + 1, lower)
+
+def _json_next_record(mm: mmap.mmap, pos: int, end: int) -> int:
+    newline = mm.find(b"\n", pos, end)
+    return end if newline < 0 else newline + 1
+
+class _Format(NamedTuple):
+    scan: Callable[[mmap.mmap, int, int], Iterator[_Raw]]
+    summarize: Callable[[bytes], Summary]
+    record_start: Callable[[mmap.mmap, int, int], int]
+    next_record: Callable[[mmap.mmap, int, int], int]
+
+_FORMATS = {
+    "text": _Format(_scan_text, _summarize_text, _text_record_start, _text_next_record),
+    "json": _Format(_scan_json, _summarize_json, _json_record_start, _json_next_record),
+}
+
+def _is_notable(raw: _Raw) -> bool:
+    level, status = raw[3], raw[5]
+    return (level is not None and level >= NOTABLE_LEVEL) or (status is not None and status >= NOTABLE_STATUS)
+
+def _build_blocks(mm: mmap.mmap, file_format: str, pos: int, end: int) -> List[Block]:
+    fmt = _FORMATS[file_format]
+    # Warnings, errors and failed requests are rare; finding them by their
+    # level or status text avoids parsing every record
+    notable_needles = (
+        LogQuery(level=NOTABLE_LEVEL).needles(file_format)
+        + LogQuery(statuses=[(400, 499), (500, 599)]).needles(file_format)
+    )
+    blocks = []
+    while pos < end:
+        boundary = fmt.next_record(mm, min(pos + BLOCK_BYTES, end), end)
+        notable = [raw[0] for raw in _candidates(mm, fmt, notable_needles, pos, boundary) if _is_notable(raw)]
+        blocks.append(Block(pos, boundary, *fmt.summarize(mm[pos:boundary]), notable))
+        pos = boundary
+    return blocks
+
+def _records_at(
+    mm: mmap.mmap, fmt: _Format, offsets: List[int], end: int, needles: List[Pattern[bytes]]
+) -> Iterator[_Raw]:
+    # The records at the given offsets that contain a needle, if any given
+    for offset in offsets:
+        record_end = fmt.next_record(mm, offset + 1, end)
+        if needles and not any(needle.search(mm, offset, record_end) for needle in needles):
+            continue
+        yield from fmt.scan(mm, offset, record_end)
+
+def _candidates(mm: mmap.mmap, fmt: _Format, needles: List[Pattern[bytes]], start: int, end: int) -> Iterator[_Raw]:
+    # The records containing a match of any needle, in order, each read once
+    matches = [needle.search(mm, start, end) for needle in needles]
+    pos = start
+    while True:
+        for i, match in enumerate(matches):
+            if match is not None and match.start() < pos:
+                matches[i] = needles[i].search(mm, pos, end)
+        found = [match for match in matches if match is not None]
+        if not found:
+            return
+        match = min(found, key=lambda m: m.start())
+        record_end = fmt.next_record(mm, max(match.end(), match.start() + 1), end)
+        yield from fmt.scan(mm, fmt.record_start(mm, match.start(), start), record_end)
+        pos = record_end
+
+class LogSearch:
+    """
+    Searches the log file and its rotated copies, oldest record first.
+
+    Indexes are built or extended on demand and kept in memory between
+    searches. Searches are blocking; run them off the event loop.
+    """
+
+    def __init__(self, log_file: Path, index_dir: Optional[Path] = None):
+        self.log_file = Path(log_file)
+        self.index_dir = Path(index_dir) if index_dir else self.log_file.parent / ".index"
+        self._indexes: Dict[str, FileIndex] = {}
+
+    def files(self) -> List[Path]:
+        """The active log file and its rotated copies, oldest first."""
+        name = re.escape(self.log_file.name)
+        numbered = []
+        for path in self.log_file.parent.glob(self.log_file.name + "*"):
+            match = re.fullmatch(rf"{name}(?:\.(\d+))?", path.name)
+            if match:
+                numbered.append((int(match.group(1) or 0), path))
+        return [path for _, path in sorted(numbered, key=lambda item: -item[0])]
+
+    def _sidecar(self, fingerprint: str) -> Path:
+        return self.index_dir / f"{self.log_file.name}-{fingerprint}.idx"
+
+    def _load(self, fingerprint: str) -> Optional[FileIndex]:
+        index = self._indexes.get(fingerprint)
+        if index is None:
+            try:
+                index = FileIndex.loads(self._sidecar(fingerprint).read_bytes())
+            except OSError:
+                return None
+        return index
+
+    def _save(self, index: FileIndex, persist: bool) -> None:
+        self._indexes[index.fingerprint] = index
+        if not persist:
+            return
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.index_dir, suffix=".tmp", delete=False) as tmp:
+                tmp.write(index.dumps())
+            os.replace(tmp.name, self._sidecar(index.fingerprint))
+        except OSError as e:
+            # Still usable from memory by this process
+            logger.warning(f"Could not write log index {self._sidecar(index.fingerprint)}: {e}")
+
+    def index(self, mm: mmap.mmap) -> FileIndex:
+        """The index of an open log file, built or extended as needed."""
+        fingerprint = hashlib.blake2b(mm[:FINGERPRINT_BYTES], digest_size=16).hexdigest()
+        # Index whole lines only; the writer may be in the middle of one
+        size = mm.rfind(b"\n") + 1
+        index = self._load(fingerprint)
+        if index is not None and index.size == size:
+            self._indexes[fingerprint] = index
+            return index
+
+        if index is not None and index.size < size and index.blocks:
+            # Appended to since: the last block may have been cut short
+            blocks = index.blocks[:-1]
+            start = index.blocks[-1].start
+        else:
+            blocks = []
+            start = 0
+        file_format = index.format if index is not None else ("json" if mm[:1] == b"{" else "text")
+        blocks += _build_blocks(mm, file_format, start, size)
+        index = FileIndex(fingerprint, file_format, size, blocks)
+        # A file shorter than the fingerprint is still changing it; such
+        # an index is cheap to rebuild and only kept in memory
+        self._save(index, persist=len(mm) >= FINGERPRINT_BYTES)
+        return index
+
+    def _prune(self, fingerprints: set) -> None:
+        # Sidecars of files rotated away, and in-memory indexes of files
+        # that have since grown past the fingerprint
+        for fingerprint in set(self._indexes) - fingerprints:
+            del self._indexes[fingerprint]
+        for sidecar in self.index_dir.glob(f"{self.log_file.name}-*.idx"):
+            if sidecar.stem.rsplit("-", 1)[-1] not in fingerprints:
+                sidecar.unlink(missing_ok=True)
+
+    def refresh(self) -> Dict[str, FileIndex]:
+        """Index every log file and delete sidecars of files rotated away."""
+        indexes = {}
+        for path, mm in self._open_files():
+            with mm:
+                indexes[path.name] = self.index(mm)
+        self._prune({index.fingerprint for index in indexes.values()})
+        return indexes
+
+    def _open_files(self) -> Iterator[Tuple[Path, mmap.mmap]]:
+        for path in self.files():
+            try:
+                with open(path, "rb") as f:
+                    yield path, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Rotated away since listed, or empty
+                continue
+
+    def search(self, query: LogQuery, stats: Optional[SearchStats] = None) -> Iterator[LogEntry]:
+        """Matching records, oldest file first, in file order within each."""
+        stats = stats if stats is not None else SearchStats()
+        started = time.perf_counter()
+        fingerprints = set()
+        try:
+            for path, mm in self._open_files():
+                with mm:
+                    stats.files += 1
+                    index = self.index(mm)
+                    fingerprints.add(index.fingerprint)
+                    for entry in self._search_file(path.name, mm, index, query, stats):
+                        yield entry
+                        stats.matches += 1
+                        if query.limit is not None and stats.matches >= query.limit:
+                            return
+            self._prune(fingerprints)
+        finally:
+            stats.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def _search_file(
+        self, name: str, mm: mmap.mmap, index: FileIndex, query: LogQuery, stats: SearchStats
+    ) -> Iterator[LogEntry]:
+        fmt = _FORMATS[index.format]
+        needles = query.needles(index.format)
+        stats.blocks += len(index.blocks)
+        for block in index.blocks:
+            if not query.block_matches(block):
+                continue
+            stats.blocks_scanned += 1
+            if query.only_notable:
+                records = _records_at(mm, fmt, block.notable, block.end, needles)
+            else:
+                stats.bytes_scanned += block.end - block.start
+                if needles:
+                    records = _candidates(mm, fmt, needles, block.start, block.end)
+                else:
+                    records = fmt.scan(mm, block.start, block.end)
+            for raw in records:
+                start, end, timestamp, level, path, status = raw
+                if query.only_notable:
+                    stats.bytes_scanned += end - start
+                if not query.record_matches(raw):
+                    continue
+                if query.contains is not None and mm.find(query.contains, start, end) < 0:
+                    continue
+                yield LogEntry(
+                    file=name,
+                    offset=start,
+                    timestamp=timestamp,
+                    level=LEVELS[level] if level is not None else None,
+                    path=path,
+                    status=status,
+                    text=mm[start:end].rstrip(b"\r\n").decode("utf-8", "replace"),
+                )
+
+@lru_cache()
+def get_log_search() -> LogSearch:
+    from app.config import LOG_FILE
+    return LogSearch(LOG_FILE)
+
+def build_query(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    level: Optional[str] = None,
+    path: Optional[str] = None,
+    status: Optional[str] = None,
+    contains: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> LogQuery:
+    """A LogQuery from user input; raises ValueError for invalid values."""
+    now = time.time()
+    return LogQuery(
+        since=parse_time(since, now) if since else None,
+        until=parse_time(until, now) if until else None,
+        level=parse_level(level) if level else None,
+        path=path or None,
+        statuses=parse_statuses(status) if status else [],
+        contains=contains.encode() if contains else None,
+        limit=limit,
+    )
+
+if __name__ == "__main__":
+    from app.config import LOG_FILE
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--since", help="ISO time, or an age such as 15m, 2h, 1d")
+    parser.add_argument("--until", help="ISO time, or an age such as 15m, 2h, 1d")
+    parser.add_argument("--level", help=f"minimum level, one of {', '.join(LEVELS)}")
+    parser.add_argument("--path", help="request path prefix")
+    parser.add_argument("--status", help="status codes or classes, e.g. 404,5xx")
+    parser.add_argument("--contains", help="text the record must contain")
+    parser.add_argument("--limit", type=int, help="stop after this many records")
+    parser.add_argument("--json", action="store_true", help="print records as JSON lines with their fields")
+    parser.add_argument("--stats", action="store_true", help="print search statistics to stderr")
+    parser.add_argument("--index", action="store_true", help="only build or update the indexes")
+    parser.add_argument("--log-file", default=str(LOG_FILE), help=f"default: {LOG_FILE}")
+    args = parser.parse_args()
+
+    searcher = LogSearch(Path(args.log_file))
+    if args.index:
+        started = time.perf_counter()
+        for name, file_index in searcher.refresh().items():
+            print(f"{name}: {file_index.format}, {file_index.size} bytes, {len(file_index.blocks)} blocks")
+        print(f"Indexed in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+        sys.exit(0)
+
+    try:
+        log_query = build_query(args.since, args.until, args.level, args.path, args.status, args.contains, args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+    search_stats = SearchStats()
+    out = sys.stdout.buffer
+    try:
+        for entry in searcher.search(log_query, search_stats):
+            out.write(_dumps(entry.as_dict()) + b"\n" if args.json else entry.text.encode() + b"\n")
+        out.flush()
+    except BrokenPipeError:
+        # Output piped to head or similar
+        sys.stderr.close()
+        sys.exit(0)
+    if args.stats:
+        print(search_stats.as_dict(), file=sys.stderr)
@@ -2,15 +2,27 @@
 Core logging configuration for the GHN backend application.
 Implements a comprehensive logging system with Sentry integration.
 """
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from functools import wraps
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, TypeVar
 
-import sentry_sdk
-from fastapi import Request
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+from starlette.requests import Request
+
+from app.core.errors import event_fingerprint, exception_fingerprint, first_report, get_error_limiter
 
 # Type variable for decorator
 F = TypeVar("F", bound=Callable[..., Any])
@@ -22,20 +34,327 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def setup_sentry() -> None:
-    """Initialize Sentry SDK with proper configuration and integrations."""
+# Headers never written to logs or sent to Sentry
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-api-key"})
+REDACTED = "[REDACTED]"
+
+# Fields bound to the current request, attached to every record logged in it
+_log_context: ContextVar[Mapping[str, Any]] = ContextVar("log_context", default={})
+
+def bind_log_context(**fields: Any) -> Token:
+    """
+    Add fields to the logging context of the current task.
+
+    The context is copied on write, so records already logged keep the
+    fields they were created with. Returns a token for reset_log_context.
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+def reset_log_context(token: Token) -> None:
+    """Restore the logging context from before the matching bind."""
+    _log_context.reset(token)
+
+def get_log_context() -> Mapping[str, Any]:
+    """Fields currently bound to the logging context."""
+    return _log_context.get()
+
+def filter_headers(
+    headers: Iterable[Tuple[bytes, bytes]],
+    allowlist: Iterable[str],
+) -> Dict[str, str]:
+    """
+    Select allowlisted headers from raw ASGI headers for logging.
+
+    Sensitive headers are redacted even if allowlisted.
+    """
+    allowed = {name.lower() for name in allowlist}
+    selected = {}
+    for raw_name, raw_value in headers:
+        name = raw_name.decode("latin-1").lower()
+        if name in allowed:
+            selected[name] = REDACTED if name in SENSITIVE_HEADERS else raw_value.decode("latin-1")
+    return selected
+
+class ContextFilter(logging.Filter):
+    """Attaches the current logging context to each record when it is created."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "context"}
+
+def _json_default(value: Any) -> str:
+    return str(value)
+
+if orjson is not None:
+    def _dumps(data: Dict[str, Any]) -> str:
+        return orjson.dumps(data, default=_json_default).decode()
+else:  # pragma: no cover - stdlib fallback
+    def _dumps(data: Dict[str, Any]) -> str:
+        return json.dumps(data, default=_json_default, separators=(",", ":"))
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects.
+
+    Output contains the timestamp, level, logger and message, then the bound
+    request context, then any ``extra`` fields passed to the logging call.
+    The message is only built here, when a handler emits the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        context = getattr(record, "context", None)
+        if context:
+            data.update(context)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return _dumps(data)
+
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest")
+
+@dataclass
+class LogQueueStats:
+    """Counters for the queued logging pipeline."""
+    enqueued: int = 0
+    dropped: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller.
+
+    Records are handed to the listener thread unformatted, so message
+    formatting happens off the calling thread. When the queue is full the
+    overflow policy decides what is lost: "drop_new" discards the incoming
+    record, "drop_oldest" discards the oldest queued one to make room.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = "drop_new"):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow_policy}")
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.stats = LogQueueStats()
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record needs no
+        # pickling-safe preparation; leave formatting to the handlers.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy == "drop_oldest":
+                with self._lock:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        self.queue.put_nowait(record)
+                    except queue.Full:
+                        pass
+            self.stats.dropped += 1
+            return
+        self.stats.enqueued += 1
+
+class _DeferredFlushMixin:
+    """Lets the queue listener flush once per batch instead of once per record."""
+    defer_flush = False
+
+    def flush(self) -> None:
+        if not self.defer_flush:
+            super().flush()
+
+    def flush_now(self) -> None:
+        super().flush()
+
+class QueuedRotatingFileHandler(_DeferredFlushMixin, logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler for use behind a BatchingQueueListener."""
+
+class QueuedStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    """StreamHandler for use behind a BatchingQueueListener."""
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that drains records in batches.
+
+    Up to ``batch_size`` queued records are handled together and handlers
+    are flushed once per batch. All handler I/O, including file rotation,
+    happens on the listener thread.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        *handlers: logging.Handler,
+        batch_size: int = 256,
+        stats: Optional[LogQueueStats] = None,
+    ):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.stats = stats or LogQueueStats()
+        for handler in handlers:
+            if isinstance(handler, _DeferredFlushMixin):
+                handler.defer_flush = True
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full; the sentinel must not be dropped.
+        self.queue.put(self._sentinel)
+
+    def _flush(self) -> None:
+        for handler in self.handlers:
+            if isinstance(handler, _DeferredFlushMixin):
+                handler.flush_now()
+            else:
+                handler.flush()
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                log_queue.task_done()
+            self._flush()
+            self.stats.batches += 1
+            if stop:
+                return
+
+_listener: Optional[BatchingQueueListener] = None
+
+def setup_logging() -> None:
+    """
+    Route the application logger through a bounded queue to its handlers.
+
+    The logger only enqueues records; a listener thread formats them and
+    writes the rotating log file and stdout in batches.
+    """
+    global _listener
+    from app.config import get_settings, LOG_FILE
+    settings = get_settings()
+    
+    if _listener is not None:
+        return
+    
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    
+    if settings.log_json:
+        formatter: logging.Formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(settings.log_format)
+    
+    file_handler = QueuedRotatingFileHandler(
+        LOG_FILE,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count
+    )
+    file_handler.setFormatter(formatter)
+    
+    console_handler = QueuedStreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, settings.log_overflow_policy)
+    queue_handler.addFilter(ContextFilter())
+    _listener = BatchingQueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        batch_size=settings.log_batch_size,
+        stats=queue_handler.stats,
+    )
+    
+    logger.handlers.clear()
+    logger.addHandler(queue_handler)
+    logger.setLevel(settings.log_level.upper())
+    # Don't also write synchronously through the root handler
+    logger.propagate = False
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+def get_log_queue_stats() -> Optional[LogQueueStats]:
+    """Counters for the queued pipeline, or None if it is not running."""
+    if _listener is None:
+        return None
+    return _listener.stats
+
+def get_log_queue_depth() -> int:
+    """Number of records waiting for the listener thread."""
+    if _listener is None:
+        return 0
+    return _listener.queue.qsize()
+
+# Set once sentry_sdk has been initialized. sentry_sdk is only imported when
+# a DSN is configured, so runs without Sentry never pay for loading it.
+_sentry_enabled = False
+
+# Set while capture_error() sends an event it has already rate limited, so
+# before_send does not count it a second time
+_sentry_prechecked: ContextVar[bool] = ContextVar("sentry_prechecked", default=False)
+
+def setup_sentry(transport: Any = None) -> None:
+    """
+    Initialize Sentry SDK with proper configuration and integrations.
+
+    ``transport`` replaces the HTTP transport, e.g. with
+    app.core.errors.recording_transport() to keep events in memory. When one
+    is given Sentry is initialized even without a DSN.
+    """
+    global _sentry_enabled
     from app.config import get_settings
     settings = get_settings()
     
-    if not settings.sentry_dsn:
+    if not settings.sentry_dsn and transport is None:
         logger.warning("SENTRY_DSN not found. Sentry integration disabled.")
         return
 
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+
     # Configure Sentry SDK
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
         environment=settings.sentry_environment,
-        traces_sample_rate=settings.sentry_traces_sample_rate,
+        traces_sampler=traces_sampler,
         integrations=[
             FastApiIntegration(),  # Using default configuration
             LoggingIntegration(
@@ -47,25 +366,60 @@ def setup_sentry() -> None:
         attach_stacktrace=True,
         send_default_pii=False,
         max_breadcrumbs=50,
-        debug=True
+        transport=transport
     )
+    _sentry_enabled = True
     logger.info(f"Sentry initialized for environment: {settings.sentry_environment}")
 
+def sentry_enabled() -> bool:
+    """Whether setup_sentry() initialized the Sentry SDK."""
+    return _sentry_enabled
+
+def traces_sampler(sampling_context: Dict[str, Any]) -> float:
+    """
+    Trace sample rate per transaction.
+
+    Follows the upstream service's decision when there is one. Health checks
+    and metrics scrapes are frequent and uninteresting, so they are sampled
+    at a much lower rate than API routes.
+    """
+    from app.config import get_settings
+    from app.core.monitoring import classify_route
+    settings = get_settings()
+    
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        return float(parent_sampled)
+    
+    asgi_scope = sampling_context.get("asgi_scope") or {}
+    if classify_route(asgi_scope.get("path", "")) == "health":
+        return settings.sentry_health_traces_sample_rate
+    return settings.sentry_traces_sample_rate
+
 def before_send(event: dict, hint: dict) -> Optional[dict]:
-    """Process and sanitize the event before sending to Sentry."""
+    """Rate limit, then sanitize the event before sending to Sentry."""
     # Don't send events in test environment
     if os.getenv("TESTING"):
         return None
     
+    if not _sentry_prechecked.get():
+        exc_info = hint.get("exc_info")
+        if exc_info and exc_info[1] is not None and not first_report(exc_info[1], "sentry"):
+            return None
+        report, suppressed = get_error_limiter("sentry").check(event_fingerprint(event, hint))
+        if not report:
+            return None
+        if suppressed:
+            event.setdefault("extra", {})["suppressed_since_last_report"] = suppressed
+    
     try:
         # Sanitize sensitive data
         if "request" in event:
             if "headers" in event["request"]:
                 # Remove sensitive headers
-                sensitive_headers = {"authorization", "cookie", "x-api-key"}
                 event["request"]["headers"] = {
                     k: v for k, v in event["request"]["headers"].items()
-                    if k.lower() not in sensitive_headers
+                    if k.lower() not in SENSITIVE_HEADERS
                 }
         
         # Remove potentially problematic data
@@ -80,10 +434,32 @@ def before_send(event: dict, hint: dict) -> Optional[dict]:
     
     return event
 
+def log_error(exc: BaseException, message: str) -> bool:
+    """
+    Log an exception with its traceback, rate limited per fingerprint.
+
+    Returns whether it was logged. An exception that was already logged is
+    skipped, and the first log line after a suppressed stretch says how many
+    similar errors were skipped.
+    """
+    if not first_report(exc, "log"):
+        return False
+    report, suppressed = get_error_limiter("log").check(exception_fingerprint(exc))
+    if not report:
+        return False
+    if suppressed:
+        message = f"{message} ({suppressed} similar errors suppressed)"
+    logger.error(message, exc_info=exc, extra={"suppressed_errors": suppressed})
+    return True
+
 def capture_error(func: F) -> F:
     """
     Decorator to capture and log errors with additional context.
     
+    Repeats of the same failure are rate limited separately for the log and
+    for Sentry (see app.core.errors), so an error storm costs a counter
+    increment per request instead of a traceback and an event.
+    
     Usage:
         @capture_error
         async def my_endpoint():
@@ -94,21 +470,32 @@ def capture_error(func: F) -> F:
         try:
             return await func(*args, **kwargs)
         except Exception as e:
-            # Extract request object if present
-            request = next((arg for arg in args if isinstance(arg, Request)), None)
+            # Log the error
+            log_error(e, f"Error in {func.__name__}: {str(e)}")
             
-            # Add additional context
-            with sentry_sdk.push_scope() as scope:
-                if request:
-                    scope.set_context("request_info", {
-                        "method": request.method,
-                        "url": str(request.url),
-                        "client_host": request.client.host if request.client else None,
-                    })
-                
-                # Log the error
-                logger.exception(f"Error in {func.__name__}: {str(e)}")
-                sentry_sdk.capture_exception(e)
+            if _sentry_enabled and first_report(e, "sentry"):
+                report, suppressed = get_error_limiter("sentry").check(exception_fingerprint(e))
+                if report:
+                    import sentry_sdk
+                    
+                    # Extract request object if present
+                    request = next((arg for arg in args if isinstance(arg, Request)), None)
+                    
+                    # Add additional context
+                    with sentry_sdk.push_scope() as scope:
+                        if request:
+                            scope.set_context("request_info", {
+                                "method": request.method,
+                                "url": str(request.url),
+                                "client_host": request.client.host if request.client else None,
+                            })
+                        if suppressed:
+                            scope.set_extra("suppressed_since_last_report", suppressed)
+                        token = _sentry_prechecked.set(True)
+                        try:
+                            sentry_sdk.capture_exception(e)
+                        finally:
+                            _sentry_prechecked.reset(token)
             
             # Re-raise the exception
             raise
@@ -117,6 +504,9 @@ def capture_error(func: F) -> F:
 
 def set_user_context(user_id: str, email: Optional[str] = None) -> None:
     """Set user context for Sentry events."""
+    if not _sentry_enabled:
+        return
+    import sentry_sdk
     sentry_sdk.set_user({
         "id": user_id,
         "email": email,
@@ -124,4 +514,7 @@ def set_user_context(user_id: str, email: Optional[str] = None) -> None:
 
 def clear_user_context() -> None:
     """Clear user context from Sentry."""
+    if not _sentry_enabled:
+        return
+    import sentry_sdk
     sentry_sdk.set_user(None)
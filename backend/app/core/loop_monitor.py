@@ -0,0 +1,218 @@
+"""
+Event loop monitoring for the GHN backend application.
+Measures event loop scheduling lag and captures the stacks of callbacks that block it.
+
+A task on the loop sleeps for ``interval`` seconds at a time and records
+how late it woke up. That overshoot is the time other callbacks held the
+loop, so it is the delay every request on this worker saw. A watchdog
+thread checks that the task keeps waking up; when it is overdue by more
+than ``slow_threshold`` the loop is still blocked, and the watchdog
+records the loop thread's stack at that moment, i.e. the blocking code.
+The stack is logged, with the block's duration, once the loop recovers.
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+from app.core.errors import get_error_limiter
+from app.core.health import register_component
+from app.core.logging import logger
+from app.core.quantiles import RollingQuantiles
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+@dataclass
+class LoopLagStats:
+    """Lag samples and slow callbacks seen since startup."""
+    samples: int = 0
+    slow_callbacks: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class SlowCallback:
+    """A stretch of time the loop was blocked, and where it was blocked."""
+    detected_at: float
+    stack: List[str] = field(default_factory=list)
+    duration: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "age_seconds": round(time.time() - self.detected_at, 3),
+            "duration_ms": _ms(self.duration),
+            "stack": self.stack,
+        }
+
+# asyncio's Handle._run dispatches every callback; frames up to it are the
+# event loop itself and are left out of reported stacks
+_HANDLE_RUN = (os.path.join(os.path.dirname(asyncio.__file__), "events.py"), "_run")
+
+def _format_stack(frame: Any, limit: int) -> List[str]:
+    # Innermost ``limit`` frames below the loop's dispatch, outermost first
+    entries = list(reversed(traceback.StackSummary.extract(
+        traceback.walk_stack(frame), limit=limit, lookup_lines=False
+    )))
+    for index, entry in enumerate(entries):
+        if (entry.filename, entry.name) == _HANDLE_RUN:
+            entries = entries[index + 1:]
+            break
+    return [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in entries]
+
+class LoopLagMonitor:
+    """
+    Samples event loop lag and detects callbacks that block the loop.
+
+    Listeners are called on the loop with every lag sample in seconds,
+    e.g. to feed a histogram.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        slow_threshold: float,
+        degraded_lag: float,
+        window_seconds: float = 60.0,
+        stack_limit: int = 30,
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.degraded_lag = degraded_lag
+        self.stack_limit = stack_limit
+        self.stats = LoopLagStats()
+        self.quantiles = RollingQuantiles(window_seconds=window_seconds)
+        self.last_slow_callback: Optional[SlowCallback] = None
+        self._listeners: List[Callable[[float], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        # Set by the watchdog while the loop is blocked, completed by the loop
+        self._stall: Optional[SlowCallback] = None
+        self._stall_heartbeat: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add_listener(self, listener: Callable[[float], None]) -> None:
+        self._listeners.append(listener)
+
+    def _record(self, lag: float) -> None:
+        stats = self.stats
+        stats.samples += 1
+        stats.last_lag = lag
+        stats.max_lag = max(stats.max_lag, lag)
+        if lag >= self.slow_threshold:
+            stats.slow_callbacks += 1
+        self.quantiles.observe("lag", lag)
+        for listener in self._listeners:
+            try:
+                listener(lag)
+            except Exception as e:
+                logger.error(f"Error in loop lag listener: {e}")
+
+        stall = self._stall
+        if stall is not None:
+            self._stall = None
+            stall.duration = lag
+            self._report(stall)
+
+    def _report(self, stall: SlowCallback) -> None:
+        self.last_slow_callback = stall
+        # The same blocking call seen again only counts against the log limit
+        fingerprint = hashlib.blake2b("|".join(stall.stack).encode(), digest_size=8).hexdigest()
+        report, suppressed = get_error_limiter("log").check(f"loop:{fingerprint}")
+        if not report:
+            return
+        note = f" ({suppressed} similar blocks suppressed)" if suppressed else ""
+        logger.warning(
+            f"Event loop blocked for {stall.duration * 1000:.0f}ms{note}:\n  " + "\n  ".join(stall.stack),
+            extra={"loop_blocked_ms": stall.duration * 1000},
+        )
+
+    async def _run(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record(max(0.0, now - start - self.interval))
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.slow_threshold / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.slow_threshold or self._stall_heartbeat == heartbeat:
+                continue
+            # Still blocked: whatever the loop thread is running now is the culprit
+            self._stall_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stall = SlowCallback(time.time(), _format_stack(frame, self.stack_limit))
+
+    def start(self) -> None:
+        """Start sampling on the running loop, and the watchdog thread."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Recent lag quantiles in milliseconds and the last slow callback."""
+        window = self.quantiles.snapshot((0.5, 0.99)).get("lag", {})
+        return {
+            "lag_ms": _ms(self.stats.last_lag),
+            "p50_ms": _ms(window.get("p50")),
+            "p99_ms": _ms(window.get("p99")),
+            "max_ms": _ms(self.stats.max_lag),
+            "slow_callbacks": self.stats.slow_callbacks,
+            "last_slow_callback": self.last_slow_callback.as_dict() if self.last_slow_callback else None,
+        }
+
+_settings = get_settings()
+loop_monitor = LoopLagMonitor(
+    interval=_settings.loop_monitor_interval,
+    slow_threshold=_settings.loop_slow_callback_threshold,
+    degraded_lag=_settings.loop_lag_degraded,
+    window_seconds=_settings.latency_window_seconds,
+)
+
+@register_component("event_loop", critical=False)
+async def check_event_loop() -> Dict[str, Any]:
+    """Event loop lag over the recent window; degraded when p99 lag is high."""
+    if not loop_monitor.running:
+        raise RuntimeError("Event loop monitor is not running")
+    summary = loop_monitor.summary()
+    p99 = summary["p99_ms"]
+    degraded = p99 is not None and p99 > loop_monitor.degraded_lag * 1000
+    return {"status": "degraded" if degraded else "healthy", **summary}
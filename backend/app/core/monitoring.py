@@ -1,13 +1,71 @@
-from fastapi import FastAPI
-from prometheus_client import Counter, Histogram, Info, generate_latest, CONTENT_TYPE_LATEST
-from prometheus_client.multiprocess import MultiProcessCollector
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from app.core.multiprocess import (
+    CollectorMirror,
+    build_registry,
+    cleanup_dead_workers,
+    configure_multiprocess_dir,
+    is_multiprocess,
+)
+
+# Must run before prometheus_client is imported; see app.core.multiprocess
+configure_multiprocess_dir()
+
+from fastapi import FastAPI, Request
+from prometheus_client import Counter, Gauge, Histogram, Info, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.exposition import choose_encoder
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import gzip
+import logging
+import sys
 import time
-from typing import Callable
-import psutil
-import os
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from app.config import get_settings
+from app.core.admission import get_admission_controller
+from app.core.cache import AsyncTTLCache
+from app.core.errors import get_error_limiter
+from app.core.health import resource_sampler
+from app.core.http_cache import http_cache_stats, response_cache
+from app.core.loop_monitor import loop_monitor
+from app.core.logging import (
+    logger,
+    bind_log_context,
+    filter_headers,
+    get_log_queue_depth,
+    get_log_queue_stats,
+    log_error,
+    reset_log_context,
+)
+from app.core.passwords import get_password_hasher
+from app.core.quantiles import RollingQuantiles
+from app.core.routing import RouteTemplates
+from app.core.security import token_verifier
+from app.repositories.users import get_profile_cache, get_user_repository
+
+_settings = get_settings()
+
+# Route classes with their own latency histograms and SLOs
+ROUTE_CLASS_PREFIXES = (
+    ("/auth", "auth"),
+    ("/health", "health"),
+    ("/metrics", "health"),
+)
+ROUTE_CLASSES = ("auth", "health", "other")
+
+def classify_route(path: str) -> str:
+    """Map a request path or route template to its route class."""
+    for prefix, route_class in ROUTE_CLASS_PREFIXES:
+        if path.startswith(prefix):
+            return route_class
+    return "other"
+
+def latency_buckets(name: str) -> Tuple[float, ...]:
+    """Configured histogram buckets, falling back to the client default."""
+    buckets = _settings.metrics_latency_buckets.get(name)
+    return tuple(buckets) if buckets else Histogram.DEFAULT_BUCKETS
 
 # Metrics
 REQUEST_COUNT = Counter(
@@ -19,81 +77,637 @@ REQUEST_COUNT = Counter(
 REQUEST_LATENCY = Histogram(
     'http_request_latency_seconds',
     'HTTP Request Latency',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    buckets=latency_buckets("default")
+)
+
+# One histogram per route class, each with buckets around its SLO
+REQUEST_CLASS_LATENCY = {
+    route_class: Histogram(
+        f'http_{route_class}_request_latency_seconds',
+        f'HTTP Request Latency for {route_class} routes',
+        ['method'],
+        buckets=latency_buckets(route_class)
+    )
+    for route_class in ROUTE_CLASSES
+}
+
+# Live per-endpoint and per-class quantiles, served by /admin/latency
+latency_quantiles = RollingQuantiles(
+    window_seconds=_settings.latency_window_seconds
+)
+
+METRICS_SERIES = Gauge(
+    'http_metrics_series',
+    'Distinct method/endpoint/status label sets in http_request_count',
+    multiprocess_mode='max'
+)
+
+MIDDLEWARE_OVERHEAD = Counter(
+    'http_middleware_overhead_seconds',
+    'Time spent in RequestMetricsMiddleware itself, excluding the wrapped app'
 )
 
 SYSTEM_INFO = Info('system_info', 'System information')
+SYSTEM_INFO.info({'python_version': sys.version})
+
+# System resources, updated by the background resource sampler
+SYSTEM_CPU_PERCENT = Gauge(
+    'system_cpu_percent',
+    'System-wide CPU utilisation',
+    multiprocess_mode='livemax'
+)
+SYSTEM_MEMORY_PERCENT = Gauge(
+    'system_memory_percent',
+    'System memory in use',
+    multiprocess_mode='livemax'
+)
+SYSTEM_MEMORY_AVAILABLE = Gauge(
+    'system_memory_available_bytes',
+    'System memory available',
+    multiprocess_mode='livemax'
+)
+SYSTEM_DISK_PERCENT = Gauge(
+    'system_disk_percent',
+    'Root filesystem space in use',
+    multiprocess_mode='livemax'
+)
+
+def update_system_metrics(snapshot: Dict[str, Any]) -> None:
+    """Copy a resource sampler snapshot into the system gauges."""
+    SYSTEM_CPU_PERCENT.set(snapshot["cpu_percent"])
+    SYSTEM_MEMORY_PERCENT.set(snapshot["memory_percent"])
+    SYSTEM_MEMORY_AVAILABLE.set(snapshot["memory_available"])
+    SYSTEM_DISK_PERCENT.set(snapshot["disk_percent"])
+
+resource_sampler.add_listener(update_system_metrics)
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'How late the event loop ran a timer scheduled on it',
+    buckets=(
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+    )
+)
+EVENT_LOOP_SLOW_CALLBACKS = Counter(
+    'event_loop_slow_callbacks',
+    'Times the event loop was blocked for longer than the slow callback '
+    'threshold'
+)
+
+def observe_loop_lag(lag: float) -> None:
+    EVENT_LOOP_LAG.observe(lag)
+    if lag >= loop_monitor.slow_threshold:
+        EVENT_LOOP_SLOW_CALLBACKS.inc()
+
+loop_monitor.add_listener(observe_loop_lag)
+
+# Collectors of this process's in-memory state; see collector_mirror
+LOCAL_COLLECTORS: List[Any] = []
+
+def register_collector(collector: Any) -> None:
+    REGISTRY.register(collector)
+    LOCAL_COLLECTORS.append(collector)
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        method = request.method
-        path = request.url.path
+class LogPipelineCollector:
+    """Exports the queued logging pipeline's counters at scrape time."""
+
+    def collect(self):
+        stats = get_log_queue_stats()
+        enqueued = stats.enqueued if stats else 0
+        dropped = stats.dropped if stats else 0
+        yield CounterMetricFamily(
+            'log_records_enqueued',
+            'Log records queued for writing',
+            value=enqueued
+        )
+        yield CounterMetricFamily(
+            'log_records_dropped',
+            'Log records dropped because the queue was full',
+            value=dropped
+        )
+        yield GaugeMetricFamily(
+            'log_queue_depth',
+            'Log records waiting to be written',
+            value=get_log_queue_depth()
+        )
+
+register_collector(LogPipelineCollector())
+
+class TokenCacheCollector:
+    """Exports the verified-token cache counters at scrape time."""
+
+    def collect(self):
+        stats = token_verifier.stats
+        yield CounterMetricFamily(
+            'auth_token_cache_hits',
+            'Token verifications served from cache',
+            value=stats.hits
+        )
+        yield CounterMetricFamily(
+            'auth_token_cache_misses',
+            'Token verifications that checked the signature',
+            value=stats.misses
+        )
+        yield CounterMetricFamily(
+            'auth_token_rejections',
+            'Tokens rejected as invalid, expired or revoked',
+            value=stats.rejections
+        )
+        yield GaugeMetricFamily(
+            'auth_token_cache_size',
+            'Verified tokens currently cached',
+            value=len(token_verifier)
+        )
+        yield GaugeMetricFamily(
+            'auth_revoked_tokens',
+            'Revoked tokens not yet expired',
+            value=token_verifier.revoked_count
+        )
+        yield CounterMetricFamily(
+            'auth_token_revocation_errors',
+            'Revocation store lookups that failed',
+            value=stats.revocation_errors
+        )
+
+register_collector(TokenCacheCollector())
+
+class PasswordHasherCollector:
+    """Exports the password hashing pool's load at scrape time."""
+
+    def collect(self):
+        hasher = get_password_hasher()
+        yield GaugeMetricFamily(
+            'password_hash_pending',
+            'Hash requests queued or running',
+            value=hasher.pending
+        )
+        yield GaugeMetricFamily(
+            'password_hash_queue_depth',
+            'Hash requests waiting for a worker',
+            value=hasher.queue_depth
+        )
+        yield GaugeMetricFamily(
+            'password_hash_workers',
+            'Hashing worker processes',
+            value=hasher.workers
+        )
+        yield CounterMetricFamily(
+            'password_hash_rejected',
+            'Hash requests rejected because the queue was full',
+            value=hasher.stats.rejected
+        )
+        yield CounterMetricFamily(
+            'password_hash_rehashed',
+            'Stored hashes upgraded to current parameters on login',
+            value=hasher.stats.rehashed
+        )
+
+register_collector(PasswordHasherCollector())
+
+class DatabasePoolCollector:
+    """Exports database pool saturation at scrape time."""
+
+    def collect(self):
+        stats = get_user_repository().pool.stats()
+        yield GaugeMetricFamily(
+            'db_pool_size',
+            'Open database connections',
+            value=stats.size
+        )
+        yield GaugeMetricFamily(
+            'db_pool_max_size',
+            'Maximum database connections',
+            value=stats.max_size
+        )
+        yield GaugeMetricFamily(
+            'db_pool_in_use',
+            'Database connections currently borrowed',
+            value=stats.in_use
+        )
+        yield GaugeMetricFamily(
+            'db_pool_waiting',
+            'Requests waiting for a database connection',
+            value=stats.waiting
+        )
+        yield CounterMetricFamily(
+            'db_pool_acquired',
+            'Database connections borrowed',
+            value=stats.acquired
+        )
+        yield CounterMetricFamily(
+            'db_pool_timeouts',
+            'Waits for a database connection that timed out',
+            value=stats.timeouts
+        )
+        yield CounterMetricFamily(
+            'db_pool_acquire_wait_seconds',
+            'Time spent waiting for database connections',
+            value=stats.acquire_wait_seconds
+        )
+
+register_collector(DatabasePoolCollector())
+
+class ProfileCacheCollector:
+    """Exports the two-tier profile cache counters."""
+
+    def collect(self):
+        cache = get_profile_cache()
+        tiers = CounterMetricFamily(
+            'profile_cache_hits',
+            'Profile lookups served from cache',
+            labels=['tier']
+        )
+        tiers.add_metric(['local'], cache.stats.local_hits)
+        tiers.add_metric(['remote'], cache.stats.remote_hits)
+        yield tiers
+        yield CounterMetricFamily(
+            'profile_cache_misses',
+            'Profile lookups that reached the database',
+            value=cache.stats.misses
+        )
+        yield CounterMetricFamily(
+            'profile_cache_negative_hits',
+            'Cached "not found" profile lookups',
+            value=cache.stats.negative_hits
+        )
+        yield CounterMetricFamily(
+            'profile_cache_remote_errors',
+            'Remote cache tier operations that failed',
+            value=cache.stats.remote_errors
+        )
+        yield CounterMetricFamily(
+            'profile_cache_invalidations',
+            'Profile cache entries invalidated by writes',
+            value=cache.stats.invalidations
+        )
+        yield GaugeMetricFamily(
+            'profile_cache_local_entries',
+            'Profiles in this worker\'s LRU',
+            value=len(cache.local)
+        )
+
+register_collector(ProfileCacheCollector())
+
+class AdmissionCollector:
+    """Exports admission control limits and shed counts per route class."""
+
+    def collect(self):
+        lanes = get_admission_controller().lanes.values()
+        limit = GaugeMetricFamily(
+            'admission_concurrency_limit',
+            'Current concurrency limit',
+            labels=['route_class']
+        )
+        inflight = GaugeMetricFamily(
+            'admission_inflight',
+            'Requests currently admitted',
+            labels=['route_class']
+        )
+        admitted = CounterMetricFamily(
+            'admission_admitted',
+            'Requests admitted',
+            labels=['route_class']
+        )
+        shed = CounterMetricFamily(
+            'admission_shed',
+            'Requests rejected with 503 because the limit was reached',
+            labels=['route_class']
+        )
+        for lane in lanes:
+            limit.add_metric([lane.name], lane.limit)
+            inflight.add_metric([lane.name], lane.inflight)
+            admitted.add_metric([lane.name], lane.stats.admitted)
+            shed.add_metric([lane.name], lane.stats.shed)
+        yield limit
+        yield inflight
+        yield admitted
+        yield shed
+
+register_collector(AdmissionCollector())
+
+class ErrorReportingCollector:
+    """Exports how many error reports were sent and suppressed per sink."""
+
+    def collect(self):
+        reported = CounterMetricFamily(
+            'error_reports_sent',
+            'Errors reported in full',
+            labels=['sink']
+        )
+        suppressed = CounterMetricFamily(
+            'error_reports_suppressed',
+            'Repeated errors counted but not reported',
+            labels=['sink']
+        )
+        fingerprints = GaugeMetricFamily(
+            'error_report_fingerprints',
+            'Distinct error fingerprints being tracked',
+            labels=['sink']
+        )
+        for sink in ("log", "sentry"):
+            stats = get_error_limiter(sink).stats
+            reported.add_metric([sink], stats.reported)
+            suppressed.add_metric([sink], stats.suppressed)
+            fingerprints.add_metric([sink], stats.fingerprints)
+        yield reported
+        yield suppressed
+        yield fingerprints
+
+register_collector(ErrorReportingCollector())
+
+class HTTPCacheCollector:
+    """Exports conditional GET and server-side response cache counters."""
+
+    def collect(self):
+        yield CounterMetricFamily(
+            'http_cache_hits',
+            'Responses served from the server-side response cache',
+            value=http_cache_stats.served_from_cache
+        )
+        yield CounterMetricFamily(
+            'http_cache_not_modified',
+            'Conditional GETs answered with 304 Not Modified',
+            value=http_cache_stats.not_modified
+        )
+        yield CounterMetricFamily(
+            'http_cache_stores',
+            'Responses stored in the server-side response cache',
+            value=http_cache_stats.stored
+        )
+        yield GaugeMetricFamily(
+            'http_cache_entries',
+            'Responses held in this worker\'s response cache',
+            value=len(response_cache)
+        )
+
+register_collector(HTTPCacheCollector())
+
+# With several workers /metrics renders the shared files only, so each
+# worker publishes its collectors there every health sample interval
+collector_mirror = CollectorMirror(
+    LOCAL_COLLECTORS,
+    # Each worker counts the revocations it has made or looked up; the
+    # largest count is the closest to the total
+    gauge_modes={"auth_revoked_tokens": "livemax"},
+)
+if is_multiprocess():
+    resource_sampler.add_listener(lambda snapshot: collector_mirror.publish())
+
+# Endpoint labels for requests that matched no route, and for new routes
+# seen after the series cap is reached
+UNMATCHED_ENDPOINT = "unmatched"
+OVERFLOW_ENDPOINT = "overflow"
+
+KNOWN_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+)
+
+class EndpointLabeler:
+    """
+    Bounds the label cardinality of the HTTP request metrics.
+
+    Endpoints are labelled with the matched route template (``/items/{id}``)
+    rather than the raw path, so path parameters and scanner traffic cannot
+    create new series. At most ``max_endpoints`` distinct templates are
+    tracked; later ones share the OVERFLOW_ENDPOINT label. Templates come
+    from RouteTemplates, shared with the request profiler.
+    """
+
+    def __init__(self, max_endpoints: int):
+        self.max_endpoints = max_endpoints
+        self._endpoints: set = set()
+        self._series: set = set()
+        self._template = RouteTemplates()
+
+    def endpoint(self, scope: Scope) -> str:
+        template = self._template(scope)
+        if template is None:
+            return UNMATCHED_ENDPOINT
+        if template in self._endpoints:
+            return template
+        if len(self._endpoints) >= self.max_endpoints:
+            return OVERFLOW_ENDPOINT
+        self._endpoints.add(template)
+        return template
+
+    @staticmethod
+    def method(scope: Scope) -> str:
+        method = scope["method"]
+        return method if method in KNOWN_METHODS else "OTHER"
+
+    def track(self, method: str, endpoint: str, status_code: int) -> None:
+        key = (method, endpoint, status_code)
+        if key not in self._series:
+            self._series.add(key)
+            METRICS_SERIES.set(len(self._series))
+
+class OverheadStats:
+    """In-process counter of the time the request middleware adds."""
+
+    def __init__(self):
+        self.requests = 0
+        self.total_ns = 0
+
+    def record(self, overhead_ns: int) -> None:
+        self.requests += 1
+        self.total_ns += overhead_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "total_ns": self.total_ns,
+            "mean_ns": self.mean_ns,
+        }
+
+overhead_stats = OverheadStats()
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware for request timing, logging and Prometheus metrics.
+
+    Replaces the BaseHTTPMiddleware-based request logger and metrics layer
+    with a single pass: no extra task per request, no response wrapping, and
+    streaming responses pass through untouched. Time spent in the middleware
+    itself is tracked in ``overhead_stats`` and MIDDLEWARE_OVERHEAD.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        settings = get_settings()
+        self.header_allowlist = settings.log_header_allowlist
+        self.labeler = EndpointLabeler(settings.metrics_max_endpoints)
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.perf_counter_ns()
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
+        
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        context_token = bind_log_context(
+            request_id=request_id, method=method, path=path
+        )
         
-        # Record request latency
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Copied: the message and its headers belong to the sender
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]}
+            await send(message)
         
-        # Update metrics
-        status_code = response.status_code
-        REQUEST_COUNT.labels(method=method, endpoint=path, status_code=status_code).inc()
-        REQUEST_LATENCY.labels(method=method, endpoint=path).observe(duration)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Incoming %s %s", method, path,
+                extra={
+                    "headers": filter_headers(
+                        scope["headers"], self.header_allowlist
+                    ),
+                    "client": (
+                        scope["client"][0] if scope.get("client")
+                        else "unknown"
+                    ),
+                }
+            )
         
-        return response
+        app_start_ns = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            log_error(exc, f"Error processing {method} {path}")
+            raise
+        finally:
+            # Also reached on cancellation (client disconnects), which is
+            # not an Exception
+            app_end_ns = time.perf_counter_ns()
+            duration = (app_end_ns - start_ns) / 1e9
+            # The router has filled in the matched route by now
+            endpoint = self.labeler.endpoint(scope)
+            method_label = self.labeler.method(scope)
+            self.labeler.track(method_label, endpoint, status_code)
+            REQUEST_COUNT.labels(
+                method=method_label, endpoint=endpoint, status_code=status_code
+            ).inc()
+            REQUEST_LATENCY.labels(
+                method=method_label, endpoint=endpoint
+            ).observe(duration)
+            route_class = classify_route(
+                path if endpoint == UNMATCHED_ENDPOINT else endpoint
+            )
+            REQUEST_CLASS_LATENCY[route_class].labels(
+                method=method_label
+            ).observe(duration)
+            latency_quantiles.observe(("endpoint", endpoint), duration)
+            latency_quantiles.observe(("class", route_class), duration)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Completed %s %s - %s",
+                    method, path, status_code,
+                    extra={
+                        "route": endpoint,
+                        "status_code": status_code,
+                        "duration_ms": round(duration * 1000, 3),
+                    }
+                )
+            reset_log_context(context_token)
+            
+            overhead_ns = (
+                (app_start_ns - start_ns)
+                + (time.perf_counter_ns() - app_end_ns)
+            )
+            overhead_stats.record(overhead_ns)
+            MIDDLEWARE_OVERHEAD.inc(overhead_ns / 1e9)
+
+exposition_cache = AsyncTTLCache(
+    "metrics", ttl=get_settings().metrics_cache_ttl, max_entries=8
+)
+
+def render_metrics(encoder, use_gzip: bool) -> bytes:
+    """Serialize the registry. Blocking; run off the event loop."""
+    if is_multiprocess():
+        cleanup_dead_workers()
+        collector_mirror.publish()
+        payload = encoder(build_registry())
+    else:
+        payload = encoder(REGISTRY)
+    if use_gzip:
+        payload = gzip.compress(payload, compresslevel=5)
+    return payload
 
 def init_monitoring(app: FastAPI):
     """Initialize monitoring for the application."""
     
-    # Add Prometheus middleware
-    app.add_middleware(PrometheusMiddleware)
+    # Add request timing, logging and metrics middleware
+    app.add_middleware(RequestMetricsMiddleware)
     
-    # System metrics endpoint
+    # Metrics endpoint. The exposition is rendered in a worker thread and
+    # cached briefly, so concurrent or back-to-back scrapes share one render.
     @app.get("/metrics")
-    async def metrics():
-        # Update system info
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+    async def metrics(request: Request):
+        encoder, content_type = choose_encoder(request.headers.get("accept"))
+        use_gzip = "gzip" in request.headers.get("accept-encoding", "")
         
-        SYSTEM_INFO.info({
-            'cpu_percent': str(cpu_percent),
-            'memory_percent': str(memory.percent),
-            'disk_percent': str(disk.percent),
-            'python_version': os.sys.version,
-        })
+        async def load() -> bytes:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, render_metrics, encoder, use_gzip
+            )
         
-        # Generate metrics
-        return Response(
-            generate_latest(),
-            media_type=CONTENT_TYPE_LATEST
+        payload = await exposition_cache.get_or_load(
+            (content_type, use_gzip), load
         )
+        # Set Content-Type directly; the encoder's value already has a charset
+        headers = {"Content-Type": content_type}
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        return Response(payload, headers=headers)
 
     # Health check endpoint with detailed status
     @app.get("/health/detailed")
     async def detailed_health():
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # Served from the background sampler; never calls psutil inline.
+        snapshot = resource_sampler.snapshot
         
         return {
-            "status": "healthy",
+            "status": "healthy" if snapshot else "degraded",
             "timestamp": time.time(),
+            "sample_age_seconds": resource_sampler.age_seconds,
             "system": {
                 "cpu": {
-                    "percent": cpu_percent,
+                    "percent": snapshot.get("cpu_percent"),
                 },
                 "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent,
+                    "total": snapshot.get("memory_total"),
+                    "available": snapshot.get("memory_available"),
+                    "percent": snapshot.get("memory_percent"),
                 },
                 "disk": {
-                    "total": disk.total,
-                    "free": disk.free,
-                    "percent": disk.percent,
+                    "total": snapshot.get("disk_total"),
+                    "free": snapshot.get("disk_free"),
+                    "percent": snapshot.get("disk_percent"),
                 },
             },
+            "event_loop": loop_monitor.summary(),
             "python": {
-                "version": os.sys.version,
+                "version": sys.version,
             },
         }
@@ -0,0 +1,154 @@
+"""
+Multi-process Prometheus support for the GHN backend application.
+
+When the API runs with several worker processes, each worker writes its
+metric values to files in a shared directory and ``/metrics`` aggregates all
+of them. prometheus_client chooses between in-memory and file-backed values
+when it is first imported, so configure_multiprocess_dir() must run before
+any ``prometheus_client`` import.
+
+Custom collectors that read in-process state (pool sizes, cache counters,
+...) are not file-backed, so CollectorMirror copies their values into the
+shared directory for whichever worker serves the scrape.
+"""
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.config import get_settings
+
+ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# Metric files are named <type>[_<mode>]_<pid>.db
+_PID_FILE = re.compile(r"^(?P<kind>[a-z_]+)_(?P<pid>\d+)\.db$")
+
+def configure_multiprocess_dir() -> Optional[Path]:
+    """
+    Enable multi-process mode if PROMETHEUS_MULTIPROC_DIR is configured.
+
+    The setting may come from the environment or the .env file; either way
+    it is exported to the environment for prometheus_client and the worker
+    processes. Returns the directory, or None in single-process mode.
+    """
+    from app.core.logging import logger
+    settings = get_settings()
+    directory = settings.prometheus_multiproc_dir
+    if not directory:
+        return None
+
+    if "prometheus_client.values" in sys.modules and ENV_VAR not in os.environ:
+        logger.warning(
+            "prometheus_client was imported before %s was set; "
+            "metrics will not be shared between workers", ENV_VAR
+        )
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    os.environ[ENV_VAR] = str(path)
+    return path
+
+def is_multiprocess() -> bool:
+    """Whether metrics are shared between worker processes."""
+    return ENV_VAR in os.environ
+
+def _worker_pids(path: Path) -> Set[int]:
+    pids = set()
+    for entry in os.scandir(path):
+        match = _PID_FILE.match(entry.name)
+        if match:
+            pids.add(int(match.group("pid")))
+    return pids
+
+def cleanup_dead_workers(path: Optional[Path] = None) -> Set[int]:
+    """
+    Remove metric files that only made sense while their worker was alive.
+
+    Live gauges of dead workers are removed, as are their per-process gauges
+    (which would otherwise show stale values under the dead pid). Counter,
+    histogram and summed-gauge files are kept so totals never go backwards.
+    Returns the pids that were cleaned up.
+    """
+    import psutil
+    from prometheus_client import multiprocess
+
+    path = Path(path or os.environ[ENV_VAR])
+    dead = {pid for pid in _worker_pids(path) if not psutil.pid_exists(pid)}
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, str(path))
+        for file in path.glob(f"gauge_*_{pid}.db"):
+            if not file.name.startswith("gauge_sum_"):
+                file.unlink(missing_ok=True)
+    return dead
+
+def reset_multiprocess_dir(path: Optional[Path] = None) -> None:
+    """
+    Delete all metric files. Call once in the parent process before workers
+    start, so values from a previous run are not carried over.
+    """
+    path = Path(path or os.environ[ENV_VAR])
+    for file in path.glob("*.db"):
+        file.unlink(missing_ok=True)
+
+def build_registry():
+    """A registry that aggregates metrics from every worker's files."""
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.multiprocess import MultiProcessCollector
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+class CollectorMirror:
+    """
+    Publishes custom collectors' values to the multi-process metric files.
+
+    Counters are written as increments to a file-backed Counter, so they
+    are summed over every worker, including ones that have exited. Gauges
+    are written with the multiprocess mode given in ``gauge_modes``, by
+    default summed over the live workers. Call publish() periodically in
+    every worker, and before rendering so the scraped worker's values are
+    current.
+    """
+
+    def __init__(self, collectors: Iterable[Any], gauge_modes: Optional[Dict[str, str]] = None):
+        self.collectors = list(collectors)
+        self.gauge_modes = gauge_modes or {}
+        self._metrics: Dict[str, Any] = {}
+        self._published: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        # publish() runs on the event loop and in the /metrics render thread
+        self._lock = threading.Lock()
+
+    def _metric(self, family: Any, labelnames: Tuple[str, ...]) -> Any:
+        from prometheus_client import Counter, Gauge
+
+        metric = self._metrics.get(family.name)
+        if metric is None:
+            if family.type == "counter":
+                metric = Counter(family.name, family.documentation, labelnames, registry=None)
+            else:
+                mode = self.gauge_modes.get(family.name, "livesum")
+                metric = Gauge(family.name, family.documentation, labelnames, registry=None, multiprocess_mode=mode)
+            self._metrics[family.name] = metric
+        return metric
+
+    def publish(self) -> None:
+        with self._lock:
+            for collector in self.collectors:
+                for family in collector.collect():
+                    for sample in family.samples:
+                        if family.type == "counter" and not sample.name.endswith("_total"):
+                            continue
+                        labelnames = tuple(sample.labels)
+                        metric = self._metric(family, labelnames)
+                        child = metric.labels(**sample.labels) if labelnames else metric
+                        if family.type != "counter":
+                            child.set(sample.value)
+                            continue
+                        key = (sample.name, tuple(sample.labels.items()))
+                        last = self._published.get(key, 0.0)
+                        if sample.value > last:
+                            child.inc(sample.value - last)
+                        self._published[key] = sample.value
@@ -0,0 +1,208 @@
+"""
+Password hashing for the GHN backend application.
+Runs scrypt in a bounded process pool so hashing never blocks the event loop.
+
+The module-level hashing functions run inside pool workers, so this module
+only imports the standard library at the top level.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+SCHEME = "scrypt"
+BULK_CHUNK_SIZE = 4  # Hashes per background pool task; bounds how long a login can wait for a worker
+
+@dataclass(frozen=True)
+class HashParams:
+    """scrypt cost parameters. Changing them makes existing hashes stale."""
+    n: int = 2 ** 14
+    r: int = 8
+    p: int = 1
+    dklen: int = 32
+    salt_bytes: int = 16
+
+    @property
+    def maxmem(self) -> int:
+        # scrypt needs 128 * n * r * p bytes; leave headroom
+        return 256 * self.n * self.r * self.p
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+def _derive(password: str, salt: bytes, params: HashParams) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=params.n, r=params.r, p=params.p,
+        maxmem=params.maxmem, dklen=params.dklen
+    )
+
+def hash_password(password: str, params: HashParams) -> str:
+    """Hash a password as ``scrypt$n$r$p$salt$key``. CPU-bound."""
+    salt = os.urandom(params.salt_bytes)
+    key = _derive(password, salt, params)
+    return f"{SCHEME}${params.n}${params.r}${params.p}${_b64encode(salt)}${_b64encode(key)}"
+
+def hash_passwords(passwords: List[str], params: HashParams) -> List[str]:
+    """Hash several passwords in one worker round trip. CPU-bound."""
+    return [hash_password(password, params) for password in passwords]
+
+def parse_hash(encoded: str) -> Tuple[HashParams, bytes, bytes]:
+    """Split an encoded hash into its parameters, salt and key."""
+    scheme, n, r, p, salt, key = encoded.split("$")
+    if scheme != SCHEME:
+        raise ValueError(f"Unsupported password hash scheme: {scheme}")
+    salt_bytes, key_bytes = _b64decode(salt), _b64decode(key)
+    params = HashParams(n=int(n), r=int(r), p=int(p), dklen=len(key_bytes), salt_bytes=len(salt_bytes))
+    return params, salt_bytes, key_bytes
+
+def unmatchable_hash(params: HashParams) -> str:
+    """A well-formed hash with the given parameters that no password is expected to match."""
+    salt, key = bytes(params.salt_bytes), bytes(params.dklen)
+    return f"{SCHEME}${params.n}${params.r}${params.p}${_b64encode(salt)}${_b64encode(key)}"
+
+def needs_rehash(encoded: str, params: HashParams) -> bool:
+    """Whether a stored hash was made with different parameters."""
+    return parse_hash(encoded)[0] != params
+
+def verify_password(
+    password: str, encoded: str, params: HashParams
+) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password against a stored hash. CPU-bound.
+
+    Returns whether it matched and, if it did but the hash used outdated
+    parameters, a fresh hash to store in its place.
+    """
+    stored_params, salt, key = parse_hash(encoded)
+    if not hmac.compare_digest(_derive(password, salt, stored_params), key):
+        return False, None
+    if stored_params != params:
+        return True, hash_password(password, params)
+    return True, None
+
+class HasherBusy(Exception):
+    """Raised when too many hashing requests are already waiting."""
+
+@dataclass
+class HasherStats:
+    """Counters for the password hashing pool."""
+    submitted: int = 0
+    rejected: int = 0
+    rehashed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class PasswordHasher:
+    """
+    Async front end to a pool of hashing processes.
+
+    Work is admitted only while fewer than ``max_pending`` requests are
+    queued or running; beyond that HasherBusy is raised so callers can shed
+    load instead of piling up behind the pool. The pool is created on first
+    use and sized to the available cores by default.
+
+    Background hashing (bulk imports) holds one of ``workers - 1`` slots per
+    task, so at least one worker stays free for logins whenever the pool has
+    more than one. The pool runs tasks in submission order, so background
+    tasks are kept to BULK_CHUNK_SIZE hashes; a login never waits behind more
+    than one of them.
+    """
+
+    def __init__(self, params: HashParams, workers: int, max_pending: int):
+        self.params = params
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = HasherStats()
+        self.pending = 0
+        self._background = asyncio.Semaphore(max(1, workers - 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests admitted but waiting for a free worker."""
+        return max(0, self.pending - self.workers)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and logging
+            # threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.stats.rejected += 1
+            raise HasherBusy("Password hashing queue is full")
+        self.pending += 1
+        self.stats.submitted += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current parameters."""
+        return await self._submit(hash_password, password, self.params)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch of passwords in a single pool task."""
+        return await self._submit(hash_passwords, passwords, self.params)
+
+    async def hash_background(self, passwords: List[str]) -> List[str]:
+        """
+        Hash at most BULK_CHUNK_SIZE passwords as background work, waiting
+        for a background slot before entering the pool.
+        """
+        if len(passwords) > BULK_CHUNK_SIZE:
+            raise ValueError(f"Background hashing takes at most {BULK_CHUNK_SIZE} passwords per call")
+        async with self._background:
+            return await self._submit(hash_passwords, passwords, self.params)
+
+    async def verify(self, password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password. If it matches a hash with outdated parameters,
+        also return the replacement hash for the caller to store.
+        """
+        matched, new_hash = await self._submit(verify_password, password, encoded, self.params)
+        if new_hash is not None:
+            self.stats.rehashed += 1
+        return matched, new_hash
+
+    async def verify_unknown(self, password: str) -> None:
+        """
+        Do the work of a failed verify() for an account that does not exist,
+        so a login's response time does not reveal whether the email is
+        registered.
+        """
+        await self._submit(verify_password, password, unmatchable_hash(self.params), self.params)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    from app.config import get_settings
+    settings = get_settings()
+    params = HashParams(
+        n=settings.password_hash_n,
+        r=settings.password_hash_r,
+        p=settings.password_hash_p,
+    )
+    workers = settings.password_hash_workers or os.cpu_count() or 1
+    return PasswordHasher(params, workers=workers, max_pending=settings.password_hash_max_pending)
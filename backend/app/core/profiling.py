@@ -0,0 +1,275 @@
+"""
+Request profiling for the GHN backend application.
+Samples the stacks of selected requests and aggregates them per route as collapsed stacks.
+
+A background thread wakes every ``interval`` seconds while at least one
+profiled request is in flight. For each of them it records one stack:
+
+- if the request's task is running, the event loop thread's current stack
+  (time spent on the CPU, including anything blocking the loop);
+- otherwise the chain of coroutines the task is suspended in, ending in a
+  "(waiting)" frame (time spent waiting for the database, a lock, the
+  hashing pool, ...).
+
+Samples are therefore proportional to wall-clock time, split by where the
+request was. Stacks are kept per route template in the collapsed format
+read by flamegraph.pl and speedscope (``frame;frame;frame count``).
+
+Which requests are profiled is decided by ProfilingMiddleware: a random
+fraction, requests to configured path prefixes, and requests carrying the
+admin token in the X-Profile header. The middleware is only installed when
+profiling is enabled, so a disabled profiler costs nothing per request.
+"""
+import asyncio
+import os
+import random
+import secrets
+import sys
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from types import FrameType
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.routing import RouteTemplates
+
+# asyncio's Handle._run dispatches every callback and task step; frames up
+# to it are event loop machinery, trimmed from the root of on-CPU stacks
+_HANDLE_RUN = (os.path.join(os.path.dirname(asyncio.__file__), "events.py"), "_run")
+
+UNMATCHED_ROUTE = "unmatched"
+OTHER_STACKS = "(other stacks)"
+WAITING = "(waiting)"
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def _running_stack(frame: Optional[FrameType]) -> List[str]:
+    frames: List[FrameType] = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    for index, frame in enumerate(frames):
+        if (frame.f_code.co_filename, frame.f_code.co_name) == _HANDLE_RUN:
+            frames = frames[index + 1:]
+            break
+    return [_frame_name(frame) for frame in frames]
+
+def _waiting_stack(coro: Any) -> List[str]:
+    names: List[str] = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    names.append(WAITING)
+    return names
+
+@dataclass
+class RouteProfile:
+    """Aggregated samples for one route template."""
+    requests: int = 0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> Dict[str, int]:
+        return {"requests": self.requests, "samples": self.samples, "stacks": len(self.stacks)}
+
+@dataclass
+class ProfilingStats:
+    """How many requests were profiled, by trigger."""
+    sampled: int = 0
+    route: int = 0
+    header: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class _Active:
+    __slots__ = ("task", "loop", "thread_id", "samples")
+
+    def __init__(self, task: "asyncio.Task", loop: asyncio.AbstractEventLoop, thread_id: int):
+        self.task = task
+        self.loop = loop
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+
+class StackSampler:
+    """
+    Samples the stacks of registered asyncio tasks from a background thread.
+
+    The thread is started on first use, and again on the first use after
+    stop(); it sleeps while no task is registered. At most ``max_stacks`` distinct stacks are kept per route;
+    further ones are counted under OTHER_STACKS.
+    """
+
+    def __init__(self, interval: float, max_stacks: int):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.routes: Dict[str, RouteProfile] = {}
+        self.stats = ProfilingStats()
+        self._active: Dict[int, _Active] = {}
+        self._lock = threading.Lock()
+        self._has_work = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> int:
+        """Start sampling the current task; returns a handle for end()."""
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("begin() must be called from a task")
+        if self._thread is None:
+            # Restarting after stop(), e.g. in the next application lifespan
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="request-profiler", daemon=True
+            )
+            self._thread.start()
+        active = _Active(task, asyncio.get_running_loop(), threading.get_ident())
+        with self._lock:
+            self._active[id(active)] = active
+            self._has_work.set()
+        return id(active)
+
+    def end(self, handle: int, route: str) -> None:
+        """Stop sampling and add the request's samples to its route."""
+        with self._lock:
+            active = self._active.pop(handle, None)
+            if not self._active:
+                self._has_work.clear()
+            if active is None:
+                return
+            profile = self.routes.setdefault(route, RouteProfile())
+            profile.requests += 1
+            for stack, count in active.samples.items():
+                profile.samples += count
+                if stack not in profile.stacks and len(profile.stacks) >= self.max_stacks:
+                    stack = OTHER_STACKS
+                profile.stacks[stack] += count
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        with self._lock:
+            active = list(self._active.values())
+        taken = []
+        for request in active:
+            try:
+                running = asyncio.current_task(request.loop) is request.task
+                if running:
+                    stack = _running_stack(frames.get(request.thread_id))
+                else:
+                    stack = _waiting_stack(request.task.get_coro())
+            except Exception:
+                # The task moved on while it was being read; skip this sample
+                continue
+            if stack:
+                taken.append((request, ";".join(stack)))
+        # end() reads the samples under the lock on the loop thread
+        with self._lock:
+            for request, stack in taken:
+                request.samples[stack] += 1
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if not self._has_work.wait(timeout=1.0):
+                continue
+            if self._stopped.wait(self.interval):
+                break
+            self._sample()
+
+    def collapsed(self, routes: Optional[Iterable[str]] = None) -> str:
+        """Collapsed stacks for the given routes (all by default), route as the root frame."""
+        with self._lock:
+            selected = {
+                route: dict(profile.stacks) for route, profile in self.routes.items()
+                if routes is None or route in routes
+            }
+        lines = [
+            f"{route};{stack} {count}"
+            for route, stacks in sorted(selected.items())
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {route: profile.summary() for route, profile in sorted(self.routes.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._has_work.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles selected requests with a StackSampler.
+
+    A request is profiled if it carries ``X-Profile: <token>``, if its path
+    starts with one of ``routes``, or otherwise with probability
+    ``sample_rate``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sampler: StackSampler,
+        sample_rate: float = 0.0,
+        routes: Sequence[str] = (),
+        token: Optional[str] = None,
+    ):
+        self.app = app
+        self.sampler = sampler
+        self.sample_rate = sample_rate
+        self.routes = tuple(routes)
+        self.token = token.encode() if token else None
+        self.templates = RouteTemplates()
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and secrets.compare_digest(value, self.token):
+                    return "header"
+        if self.routes and scope["path"].startswith(self.routes):
+            return "route"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.sampler.stats
+        setattr(stats, trigger, getattr(stats, trigger) + 1)
+        handle = self.sampler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Same route labels as the request metrics
+            route = self.templates(scope) or UNMATCHED_ROUTE
+            self.sampler.end(handle, route)
+
+@lru_cache()
+def get_stack_sampler() -> StackSampler:
+    from app.config import get_settings
+    settings = get_settings()
+    return StackSampler(settings.profile_interval, settings.profile_max_stacks)
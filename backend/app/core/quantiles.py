@@ -0,0 +1,135 @@
+"""
+Streaming latency quantiles for the GHN backend application.
+Implements a DDSketch-style relative-error sketch and a rolling window over it.
+"""
+import math
+import threading
+import time
+from typing import Dict, Hashable, Iterable, Optional
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch with bounded relative error.
+
+    Values are counted in buckets whose bounds grow geometrically, so any
+    quantile estimate is within ``relative_accuracy`` of the true value
+    (e.g. 1% of 480ms is ±4.8ms) using a few hundred buckets regardless of
+    how many values are recorded. When ``max_buckets`` is exceeded the
+    lowest buckets are merged, which only affects the smallest quantiles.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-6,
+        max_buckets: int = 2048,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_buckets = max_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's values to this one. Both must use the same accuracy."""
+        self.count += other.count
+        self.sum += other.sum
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None if empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class RollingQuantiles:
+    """
+    Quantile sketches per key over a rolling time window.
+
+    Values go into the current sketch; every ``window_seconds`` it becomes
+    the previous one and a fresh sketch starts. Queries merge both, so they
+    always cover between one and two windows of recent data.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.relative_accuracy = relative_accuracy
+        self._current: Dict[Hashable, QuantileSketch] = {}
+        self._previous: Dict[Hashable, QuantileSketch] = {}
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float) -> None:
+        if now - self._rotated_at >= 2 * self.window_seconds:
+            self._previous = {}
+        else:
+            self._previous = self._current
+        self._current = {}
+        self._rotated_at = now
+
+    def observe(self, key: Hashable, value: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._rotated_at >= self.window_seconds:
+                self._rotate(now)
+            sketch = self._current.get(key)
+            if sketch is None:
+                sketch = self._current[key] = QuantileSketch(self.relative_accuracy)
+            sketch.add(value)
+
+    def snapshot(
+        self, quantiles: Iterable[float] = DEFAULT_QUANTILES
+    ) -> Dict[Hashable, Dict[str, Optional[float]]]:
+        """Count and requested quantiles for every key seen in the window."""
+        with self._lock:
+            if time.monotonic() - self._rotated_at >= self.window_seconds:
+                self._rotate(time.monotonic())
+            keys = set(self._current) | set(self._previous)
+            merged = {}
+            for key in keys:
+                sketch = QuantileSketch(self.relative_accuracy)
+                for source in (self._previous, self._current):
+                    if key in source:
+                        sketch.merge(source[key])
+                merged[key] = sketch
+
+        result = {}
+        for key, sketch in merged.items():
+            summary: Dict[str, Optional[float]] = {"count": sketch.count}
+            for q in quantiles:
+                summary[f"p{q * 100:g}"] = sketch.quantile(q)
+            result[key] = summary
+        return result
@@ -0,0 +1,63 @@
+"""
+JSON responses for the GHN backend application.
+Provides an orjson-backed response class with a stdlib json fallback.
+
+``FastJSONResponse`` is the application's default response class. It also
+accepts a Pydantic model directly and serializes it with the model's own
+serializer. A handler that returns ``model_response(model)`` hands FastAPI
+a finished Response, so FastAPI skips validating it against
+``response_model`` again. ``response_model`` stays on the route for the
+OpenAPI schema.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Mapping, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+else:  # pragma: no cover - stdlib fallback
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, or with json if it is not installed."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return dumps(content)
+
+def model_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """Respond with an already-validated model, skipping response_model validation."""
+    return FastJSONResponse(model, status_code=status_code, headers=headers)
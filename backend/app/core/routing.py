@@ -0,0 +1,54 @@
+"""
+Route templates for the GHN backend application.
+Maps a routed request to the path template of the route that served it.
+
+Request metrics and the request profiler label requests by route template
+(``/items/{id}``) rather than by raw path. FastAPI routes leave themselves
+in ``scope["route"]``. Plain Starlette routes and mounts (the docs pages,
+routes added with ``add_route``) only leave their endpoint, which is looked
+up among the router's routes once and cached.
+"""
+from typing import Any, Dict, List, Optional
+
+from starlette.routing import BaseRoute, Mount, Route
+from starlette.types import Scope
+
+def find_template(
+    routes: List[BaseRoute], endpoint: Any, prefix: str = ""
+) -> Optional[str]:
+    """Template of the Route or Mount in ``routes`` serving ``endpoint``."""
+    for route in routes:
+        if isinstance(route, Route) and route.endpoint is endpoint:
+            return prefix + route.path
+        if isinstance(route, Mount):
+            if route.app is endpoint:
+                return prefix + route.path
+            template = find_template(
+                route.routes, endpoint, prefix + route.path
+            )
+            if template is not None:
+                return template
+    return None
+
+class RouteTemplates:
+    """
+    Route template of a request, once the router has handled it.
+
+    Returns None for requests no route matched. Lookups of plain Starlette
+    routes are cached per endpoint.
+    """
+
+    def __init__(self):
+        self._templates: Dict[Any, Optional[str]] = {}
+
+    def __call__(self, scope: Scope) -> Optional[str]:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        router = scope.get("router")
+        endpoint = scope.get("endpoint")
+        if router is None or endpoint is None:
+            return None
+        if endpoint not in self._templates:
+            self._templates[endpoint] = find_template(router.routes, endpoint)
+        return self._templates[endpoint]
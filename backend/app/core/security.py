@@ -0,0 +1,232 @@
+"""
+Authentication for the GHN backend application.
+Issues JWT access tokens and verifies them through a cache of verified claims.
+
+Revoked tokens are recorded in the shared cache tier (Redis when CACHE_URL
+is set), so a logout handled by one worker is honoured by all of them.
+"""
+import hashlib
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jwt.algorithms import get_default_algorithms
+
+from app.config import get_settings
+from app.core.logging import logger
+from app.core.tiered_cache import RemoteTier, create_remote_tier
+from app.models.schemas import TokenData
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+
+class SigningKeys:
+    """
+    Key material for one JWT algorithm, parsed once.
+
+    PyJWT accepts already-prepared keys, so PEM parsing for asymmetric
+    algorithms (and byte conversion for HMAC) is not repeated per token.
+    """
+
+    def __init__(self, algorithm: str, secret: str, public_key: Optional[str] = None):
+        algorithms = get_default_algorithms()
+        if algorithm not in algorithms:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        alg = algorithms[algorithm]
+        self.algorithm = algorithm
+        self.signing_key = alg.prepare_key(secret)
+        self.verifying_key = alg.prepare_key(public_key) if public_key else self.signing_key
+
+@dataclass
+class TokenCacheStats:
+    """Counters for the verified-token cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejections: int = 0
+    revocation_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a token; raw tokens are never kept in memory."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+class TokenVerifier:
+    """
+    Verifies access tokens, caching the claims of valid ones.
+
+    Verified claims are kept in a bounded LRU keyed by token digest until
+    the token's own ``exp``, so repeat requests with the same token skip
+    signature verification. Revoking a token drops its cache entry and
+    records it in ``revocations``, a store shared between workers, until it
+    would have expired anyway. Tokens are checked against that store before
+    their signature, and cached claims are re-checked once they are older
+    than ``recheck_interval`` seconds: that bounds how long another worker
+    keeps accepting a revoked token. Failures of the store are logged and
+    the token is treated as not revoked.
+    """
+
+    def __init__(
+        self,
+        keys: SigningKeys,
+        cache_size: int = 10000,
+        revocations: Optional[RemoteTier] = None,
+        recheck_interval: float = 1.0,
+    ):
+        self.keys = keys
+        self.cache_size = cache_size
+        self.revocations = revocations or create_remote_tier(None)
+        self.recheck_interval = recheck_interval
+        self.stats = TokenCacheStats()
+        # digest -> (claims, exp, time revocation was last checked)
+        self._cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float, float]]" = OrderedDict()
+        # Revocations this worker has made or seen, with their expiry
+        self._revoked: Dict[bytes, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def revoked_count(self) -> int:
+        return len(self._revoked)
+
+    @staticmethod
+    def _revocation_key(digest: bytes) -> str:
+        return f"revoked:{digest.hex()}"
+
+    async def _is_revoked(self, digest: bytes) -> bool:
+        if digest in self._revoked:
+            return True
+        try:
+            expires_at = await self.revocations.get(self._revocation_key(digest))
+        except Exception as e:
+            self.stats.revocation_errors += 1
+            logger.warning(f"Token revocation lookup failed: {e}")
+            return False
+        if expires_at is None:
+            return False
+        self._revoked[digest] = float(expires_at)
+        self._prune_revoked()
+        return True
+
+    def _reject_revoked(self, digest: bytes) -> None:
+        self._cache.pop(digest, None)
+        self.stats.rejections += 1
+        raise jwt.InvalidTokenError("Token has been revoked")
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims. Raises jwt.PyJWTError if it is invalid."""
+        digest = token_digest(token)
+        now = time.time()
+        entry = self._cache.get(digest)
+        if entry is not None:
+            claims, expires_at, checked_at = entry
+            if now < expires_at:
+                if now - checked_at >= self.recheck_interval:
+                    if await self._is_revoked(digest):
+                        self._reject_revoked(digest)
+                    self._cache[digest] = (claims, expires_at, now)
+                self._cache.move_to_end(digest)
+                self.stats.hits += 1
+                return claims
+            del self._cache[digest]
+
+        self.stats.misses += 1
+        if await self._is_revoked(digest):
+            self._reject_revoked(digest)
+        try:
+            claims = jwt.decode(
+                token,
+                self.keys.verifying_key,
+                algorithms=[self.keys.algorithm],
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError:
+            self.stats.rejections += 1
+            raise
+
+        self._cache[digest] = (claims, float(claims["exp"]), now)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.stats.evictions += 1
+        return claims
+
+    async def revoke(self, token: str, expires_at: Optional[float] = None) -> None:
+        """
+        Reject token from now on, in every worker, and drop it from the
+        cache. Raises if the shared store cannot be written.
+        """
+        digest = token_digest(token)
+        entry = self._cache.pop(digest, None)
+        if expires_at is None:
+            expires_at = entry[1] if entry else time.time() + 86400
+        self._revoked[digest] = expires_at
+        self._prune_revoked()
+        ttl = max(1.0, expires_at - time.time())
+        await self.revocations.set(self._revocation_key(digest), repr(expires_at).encode(), ttl)
+
+    def _prune_revoked(self) -> None:
+        # Expired tokens fail verification anyway; forget them
+        now = time.time()
+        expired = [digest for digest, exp in self._revoked.items() if exp <= now]
+        for digest in expired:
+            del self._revoked[digest]
+
+    def clear(self) -> None:
+        """Drop all cached claims, e.g. after rotating keys."""
+        self._cache.clear()
+
+    async def close(self) -> None:
+        await self.revocations.close()
+
+def _build_verifier() -> TokenVerifier:
+    settings = get_settings()
+    secret = settings.secret_key
+    if not secret and settings.api_workers > 1:
+        # Each worker would sign with its own key and reject the others' tokens
+        raise RuntimeError("SECRET_KEY must be set when running more than one worker")
+    if settings.api_workers > 1 and not settings.cache_url:
+        logger.warning("CACHE_URL not set; revoked tokens are only rejected by the worker that revoked them")
+    if not secret:
+        logger.warning(
+            "SECRET_KEY not set. Using a random per-process key; tokens will "
+            "not survive restarts or be valid across workers."
+        )
+        secret = secrets.token_urlsafe(32)
+    keys = SigningKeys(settings.jwt_algorithm, secret, settings.jwt_public_key)
+    return TokenVerifier(
+        keys,
+        cache_size=settings.token_cache_size,
+        revocations=create_remote_tier(settings.cache_url),
+        recheck_interval=settings.token_revocation_recheck_interval,
+    )
+
+token_verifier = _build_verifier()
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Create a signed JWT access token carrying data as claims."""
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
+    payload = {**data, "iat": now, "exp": expire, "jti": uuid.uuid4().hex}
+    return jwt.encode(payload, token_verifier.keys.signing_key, algorithm=token_verifier.keys.algorithm)
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """Dependency resolving the bearer token to the authenticated user."""
+    try:
+        claims = await token_verifier.verify(token)
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return TokenData(email=claims["sub"])
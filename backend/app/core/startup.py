@@ -0,0 +1,65 @@
+"""
+Startup profiling for the GHN backend application.
+Times each import and initialization phase of the app factory and lifespan.
+
+Enabled by setting the ``GHN_STARTUP_PROFILE`` environment variable to a
+true value (``1``, ``true``, ``yes`` or ``on``, as Settings accepts for
+booleans). It is read from the process environment rather than Settings,
+since loading Settings is itself one of the phases being measured. When
+disabled, phases cost a single attribute check. This module only imports
+the standard library so that importing the rest of the application can be
+timed.
+"""
+import os
+import resource
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+def _rss_mb() -> float:
+    # Peak resident set size; ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class StartupProfile:
+    """Records how long each startup phase took and how much RSS grew."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start, _rss_mb() - rss_before))
+
+    def report(self) -> None:
+        """Log every phase, then the total since the profile was created."""
+        if not self.enabled:
+            return
+        from app.core.logging import logger
+
+        for name, duration, rss_delta in self.phases:
+            logger.info(
+                f"Startup phase {name}: {duration * 1000:.1f}ms, +{rss_delta:.1f}MB RSS",
+                extra={"phase": name, "duration_ms": duration * 1000, "rss_delta_mb": rss_delta},
+            )
+        total = time.perf_counter() - self.started_at
+        logger.info(
+            f"Startup complete in {total * 1000:.1f}ms, peak RSS {_rss_mb():.1f}MB",
+            extra={"duration_ms": total * 1000, "rss_mb": _rss_mb()},
+        )
+
+# Values Settings would parse as True
+_TRUE_VALUES = {"1", "true", "yes", "on", "t", "y"}
+
+def create_startup_profile() -> StartupProfile:
+    value = os.environ.get("GHN_STARTUP_PROFILE", "")
+    return StartupProfile(enabled=value.strip().lower() in _TRUE_VALUES)
@@ -0,0 +1,272 @@
+"""
+Two-tier read-through cache for the GHN backend application.
+Provides an in-process LRU tier in front of a shared Redis (or in-memory) tier.
+
+Reads check the local LRU first, then the remote tier, then call the loader
+and fill both. Loader results of None are cached too (negative caching) for
+a shorter time, so lookups of missing keys don't all reach the database.
+Concurrent misses for a key share one load. Each load carries a generation
+number; invalidating a key detaches its running load, which then returns its
+value to the readers already waiting on it but writes nothing back, since
+the value may predate the write that caused the invalidation.
+TTLs are jittered so entries written together don't expire together.
+"""
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.logging import logger
+
+# Stored in place of a value to remember that the loader found nothing
+NEGATIVE = b"\x00"
+
+class LRUTier:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class RemoteTier(ABC):
+    """A cache shared between processes."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+class InMemoryTier(RemoteTier):
+    """
+    Local stand-in for Redis with the same expiry semantics.
+
+    Used when no CACHE_URL is configured and in tests. It is not shared
+    between processes.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[1]:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+class RedisTier(RemoteTier):
+    """Remote tier speaking the Redis protocol through redis.asyncio."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def ping(self) -> bool:
+        return await self._client.ping()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+@dataclass
+class TieredCacheStats:
+    """Where reads were served from."""
+    local_hits: int = 0
+    remote_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    remote_errors: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class TieredCache:
+    """
+    Read-through cache over a local LRU tier and a remote tier.
+
+    Values are stored as bytes in both tiers using the given serializer.
+    The local tier uses a short TTL because other workers cannot invalidate
+    it; the remote tier is invalidated on writes and holds values longer.
+    Remote tier failures are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        remote: RemoteTier,
+        serialize: Callable[[Any], bytes],
+        deserialize: Callable[[bytes], Any],
+        ttl: float = 300.0,
+        local_ttl: float = 5.0,
+        negative_ttl: float = 30.0,
+        jitter: float = 0.1,
+        local_max_entries: int = 10000,
+    ):
+        self.name = name
+        self.remote = remote
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.negative_ttl = negative_ttl
+        self.jitter = jitter
+        self.local = LRUTier(local_max_entries)
+        self.stats = TieredCacheStats()
+        # Running load per key, with the generation it was started under
+        self._inflight: Dict[str, Tuple[int, asyncio.Future]] = {}
+        self._generation = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def _jittered(self, ttl: float) -> float:
+        return ttl * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _decode(self, raw: bytes) -> Any:
+        if raw == NEGATIVE:
+            self.stats.negative_hits += 1
+            return None
+        return self.deserialize(raw)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the value for key from the nearest tier, loading it on a miss."""
+        full_key = self._key(key)
+        raw = self.local.get(full_key)
+        if raw is not None:
+            self.stats.local_hits += 1
+            return self._decode(raw)
+
+        entry = self._inflight.get(full_key)
+        if entry is None:
+            self._generation += 1
+            generation = self._generation
+            inflight = asyncio.ensure_future(self._fill(full_key, loader, generation))
+            self._inflight[full_key] = (generation, inflight)
+            inflight.add_done_callback(lambda _: self._finish(full_key, generation))
+        else:
+            inflight = entry[1]
+        return self._decode(await asyncio.shield(inflight))
+
+    def _current(self, full_key: str, generation: int) -> bool:
+        entry = self._inflight.get(full_key)
+        return entry is not None and entry[0] == generation
+
+    def _finish(self, full_key: str, generation: int) -> None:
+        # A newer load may have replaced this one after an invalidation
+        if self._current(full_key, generation):
+            del self._inflight[full_key]
+
+    async def _fill(self, full_key: str, loader: Callable[[], Awaitable[Any]], generation: int) -> bytes:
+        try:
+            raw = await self.remote.get(full_key)
+        except Exception as e:
+            self.stats.remote_errors += 1
+            logger.warning(f"Remote cache read failed for {full_key}: {e}")
+            raw = None
+        if raw is not None:
+            self.stats.remote_hits += 1
+            if self._current(full_key, generation):
+                self.local.set(full_key, raw, self._jittered(self.local_ttl))
+            return raw
+
+        self.stats.misses += 1
+        value = await loader()
+        if value is None:
+            raw, ttl = NEGATIVE, self.negative_ttl
+        else:
+            raw, ttl = self.serialize(value), self.ttl
+        if not self._current(full_key, generation):
+            # Invalidated while loading; the value may be from before the write
+            return raw
+        self.local.set(full_key, raw, self._jittered(min(ttl, self.local_ttl)))
+        try:
+            await self.remote.set(full_key, raw, self._jittered(ttl))
+        except Exception as e:
+            self.stats.remote_errors += 1
+            logger.warning(f"Remote cache write failed for {full_key}: {e}")
+        return raw
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        """Drop keys from both tiers and detach any loads running for them."""
+        full_keys = [self._key(key) for key in keys]
+        for full_key in full_keys:
+            self.local.delete(full_key)
+            self._inflight.pop(full_key, None)
+        self.stats.invalidations += len(full_keys)
+        try:
+            await self.remote.delete(*full_keys)
+        except Exception as e:
+            self.stats.remote_errors += 1
+            logger.warning(f"Remote cache invalidation failed for {full_keys}: {e}")
+        # Loads started during the delete may have read the old remote value
+        for full_key in full_keys:
+            self._inflight.pop(full_key, None)
+
+    async def close(self) -> None:
+        self.local.clear()
+        await self.remote.close()
+
+def create_remote_tier(url: Optional[str]) -> RemoteTier:
+    """Redis tier for a ``redis://`` URL, otherwise the in-memory stand-in."""
+    if url:
+        return RedisTier(url)
+    return InMemoryTier()
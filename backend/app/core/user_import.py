@@ -0,0 +1,276 @@
+"""
+Bulk user import for the GHN backend application.
+Streams NDJSON or CSV uploads through validation, batched hashing and batched inserts.
+
+Rows are read from the request body as it arrives and validated one at a
+time against UserCreate. Valid rows are grouped into batches; each batch is
+checked for already registered emails in one query, hashed as background
+work in small pool tasks that leave a worker free for logins, and inserted in
+one statement. A bounded queue sits between parsing and writing, so a client
+uploading faster than rows can be hashed is slowed down by TCP flow control
+instead of filling memory. Memory use depends on the batch size and the
+longest line, not on the upload size.
+"""
+import asyncio
+import csv
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    import json
+    _loads = json.loads
+
+from pydantic import ValidationError
+
+from app.core.passwords import BULK_CHUNK_SIZE, HasherBusy, PasswordHasher
+from app.models.schemas import UserCreate
+from app.repositories.users import UserRepository
+
+# A record is a parsed row, or the reason the row could not be parsed,
+# together with the line it started on
+Record = Tuple[int, Union[Dict[str, Any], str]]
+
+CSV_COLUMNS = ("email", "full_name", "password")
+
+@dataclass
+class RowResult:
+    """Outcome of one imported row: "created", "exists" or "invalid"."""
+    line: int
+    status: str
+    email: Optional[str] = None
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+@dataclass
+class ImportStats:
+    """Counters for one import."""
+    rows: int = 0
+    created: int = 0
+    exists: int = 0
+    invalid: int = 0
+    batches: int = 0
+    hash_retries: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines without the line terminator.
+
+    A line longer than max_line_bytes is discarded as it arrives and
+    reported as None, so one oversized line cannot exhaust memory.
+    """
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not skipping:
+                buffer += chunk[start:] if end < 0 else chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    buffer.clear()
+                    skipping = True
+                    yield None
+            if end < 0:
+                break
+            if skipping:
+                skipping = False
+            else:
+                yield bytes(buffer.rstrip(b"\r"))
+                buffer.clear()
+            start = end + 1
+    if buffer and not skipping:
+        yield bytes(buffer.rstrip(b"\r"))
+
+async def ndjson_records(lines: AsyncIterator[Optional[bytes]]) -> AsyncIterator[Record]:
+    """One JSON object per line; blank lines are skipped."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line is None:
+            yield line_no, "Line too long"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = _loads(line)
+        except ValueError:
+            yield line_no, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "Expected a JSON object"
+            continue
+        yield line_no, record
+
+async def csv_records(lines: AsyncIterator[Optional[bytes]], max_line_bytes: int) -> AsyncIterator[Record]:
+    """
+    CSV with a header row naming at least the email, full_name and password
+    columns. Quoted fields may span lines; blank lines are skipped.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    pending_bytes = 0
+    start_line = line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line is None:
+            pending, pending_bytes = [], 0
+            yield line_no, "Line too long"
+            continue
+        try:
+            text = line.decode("utf-8-sig" if line_no == 1 else "utf-8")
+        except UnicodeDecodeError:
+            pending, pending_bytes = [], 0
+            yield line_no, "Invalid UTF-8"
+            continue
+        if not pending:
+            start_line = line_no
+        pending.append(text)
+        pending_bytes += len(line)
+        if pending_bytes > max_line_bytes:
+            pending, pending_bytes = [], 0
+            yield start_line, "Record too long"
+            continue
+        # An odd number of quotes so far means a quoted field continues on
+        # the next line
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        fields = next(csv.reader(["\n".join(pending)]), [])
+        pending, pending_bytes = [], 0
+
+        if not any(field.strip() for field in fields):
+            continue
+        if header is None:
+            header = [field.strip().lower() for field in fields]
+            missing = [column for column in CSV_COLUMNS if column not in header]
+            if missing:
+                yield start_line, f"CSV header is missing columns: {', '.join(missing)}"
+                return
+            continue
+        if len(fields) != len(header):
+            yield start_line, f"Expected {len(header)} fields, got {len(fields)}"
+            continue
+        yield start_line, dict(zip(header, fields))
+    if pending:
+        yield start_line, "Unterminated quoted field"
+
+def _validate(record: Dict[str, Any]) -> Union[UserCreate, str]:
+    try:
+        return UserCreate.model_validate(record)
+    except ValidationError as exc:
+        # Messages only; the rejected input may be a password
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        )
+
+# Rows queued for writing: results for rows that failed to parse or
+# validate, in place, and (line, user) pairs for the rest
+BatchItem = Union[RowResult, Tuple[int, UserCreate]]
+
+class UserImporter:
+    """
+    Imports a stream of records in batches.
+
+    Parsing and validation run in a background task that stays at most
+    ``max_pending_batches`` batches ahead of the writes. Hashing goes
+    through the shared PasswordHasher; when its queue is full the import
+    waits and retries rather than failing, so interactive logins and
+    registrations keep priority.
+    """
+
+    def __init__(
+        self,
+        users: UserRepository,
+        hasher: PasswordHasher,
+        batch_size: int,
+        max_pending_batches: int,
+        retry_delay: float = 0.05,
+    ):
+        self.users = users
+        self.hasher = hasher
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.retry_delay = retry_delay
+        self.stats = ImportStats()
+
+    async def run(self, records: AsyncIterator[Record]) -> AsyncIterator[List[RowResult]]:
+        """Yield the results of each batch, in input order, as it is written."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_batches)
+        reader = asyncio.create_task(self._read(records, queue))
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield await self._write(batch)
+        finally:
+            reader.cancel()
+
+    async def _read(self, records: AsyncIterator[Record], queue: asyncio.Queue) -> None:
+        try:
+            batch: List[BatchItem] = []
+            async for line, record in records:
+                self.stats.rows += 1
+                user = _validate(record) if isinstance(record, dict) else record
+                if isinstance(user, str):
+                    batch.append(RowResult(line, "invalid", error=user))
+                else:
+                    batch.append((line, user))
+                if len(batch) >= self.batch_size:
+                    await queue.put(batch)
+                    batch = []
+            if batch:
+                await queue.put(batch)
+        except Exception as exc:
+            # Raised from run() instead, e.g. when the client disconnects
+            await queue.put(exc)
+        else:
+            await queue.put(None)
+
+    async def _write(self, batch: List[BatchItem]) -> List[RowResult]:
+        self.stats.batches += 1
+        valid = [item for item in batch if not isinstance(item, RowResult)]
+        existing = await self.users.existing_emails([user.email for _, user in valid])
+        new = [(line, user) for line, user in valid if user.email not in existing]
+        hashes = await self._hash([user.password for _, user in new])
+        created = await self.users.create_many([(user, hashed) for (_, user), hashed in zip(new, hashes)])
+        ids = {line: user.id for (line, _), user in zip(new, created) if user is not None}
+
+        results: List[RowResult] = []
+        for item in batch:
+            if isinstance(item, RowResult):
+                result = item
+            elif item[0] in ids:
+                result = RowResult(item[0], "created", email=item[1].email, id=ids[item[0]])
+            else:
+                # Registered before this import, or earlier in it
+                result = RowResult(item[0], "exists", email=item[1].email)
+            setattr(self.stats, result.status, getattr(self.stats, result.status) + 1)
+            results.append(result)
+        return results
+
+    async def _hash(self, passwords: List[str]) -> List[str]:
+        # The hasher admits these a few at a time, so logins submitted
+        # meanwhile queue behind at most one short chunk
+        chunks = [passwords[i:i + BULK_CHUNK_SIZE] for i in range(0, len(passwords), BULK_CHUNK_SIZE)]
+        hashed = await asyncio.gather(*(self._hash_chunk(chunk) for chunk in chunks))
+        return [encoded for chunk in hashed for encoded in chunk]
+
+    async def _hash_chunk(self, passwords: List[str]) -> List[str]:
+        while True:
+            try:
+                return await self.hasher.hash_background(passwords)
+            except HasherBusy:
+                self.stats.hash_retries += 1
+                await asyncio.sleep(self.retry_delay)
@@ -0,0 +1,173 @@
+"""
+Database connection pools for the GHN backend application.
+Provides SQLite (aiosqlite) and PostgreSQL (asyncpg) pools with shared statistics.
+
+Connections are opened once at startup and reused; requests only borrow
+them. Both pools track how saturated they are so it can be exported as
+metrics and reported by the health check.
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the pool timeout."""
+
+@dataclass
+class PoolStats:
+    """Point-in-time and cumulative pool usage."""
+    size: int = 0
+    max_size: int = 0
+    in_use: int = 0
+    waiting: int = 0
+    acquired: int = 0
+    timeouts: int = 0
+    acquire_wait_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class BasePool(ABC):
+    """Connection accounting shared by the pool implementations."""
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._stats = PoolStats(max_size=max_size)
+
+    @abstractmethod
+    async def open(self) -> None: ...
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+    @abstractmethod
+    async def _get(self, timeout: float) -> Any:
+        """Take a free connection, raising asyncio.TimeoutError after ``timeout``."""
+
+    @abstractmethod
+    async def _put(self, conn: Any) -> None: ...
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow a connection for the duration of the block."""
+        stats = self._stats
+        stats.waiting += 1
+        start = time.perf_counter()
+        try:
+            conn = await self._get(self.timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise PoolTimeout(f"No database connection free within {self.timeout}s")
+        finally:
+            stats.waiting -= 1
+            stats.acquire_wait_seconds += time.perf_counter() - start
+        stats.acquired += 1
+        stats.in_use += 1
+        try:
+            yield conn
+        finally:
+            stats.in_use -= 1
+            await self._put(conn)
+
+    def stats(self) -> PoolStats:
+        return self._stats
+
+class SQLitePool(BasePool):
+    """
+    Fixed-size pool of aiosqlite connections.
+
+    Each connection keeps sqlite3's compiled-statement cache, so repeated
+    queries are prepared once per connection. An in-memory database is
+    private to its connection, so it always gets a pool of one.
+    """
+
+    def __init__(self, database: str, max_size: int, timeout: float):
+        if database == ":memory:":
+            max_size = 1
+        super().__init__(max_size, timeout)
+        self.database = database
+        self._idle: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._connections: list = []
+
+    async def open(self) -> None:
+        import aiosqlite
+
+        for _ in range(self.max_size):
+            conn = await aiosqlite.connect(self.database, cached_statements=256)
+            conn.row_factory = aiosqlite.Row
+            if self.database != ":memory:":
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+            await conn.execute("PRAGMA busy_timeout=5000")
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+        self._stats.size = len(self._connections)
+
+    async def close(self) -> None:
+        for conn in self._connections:
+            await conn.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+        self._stats.size = 0
+
+    async def _get(self, timeout: float) -> Any:
+        # Cancelling Queue.get() leaves the item queued, so this cannot lose one
+        return await asyncio.wait_for(self._idle.get(), timeout=timeout)
+
+    async def _put(self, conn: Any) -> None:
+        self._idle.put_nowait(conn)
+
+class PostgresPool(BasePool):
+    """
+    asyncpg connection pool.
+
+    asyncpg prepares every statement on first use and caches it per
+    connection, so hot queries skip parsing and planning.
+    """
+
+    def __init__(self, dsn: str, max_size: int, timeout: float, min_size: int = 1):
+        super().__init__(max_size, timeout)
+        self.dsn = dsn
+        self.min_size = min(min_size, max_size)
+        self._pool = None
+
+    async def open(self) -> None:
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=256,
+        )
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _get(self, timeout: float) -> Any:
+        # asyncpg's own timeout: a connection handed over as an outer
+        # wait_for() fires would never be released
+        return await self._pool.acquire(timeout=timeout)
+
+    async def _put(self, conn: Any) -> None:
+        await self._pool.release(conn)
+
+    def stats(self) -> PoolStats:
+        if self._pool is not None:
+            self._stats.size = self._pool.get_size()
+        return self._stats
+
+def create_pool(database_url: str, max_size: int, timeout: float) -> BasePool:
+    """Build a pool for a ``sqlite:///path`` or ``postgresql://`` URL."""
+    if database_url.startswith("sqlite://"):
+        database = database_url[len("sqlite:///"):] or ":memory:"
+        return SQLitePool(database, max_size, timeout)
+    if database_url.startswith(("postgresql://", "postgres://")):
+        return PostgresPool(database_url, max_size, timeout)
+    raise ValueError(f"Unsupported database URL: {database_url}")
@@ -0,0 +1,235 @@
+"""
+Application factory for the GHN backend application.
+Builds the FastAPI app and manages background services through its lifespan.
+
+Everything beyond the standard library is imported inside create_app(), one
+phase at a time, so importing this module is cheap. Setting
+``GHN_STARTUP_PROFILE=1`` logs how long each phase took once startup has
+finished (see app.core.startup).
+"""
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.core.startup import StartupProfile, create_startup_profile
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+    from app.core.http_cache import PrecomputedOpenAPI
+
+DESCRIPTION = """Backend API for the Global HealthOps Nexus (GHN) MVP.
+
+    ## Features
+
+    * 🔐 **Authentication**: JWT-based authentication system
+    * 👥 **User Management**: User registration and profile management
+    * 🏥 **Health Records**: Secure health record management
+    * 📊 **Analytics**: Health data analytics and reporting
+
+    ## Authentication
+
+    All authenticated endpoints require a valid JWT token in the Authorization header:
+    ```
+    Authorization: Bearer <token>
+    ```
+
+    ## Error Handling
+
+    The API uses standard HTTP status codes and returns consistent error responses:
+    ```json
+    {
+        "detail": "Error message",
+        "status_code": 400,
+        "timestamp": "2025-02-08T10:45:00"
+    }
+    ```
+    """
+
+OPENAPI_TAGS = [
+    {
+        "name": "Authentication",
+        "description": "Operations for user authentication and registration"
+    },
+    {
+        "name": "Health",
+        "description": "API health check and monitoring endpoints"
+    }
+]
+
+# Configure CORS
+ALLOWED_ORIGINS = [
+    "http://localhost:5173",  # Vite default
+    "http://localhost:5174",  # Alternative Vite port
+    "http://127.0.0.1:5173",
+    "http://127.0.0.1:5174",
+]
+
+def _lifespan(profile: StartupProfile, openapi: "PrecomputedOpenAPI"):
+    @asynccontextmanager
+    async def lifespan(app: "FastAPI") -> AsyncIterator[None]:
+        from app.config import get_settings
+        from app.core.health import resource_sampler
+        from app.core.logging import shutdown_logging
+        from app.core.loop_monitor import loop_monitor
+        from app.core.passwords import get_password_hasher
+        from app.core.profiling import get_stack_sampler
+        from app.core.security import token_verifier
+        from app.repositories.users import get_profile_cache, get_user_repository
+
+        # Background tasks
+        with profile.phase("startup.resource_sampler"):
+            resource_sampler.start()
+            loop_monitor.start()
+        with profile.phase("startup.database"):
+            await get_user_repository().connect()
+        with profile.phase("startup.openapi"):
+            openapi.render()
+        profile.report()
+
+        yield
+
+        await loop_monitor.stop()
+        await resource_sampler.stop()
+        if get_settings().profile_enabled:
+            get_stack_sampler().stop()
+        await get_user_repository().close()
+        await get_profile_cache().close()
+        await token_verifier.close()
+        get_password_hasher().shutdown()
+        shutdown_logging()
+
+    return lifespan
+
+def create_app() -> "FastAPI":
+    """Build the application. Used by ``main:app`` and ``--factory`` servers."""
+    profile = create_startup_profile()
+
+    with profile.phase("import.settings"):
+        from app.config import get_settings
+        settings = get_settings()
+
+    with profile.phase("import.logging"):
+        from app.core.logging import capture_error, log_error, logger, setup_logging, setup_sentry
+
+    # Only imports sentry_sdk when SENTRY_DSN is set
+    with profile.phase("init.sentry"):
+        setup_sentry()
+
+    # Configure queued file and console logging
+    with profile.phase("init.logging"):
+        setup_logging()
+
+    with profile.phase("import.fastapi"):
+        from fastapi import FastAPI, Request
+        from fastapi.middleware.cors import CORSMiddleware
+
+    with profile.phase("import.monitoring"):
+        from app.core.admission import AdmissionControlMiddleware, get_admission_controller
+        from app.core.http_cache import HTTPCacheMiddleware, PrecomputedOpenAPI
+        from app.core.monitoring import classify_route, init_monitoring
+        from app.core.passwords import HasherBusy
+        from app.core.profiling import ProfilingMiddleware, get_stack_sampler
+        from app.core.responses import FastJSONResponse
+        from app.db import PoolTimeout
+
+    with profile.phase("init.app"):
+        openapi = PrecomputedOpenAPI()
+        app = FastAPI(
+            title="Global HealthOps Nexus API",
+            description=DESCRIPTION,
+            version="0.1.0",
+            openapi_tags=OPENAPI_TAGS,
+            docs_url="/docs",
+            redoc_url="/redoc",
+            openapi_url="/openapi.json",
+            default_response_class=FastJSONResponse,
+            lifespan=_lifespan(profile, openapi),
+        )
+
+        # Stack sampling for selected requests; innermost, so the matched
+        # route is known when a request finishes
+        if settings.profile_enabled:
+            app.add_middleware(
+                ProfilingMiddleware,
+                sampler=get_stack_sampler(),
+                sample_rate=settings.profile_sample_rate,
+                routes=settings.profile_routes,
+                token=settings.admin_token,
+            )
+            logger.info(
+                f"Request profiling enabled: sample rate {settings.profile_sample_rate}, "
+                f"routes {settings.profile_routes}"
+            )
+
+        # ETags, 304s and server-side reuse for @cacheable routes; inside
+        # admission control, so a response served from cache is still counted
+        app.add_middleware(HTTPCacheMiddleware)
+
+        # Shed load per route class before it reaches the routes; health and
+        # metrics have their own reserved lane
+        if settings.admission_enabled:
+            app.add_middleware(
+                AdmissionControlMiddleware,
+                controller=get_admission_controller(),
+                classify=classify_route,
+            )
+
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=ALLOWED_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+        logger.info(f"Configured CORS with allowed origins: {ALLOWED_ORIGINS}")
+
+        # Request timing, logging and metrics
+        init_monitoring(app)
+
+        # Error handlers
+        @app.exception_handler(HasherBusy)
+        async def hasher_busy_handler(request: Request, exc: HasherBusy):
+            return FastJSONResponse(
+                status_code=503,
+                content={"detail": "Server busy, retry shortly"},
+                headers={"Retry-After": "1"}
+            )
+
+        @app.exception_handler(PoolTimeout)
+        async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+            logger.warning(f"Database pool exhausted: {request.url.path}")
+            return FastJSONResponse(
+                status_code=503,
+                content={"detail": "Server busy, retry shortly"},
+                headers={"Retry-After": "1"}
+            )
+
+        @app.exception_handler(Exception)
+        async def global_exception_handler(request: Request, exc: Exception):
+            log_error(exc, f"Error processing request: {request.url.path}")
+            return FastJSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error"}
+            )
+
+    with profile.phase("import.routes"):
+        from app.routes import admin, auth, health
+
+    with profile.phase("init.routes"):
+        app.include_router(auth.router)
+        app.include_router(health.router)
+        app.include_router(admin.router)
+
+        # Served from bytes rendered at startup, after every route is known
+        openapi.install(app)
+
+        # Test endpoint for error logging
+        @app.get("/test-error", include_in_schema=False)
+        @capture_error
+        async def test_error():
+            """Endpoint that raises an error to test Sentry integration"""
+            logger.info("Test error endpoint called")
+            raise ValueError("This is a test error to verify Sentry integration")
+
+    return app
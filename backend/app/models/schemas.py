@@ -19,6 +19,10 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserInDB(UserResponse):
+    """Schema for a stored user, including the password hash"""
+    hashed_password: str = Field(..., description="Encoded password hash")
+
 class Token(BaseModel):
     """Schema for authentication token"""
     access_token: str = Field(..., description="JWT access token")
@@ -0,0 +1,359 @@
+"""
+User persistence for the GHN backend application.
+Implements the user repository over pooled SQLite or PostgreSQL connections.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.core.health import register_component
+from app.core.tiered_cache import TieredCache, create_remote_tier
+from app.db import BasePool, PostgresPool, create_pool
+from app.models.schemas import UserCreate, UserInDB, UserResponse
+
+# Called with (user_id, email) after a user row is written
+WriteListener = Callable[[int, str], Awaitable[None]]
+
+class DuplicateUserError(Exception):
+    """Raised when creating a user whose email is already registered."""
+
+class UserRepository(ABC):
+    """
+    Data access for users. Routes depend on this, not on a backend.
+
+    Write listeners run after every successful write so caches of user
+    data can invalidate their entries.
+    """
+
+    def __init__(self, pool: BasePool):
+        self.pool = pool
+        self._write_listeners: List[WriteListener] = []
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        self._write_listeners.append(listener)
+
+    async def _notify_write(self, user_id: int, email: str) -> None:
+        for listener in self._write_listeners:
+            await listener(user_id, email)
+
+    async def connect(self) -> None:
+        """Open the connection pool and make sure the schema exists."""
+        await self.pool.open()
+        await self._create_schema()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def ping(self) -> Dict[str, Any]:
+        """Run a trivial query; returns pool statistics."""
+        async with self.pool.acquire() as conn:
+            await self._ping(conn)
+        return self.pool.stats().as_dict()
+
+    @abstractmethod
+    async def _create_schema(self) -> None: ...
+
+    @abstractmethod
+    async def _ping(self, conn: Any) -> None: ...
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[UserInDB]: ...
+
+    @abstractmethod
+    async def get_by_id(self, user_id: int) -> Optional[UserInDB]: ...
+
+    async def create(self, user: UserCreate, hashed_password: str) -> UserInDB:
+        created = await self._insert(user, hashed_password)
+        await self._notify_write(created.id, created.email)
+        return created
+
+    async def create_many(self, users: List[Tuple[UserCreate, str]]) -> List[Optional[UserInDB]]:
+        """
+        Insert (user, hashed_password) pairs in one statement.
+
+        Returns the created users in input order, with None for each email
+        that was already registered, including repeats within the batch.
+        """
+        created = await self._insert_many(users) if users else []
+        for user in created:
+            if user is not None:
+                await self._notify_write(user.id, user.email)
+        return created
+
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        email = await self._update_password(user_id, hashed_password)
+        if email is not None:
+            await self._notify_write(user_id, email)
+
+    @abstractmethod
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        """The subset of emails that are already registered."""
+
+    @abstractmethod
+    async def _insert(self, user: UserCreate, hashed_password: str) -> UserInDB: ...
+
+    @abstractmethod
+    async def _insert_many(self, users: List[Tuple[UserCreate, str]]) -> List[Optional[UserInDB]]: ...
+
+    @abstractmethod
+    async def _update_password(self, user_id: int, hashed_password: str) -> Optional[str]:
+        """Store a new hash; returns the user's email, or None if no such user."""
+
+def _match_created(
+    users: List[Tuple[UserCreate, str]], rows: Dict[str, Tuple[int, datetime]]
+) -> List[Optional[UserInDB]]:
+    # Pairs inserted rows, keyed by email, back up with the input order
+    created: List[Optional[UserInDB]] = []
+    for user, hashed_password in users:
+        row = rows.pop(user.email, None)
+        if row is None:
+            created.append(None)
+            continue
+        created.append(UserInDB(
+            id=row[0],
+            email=user.email,
+            full_name=user.full_name,
+            hashed_password=hashed_password,
+            created_at=row[1],
+        ))
+    return created
+
+class SQLiteUserRepository(UserRepository):
+    """User repository backed by aiosqlite; runs locally without a server."""
+
+    async def _create_schema(self) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    email TEXT NOT NULL UNIQUE,
+                    full_name TEXT NOT NULL,
+                    hashed_password TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            await conn.commit()
+
+    async def _ping(self, conn: Any) -> None:
+        await conn.execute("SELECT 1")
+
+    async def _fetch_one(self, query: str, *args: Any) -> Optional[UserInDB]:
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query, args) as cursor:
+                row = await cursor.fetchone()
+        return UserInDB(**dict(row)) if row else None
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return await self._fetch_one(
+            "SELECT id, email, full_name, hashed_password, created_at FROM users WHERE email = ?",
+            email,
+        )
+
+    async def get_by_id(self, user_id: int) -> Optional[UserInDB]:
+        return await self._fetch_one(
+            "SELECT id, email, full_name, hashed_password, created_at FROM users WHERE id = ?",
+            user_id,
+        )
+
+    async def _insert(self, user: UserCreate, hashed_password: str) -> UserInDB:
+        import sqlite3
+
+        created_at = datetime.now(timezone.utc)
+        async with self.pool.acquire() as conn:
+            try:
+                cursor = await conn.execute(
+                    "INSERT INTO users (email, full_name, hashed_password, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (user.email, user.full_name, hashed_password, created_at.isoformat()),
+                )
+                await conn.commit()
+            except sqlite3.IntegrityError:
+                await conn.rollback()
+                raise DuplicateUserError(user.email)
+        return UserInDB(
+            id=cursor.lastrowid,
+            email=user.email,
+            full_name=user.full_name,
+            hashed_password=hashed_password,
+            created_at=created_at,
+        )
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        if not emails:
+            return set()
+        placeholders = ", ".join("?" * len(emails))
+        async with self.pool.acquire() as conn:
+            async with conn.execute(
+                f"SELECT email FROM users WHERE email IN ({placeholders})", emails
+            ) as cursor:
+                return {row["email"] for row in await cursor.fetchall()}
+
+    async def _insert_many(self, users: List[Tuple[UserCreate, str]]) -> List[Optional[UserInDB]]:
+        created_at = datetime.now(timezone.utc)
+        timestamp = created_at.isoformat()
+        params: List[Any] = []
+        for user, hashed_password in users:
+            params.extend((user.email, user.full_name, hashed_password, timestamp))
+        values = ", ".join(["(?, ?, ?, ?)"] * len(users))
+        async with self.pool.acquire() as conn:
+            async with conn.execute(
+                "INSERT INTO users (email, full_name, hashed_password, created_at) "
+                f"VALUES {values} ON CONFLICT (email) DO NOTHING RETURNING id, email",
+                params,
+            ) as cursor:
+                rows = {row["email"]: (row["id"], created_at) for row in await cursor.fetchall()}
+            await conn.commit()
+        return _match_created(users, rows)
+
+    async def _update_password(self, user_id: int, hashed_password: str) -> Optional[str]:
+        async with self.pool.acquire() as conn:
+            async with conn.execute(
+                "UPDATE users SET hashed_password = ? WHERE id = ? RETURNING email",
+                (hashed_password, user_id),
+            ) as cursor:
+                row = await cursor.fetchone()
+            await conn.commit()
+        return row["email"] if row else None
+
+class PostgresUserRepository(UserRepository):
+    """User repository backed by an asyncpg pool."""
+
+    async def _create_schema(self) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id BIGSERIAL PRIMARY KEY,
+                    email TEXT NOT NULL UNIQUE,
+                    full_name TEXT NOT NULL,
+                    hashed_password TEXT NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+
+    async def _ping(self, conn: Any) -> None:
+        await conn.fetchval("SELECT 1")
+
+    async def _fetch_one(self, query: str, *args: Any) -> Optional[UserInDB]:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(query, *args)
+        return UserInDB(**dict(row)) if row else None
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return await self._fetch_one(
+            "SELECT id, email, full_name, hashed_password, created_at FROM users WHERE email = $1",
+            email,
+        )
+
+    async def get_by_id(self, user_id: int) -> Optional[UserInDB]:
+        return await self._fetch_one(
+            "SELECT id, email, full_name, hashed_password, created_at FROM users WHERE id = $1",
+            user_id,
+        )
+
+    async def _insert(self, user: UserCreate, hashed_password: str) -> UserInDB:
+        import asyncpg
+
+        async with self.pool.acquire() as conn:
+            try:
+                row = await conn.fetchrow(
+                    "INSERT INTO users (email, full_name, hashed_password) VALUES ($1, $2, $3) "
+                    "RETURNING id, email, full_name, hashed_password, created_at",
+                    user.email, user.full_name, hashed_password,
+                )
+            except asyncpg.UniqueViolationError:
+                raise DuplicateUserError(user.email)
+        return UserInDB(**dict(row))
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        if not emails:
+            return set()
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT email FROM users WHERE email = ANY($1::text[])", emails)
+        return {row["email"] for row in rows}
+
+    async def _insert_many(self, users: List[Tuple[UserCreate, str]]) -> List[Optional[UserInDB]]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                "INSERT INTO users (email, full_name, hashed_password) "
+                "SELECT * FROM unnest($1::text[], $2::text[], $3::text[]) "
+                "ON CONFLICT (email) DO NOTHING RETURNING id, email, created_at",
+                [user.email for user, _ in users],
+                [user.full_name for user, _ in users],
+                [hashed_password for _, hashed_password in users],
+            )
+        return _match_created(users, {row["email"]: (row["id"], row["created_at"]) for row in rows})
+
+    async def _update_password(self, user_id: int, hashed_password: str) -> Optional[str]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(
+                "UPDATE users SET hashed_password = $1 WHERE id = $2 RETURNING email",
+                hashed_password, user_id,
+            )
+
+@lru_cache()
+def get_user_repository() -> UserRepository:
+    """The application's user repository. Connected at startup."""
+    settings = get_settings()
+    pool = create_pool(
+        settings.database_url,
+        max_size=settings.database_pool_size,
+        timeout=settings.database_pool_timeout,
+    )
+    if isinstance(pool, PostgresPool):
+        repository: UserRepository = PostgresUserRepository(pool)
+    else:
+        repository = SQLiteUserRepository(pool)
+    repository.add_write_listener(_invalidate_profile)
+    return repository
+
+@lru_cache()
+def get_profile_cache() -> TieredCache:
+    """
+    Cache of user profiles keyed by email, in front of the repository.
+
+    Only public profile fields are cached; password hashes stay in the
+    database.
+    """
+    settings = get_settings()
+    return TieredCache(
+        "profile",
+        create_remote_tier(settings.cache_url),
+        serialize=lambda profile: profile.model_dump_json().encode(),
+        deserialize=UserResponse.model_validate_json,
+        ttl=settings.cache_ttl,
+        local_ttl=settings.cache_local_ttl,
+        negative_ttl=settings.cache_negative_ttl,
+        jitter=settings.cache_ttl_jitter,
+        local_max_entries=settings.cache_local_max_entries,
+    )
+
+async def get_profile(email: str) -> Optional[UserResponse]:
+    """The public profile for email, served from cache where possible."""
+    async def load() -> Optional[UserResponse]:
+        user = await get_user_repository().get_by_email(email)
+        if user is None:
+            return None
+        return UserResponse.model_validate(user.model_dump(exclude={"hashed_password"}))
+
+    return await get_profile_cache().get_or_load(email, load)
+
+async def _invalidate_profile(user_id: int, email: str) -> None:
+    await get_profile_cache().invalidate(email)
+
+@register_component("database", timeout=2, cache_ttl=5)
+async def check_database() -> Dict[str, Any]:
+    """Database reachability and pool saturation."""
+    return await get_user_repository().ping()
+
+@register_component("profile_cache", timeout=1, cache_ttl=10, critical=False)
+async def check_profile_cache() -> Dict[str, Any]:
+    """Remote cache tier reachability and hit counters."""
+    cache = get_profile_cache()
+    await cache.remote.ping()
+    return {"local_entries": len(cache.local), **cache.stats.as_dict()}
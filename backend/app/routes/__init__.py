@@ -1,3 +1,3 @@
-from . import auth, health
+from . import admin, auth, health
 
-__all__ = ['auth', 'health']
+__all__ = ['admin', 'auth', 'health']
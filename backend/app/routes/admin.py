@@ -0,0 +1,195 @@
+import secrets
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from app.config import get_settings
+from app.core.admission import skip_latency_sample
+from app.core.log_search import SearchStats, build_query, get_log_search
+from app.core.logging import logger
+from app.core.monitoring import latency_quantiles
+from app.core.passwords import get_password_hasher
+from app.core.profiling import get_stack_sampler
+from app.core.responses import dumps
+from app.core.user_import import UserImporter, csv_records, iter_lines, ndjson_records
+from app.repositories.users import get_user_repository
+
+settings = get_settings()
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with a valid X-Admin-Token header."""
+    if not settings.admin_token:
+        # Admin endpoints are disabled entirely without a configured token
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+def _to_ms(summary: dict) -> dict:
+    return {
+        key: value if key == "count" or value is None else round(value * 1000, 3)
+        for key, value in summary.items()
+    }
+
+@router.get("/latency", summary="Live latency quantiles")
+async def latency():
+    """
+    Latency quantiles over the recent window, computed in-process.
+    
+    Returns p50/p95/p99 in milliseconds for each route class
+    (auth, health, other) and each endpoint template.
+    """
+    snapshot = latency_quantiles.snapshot()
+    return {
+        "window_seconds": latency_quantiles.window_seconds,
+        "classes": {key: _to_ms(v) for (kind, key), v in snapshot.items() if kind == "class"},
+        "endpoints": {key: _to_ms(v) for (kind, key), v in snapshot.items() if kind == "endpoint"},
+    }
+
+def _enabled_sampler():
+    if not settings.profile_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is not enabled")
+    return get_stack_sampler()
+
+LOG_SEARCH_CHUNK = 256  # records per streamed chunk
+
+@router.get("/logs", summary="Search the log files")
+async def search_logs(
+    request: Request,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    level: Optional[str] = None,
+    path: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    contains: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=100_000),
+):
+    """
+    Search ghn.log and its rotated copies through their block indexes.
+    
+    ``since`` and ``until`` take an ISO time or an age such as ``15m``;
+    ``level`` is a minimum level, ``path`` a request path prefix,
+    ``status`` codes or classes such as ``404,5xx``, and ``contains`` text
+    the record must include. The response is NDJSON, oldest record first:
+    one object per record with its fields and raw text, then a final
+    ``summary`` line with how much of the logs was read.
+    """
+    try:
+        query = build_query(since, until, level, path, status_filter, contains, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    search = get_log_search()
+    stats = SearchStats()
+    # A large search streams for a while; keep it out of the admission limit
+    skip_latency_sample(request.scope)
+    
+    # Synchronous, so Starlette iterates it in the threadpool: reading the
+    # files blocks
+    def results():
+        chunk = []
+        for entry in search.search(query, stats):
+            chunk.append(dumps(entry.as_dict()) + b"\n")
+            if len(chunk) >= LOG_SEARCH_CHUNK:
+                yield b"".join(chunk)
+                chunk = []
+        chunk.append(dumps({"summary": stats.as_dict()}) + b"\n")
+        yield b"".join(chunk)
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.get("/profile", summary="Profiled routes")
+async def profile_summary():
+    """
+    Routes with profile samples, with request and sample counts, and how
+    many requests were profiled per trigger (sampled, route, header).
+    """
+    sampler = _enabled_sampler()
+    return {
+        "interval_ms": sampler.interval * 1000,
+        "profiled": sampler.stats.as_dict(),
+        "routes": sampler.summary(),
+    }
+
+@router.get("/profile/collapsed", summary="Collapsed stacks", response_class=PlainTextResponse)
+async def profile_collapsed(route: Optional[List[str]] = Query(None)):
+    """
+    Sampled stacks in collapsed format, one ``stack count`` line each, with
+    the route template as the root frame. Pass ``route`` (repeatable) to
+    select routes. Feed to flamegraph.pl or open in speedscope.
+    """
+    return PlainTextResponse(_enabled_sampler().collapsed(route))
+
+@router.delete("/profile", status_code=status.HTTP_204_NO_CONTENT, summary="Clear profiles")
+async def profile_reset():
+    """Discard the collected samples."""
+    _enabled_sampler().reset()
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for handlers that are still reading the request body.
+
+    StreamingResponse watches receive() for a client disconnect while it
+    streams, which would consume the body chunks the handler is reading.
+    A disconnect during the upload surfaces from request.stream() instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+IMPORT_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+@router.post("/users/import", summary="Bulk import users")
+async def import_users(request: Request):
+    """
+    Create users from an NDJSON or CSV upload, streamed in both directions.
+    
+    Send ``Content-Type: application/x-ndjson`` with one
+    ``{"email", "full_name", "password"}`` object per line, or
+    ``text/csv`` with a header row naming those columns. The response is
+    NDJSON: one result per row as soon as its batch is written
+    (``created`` with the new id, ``exists`` or ``invalid`` with the
+    reason), then a final ``summary`` line.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    file_format = IMPORT_CONTENT_TYPES.get(content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of: {', '.join(IMPORT_CONTENT_TYPES)}",
+        )
+    
+    lines = iter_lines(request.stream(), settings.import_max_line_bytes)
+    if file_format == "csv":
+        records = csv_records(lines, settings.import_max_line_bytes)
+    else:
+        records = ndjson_records(lines)
+    importer = UserImporter(
+        get_user_repository(),
+        get_password_hasher(),
+        batch_size=settings.import_batch_size,
+        max_pending_batches=settings.import_max_pending_batches,
+    )
+    # An import runs for as long as the upload takes; its duration would
+    # only drag down the admission limit for other routes
+    skip_latency_sample(request.scope)
+    
+    async def results():
+        async for batch in importer.run(records):
+            yield b"".join(dumps(result.as_dict()) + b"\n" for result in batch)
+        logger.info(f"User import finished: {importer.stats.as_dict()}", extra={"user_import": importer.stats.as_dict()})
+        yield dumps({"summary": importer.stats.as_dict()}) + b"\n"
+    
+    return UploadStreamingResponse(results(), media_type="application/x-ndjson")
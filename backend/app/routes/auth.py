@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import timedelta
-from app.models.schemas import Token, UserCreate, UserResponse
-from app.core.security import create_access_token, get_current_user
-from app.core.config import get_settings
+from app.models.schemas import Token, TokenData, UserCreate, UserResponse
+from app.core.passwords import get_password_hasher
+from app.core.responses import model_response
+from app.core.security import create_access_token, get_current_user, oauth2_scheme, token_verifier
+from app.config import get_settings
+from app.repositories.users import DuplicateUserError, UserRepository, get_profile, get_user_repository
 
 settings = get_settings()
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -30,19 +33,41 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
         }
     }
 )
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    users: UserRepository = Depends(get_user_repository)
+):
     """
     Authenticate a user and return a JWT token.
     
     - **username**: Email address
     - **password**: User password
     """
-    # Authentication logic here
+    invalid_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    hasher = get_password_hasher()
+    user = await users.get_by_email(form_data.username)
+    if user is None:
+        # Costs as much as a wrong password, so timing does not reveal
+        # which emails are registered
+        await hasher.verify_unknown(form_data.password)
+        raise invalid_credentials
+    
+    matched, new_hash = await hasher.verify(form_data.password, user.hashed_password)
+    if not matched:
+        raise invalid_credentials
+    if new_hash is not None:
+        # Hash parameters changed since this password was stored
+        await users.update_password(user.id, new_hash)
+    
     access_token = create_access_token(
         data={"sub": form_data.username},
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return model_response(Token(access_token=access_token, token_type="bearer"))
 
 @router.post("/register",
     response_model=UserResponse,
@@ -69,10 +94,21 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
                     "example": {"detail": "Email already registered"}
                 }
             }
+        },
+        503: {
+            "description": "Too many concurrent registrations",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Server busy, retry shortly"}
+                }
+            }
         }
     }
 )
-async def register(user: UserCreate):
+async def register(
+    user: UserCreate,
+    users: UserRepository = Depends(get_user_repository)
+):
     """
     Register a new user.
     
@@ -80,10 +116,61 @@ async def register(user: UserCreate):
     - **full_name**: User's full name
     - **password**: Strong password (min 8 characters)
     """
-    # Registration logic here
-    return {
-        "email": user.email,
-        "full_name": user.full_name,
-        "id": 1,  # Replace with actual user ID
-        "created_at": "2025-02-08T10:45:00"
+    if await users.get_by_email(user.email) is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    
+    # Hashing runs in the process pool, off the event loop
+    hashed_password = await get_password_hasher().hash(user.password)
+    try:
+        created = await users.create(user, hashed_password)
+    except DuplicateUserError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    
+    profile = UserResponse.model_validate(created.model_dump(exclude={"hashed_password"}))
+    return model_response(profile, status_code=status.HTTP_201_CREATED)
+
+@router.get("/me",
+    response_model=UserResponse,
+    summary="Get the authenticated user's profile",
+    responses={
+        404: {
+            "description": "The token's user no longer exists",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "User not found"}
+                }
+            }
+        },
+        401: {
+            "description": "Missing, invalid or revoked token",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Could not validate credentials"}
+                }
+            }
+        }
     }
+)
+async def me(current_user: TokenData = Depends(get_current_user)):
+    """
+    Return the profile of the user identified by the bearer token.
+    Served from the profile cache; it is invalidated when the user changes.
+    """
+    profile = await get_profile(current_user.email)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return model_response(profile)
+
+@router.post("/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke the current token"
+)
+async def logout(
+    current_user: TokenData = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Revoke the bearer token used for this request. It is rejected from
+    then on by every worker, including by any cached verification.
+    """
+    await token_verifier.revoke(token)
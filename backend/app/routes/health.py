@@ -1,7 +1,12 @@
 from fastapi import APIRouter, Request
 from app.models.schemas import HealthCheck
 from datetime import datetime
-from app.core.config import get_settings
+from app.config import get_settings
+from app.core.health import HealthStatus, get_health_status
+# Registers the event_loop component reported by /health/status
+import app.core.loop_monitor  # noqa: F401
+from app.core.http_cache import cacheable
+from app.core.responses import model_response
 
 settings = get_settings()
 router = APIRouter(prefix="/health", tags=["Health"])
@@ -24,6 +29,9 @@ router = APIRouter(prefix="/health", tags=["Health"])
         }
     }
 )
+# Probes poll this every few seconds; within max_age they get the same
+# response without reaching the handler
+@cacheable(max_age=5)
 async def health_check(request: Request):
     """
     Check the health status of the API.
@@ -33,8 +41,75 @@ async def health_check(request: Request):
         - **version**: API version
         - **timestamp**: Current server time
     """
+    return model_response(HealthCheck(
+        status="healthy",
+        version=settings.api_version,
+        timestamp=datetime.utcnow()
+    ))
+
+def _status_example(event_loop: str, **loop_details: float) -> dict:
+    """A /health/status report whose event_loop component has that status."""
+    checked = "2025-02-08T10:45:00Z"
     return {
-        "status": "healthy",
-        "version": settings.version,
-        "timestamp": datetime.utcnow()
+        "status": event_loop,
+        "version": "0.1.0",
+        "environment": "production",
+        "timestamp": checked,
+        "uptime_seconds": 3600.0,
+        "components": {
+            "database": {
+                "status": "healthy",
+                "latency_ms": 1.2,
+                "last_checked": checked,
+                "details": {"size": 10, "in_use": 1},
+            },
+            "event_loop": {
+                "status": event_loop,
+                "latency_ms": 0.1,
+                "last_checked": checked,
+                "details": loop_details,
+            },
+        },
+    }
+
+@router.get("/status",
+    response_model=HealthStatus,
+    summary="Check the health of each component",
+    responses={
+        200: {
+            "description": "No critical component is unhealthy",
+            "content": {
+                "application/json": {
+                    "examples": {
+                        "healthy": {
+                            "summary": "Every component is healthy",
+                            "value": _status_example(
+                                "healthy",
+                                p50_ms=0.2, p99_ms=1.8, slow_callbacks=0,
+                            ),
+                        },
+                        "event_loop_degraded": {
+                            "summary": "p99 loop lag over LOOP_LAG_DEGRADED",
+                            "value": _status_example(
+                                "degraded",
+                                p50_ms=0.3, p99_ms=140.2, slow_callbacks=3,
+                            ),
+                        },
+                    }
+                }
+            }
+        },
+        503: {"description": "A critical component is unhealthy"}
     }
+)
+async def health_status(request: Request):
+    """
+    Run the registered component checks (database, caches, event loop,
+    disk, log file, Sentry, ...) and report each one's status. The
+    event_loop component is degraded while p99 loop lag exceeds
+    LOOP_LAG_DEGRADED.
+
+    Checks run concurrently under one deadline, each with its own timeout,
+    result cache and circuit breaker; the report itself is cached briefly.
+    """
+    return await get_health_status(request)
@@ -0,0 +1,376 @@
+"""
+Production server for the GHN backend application.
+Runs the API under uvicorn with one worker process per available CPU.
+
+Usage (from backend/):
+    python -m app.serve
+    python -m app.serve --workers 4 --port 8080
+
+Settings come from app.config (API_HOST, API_PORT, API_WORKERS, ...);
+command-line options override them. Compared with ``uvicorn main:app``:
+
+- workers are sized to the CPUs this process may actually use (affinity
+  and the cgroup CPU quota, not the host's core count), and the password
+  hashing pool is split between them instead of each worker starting one
+  process per core;
+- uvloop and httptools are used when installed;
+- uvicorn's access log is off: RequestMetricsMiddleware already logs every
+  request;
+- idle keep-alive connections are held longer than a load balancer's idle
+  timeout, so the balancer never reuses a connection the server is closing;
+- with API_REUSE_PORT each worker binds its own socket with SO_REUSEPORT
+  and the kernel spreads connections over them, instead of all workers
+  competing to accept from one shared socket;
+- workers that die are restarted, with backoff while they keep failing;
+- on SIGTERM or SIGINT the workers stop accepting connections, finish
+  in-flight requests for up to API_GRACEFUL_TIMEOUT seconds and run the
+  application's shutdown before they are killed.
+
+Worker starts, exits and the live worker count are exported on /metrics.
+With more than one worker, metrics are shared through
+PROMETHEUS_MULTIPROC_DIR, which defaults to a temporary directory.
+"""
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from importlib.util import find_spec
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+from types import FrameType
+from typing import TYPE_CHECKING, List, Optional
+
+from app.config import Settings, get_settings
+from app.core.multiprocess import ENV_VAR, configure_multiprocess_dir, reset_multiprocess_dir
+
+if TYPE_CHECKING:
+    import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker exiting sooner than this after it started failed to start
+MIN_UPTIME = 10.0
+MAX_RESTART_DELAY = 30.0
+# Time allowed on top of API_GRACEFUL_TIMEOUT for the application's shutdown
+SHUTDOWN_GRACE = 10.0
+# Exit status of a worker whose application failed to start
+STARTUP_FAILURE = 3
+
+def available_cpus() -> int:
+    """CPUs this process may run on, after affinity and any cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+def _somaxconn() -> Optional[int]:
+    try:
+        with open("/proc/sys/net/core/somaxconn") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+def build_config(settings: Settings, workers: int) -> "uvicorn.Config":
+    import uvicorn
+
+    return uvicorn.Config(
+        "main:create_app",
+        factory=True,
+        host=settings.api_host,
+        port=settings.api_port,
+        workers=workers,
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        lifespan="on",
+        log_level=settings.log_level.lower(),
+        access_log=False,
+        server_header=False,
+        backlog=settings.api_backlog,
+        timeout_keep_alive=settings.api_keepalive_timeout,
+        timeout_graceful_shutdown=settings.api_graceful_timeout,
+        limit_max_requests=settings.api_max_requests,
+    )
+
+def bind_reuse_port(host: str, port: int) -> socket.socket:
+    """A socket bound with SO_REUSEPORT, one per worker."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+def _run_worker(config: "uvicorn.Config", sock: Optional[socket.socket], reuse_port: bool) -> None:
+    """Worker process entry point: serve until SIGTERM, then drain."""
+    import uvicorn
+
+    # A spawned interpreter starts with no logging configured
+    config.configure_logging()
+    if reuse_port:
+        sock = bind_reuse_port(config.host, config.port)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    if not server.started:
+        sys.exit(STARTUP_FAILURE)
+
+class LifecycleMetrics:
+    """Worker lifecycle metrics, recorded by the supervising process."""
+
+    def __init__(self) -> None:
+        # Imported here: the multi-process directory must be configured first
+        from prometheus_client import Counter, Gauge
+
+        self.starts = Counter(
+            'server_worker_starts', 'Worker processes started', ['reason']
+        )
+        self.exits = Counter(
+            'server_worker_exits', 'Worker processes exited, by cause', ['reason']
+        )
+        self.workers = Gauge(
+            'server_workers', 'Live worker processes', multiprocess_mode='livesum'
+        )
+
+def exit_reason(exitcode: int) -> str:
+    if exitcode == 0:
+        return "exit"  # e.g. recycled after API_MAX_REQUESTS
+    if exitcode < 0:
+        return "signal"  # killed from outside, e.g. by the OOM killer
+    return "error"
+
+@dataclass
+class _Worker:
+    process: BaseProcess
+    started: float
+
+class Supervisor:
+    """
+    Keeps ``workers`` uvicorn worker processes running until told to stop.
+
+    A worker that exits is replaced. While a slot's workers keep exiting
+    within MIN_UPTIME each restart waits twice as long as the one before, up
+    to MAX_RESTART_DELAY. A worker failing before any has stayed up for
+    MIN_UPTIME makes the supervisor give up instead. On SIGTERM or SIGINT
+    every worker gets SIGTERM and has ``graceful_timeout`` plus
+    SHUTDOWN_GRACE seconds to drain before it is killed; a second SIGINT
+    kills them at once.
+    """
+
+    def __init__(
+        self,
+        config: "uvicorn.Config",
+        workers: int,
+        metrics: LifecycleMetrics,
+        sock: Optional[socket.socket] = None,
+        reuse_port: bool = False,
+        graceful_timeout: float = 30.0,
+    ):
+        self.config = config
+        self.metrics = metrics
+        self.sock = sock
+        self.reuse_port = reuse_port
+        self.graceful_timeout = graceful_timeout
+        self.max_requests = config.limit_max_requests
+        self.slots: List[Optional[_Worker]] = [None] * workers
+        self.failures = [0] * workers
+        self.restart_at = [0.0] * workers
+        self.booted = False
+        self.failed = False
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = threading.Event()
+        self._force = threading.Event()
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self._stop.is_set() and sig == signal.SIGINT:
+            self._force.set()
+        self._stop.set()
+
+    def _live(self) -> List[_Worker]:
+        return [worker for worker in self.slots if worker is not None]
+
+    def _spawn(self, slot: int, reason: str) -> None:
+        if self.max_requests:
+            # Spread recycling out so workers do not all restart together
+            self.config.limit_max_requests = self.max_requests + random.randint(0, self.max_requests // 10)
+        process = self._context.Process(
+            target=_run_worker,
+            args=(self.config, self.sock, self.reuse_port),
+            name=f"ghn-worker-{slot}",
+        )
+        process.start()
+        self.slots[slot] = _Worker(process, time.monotonic())
+        self.metrics.starts.labels(reason).inc()
+        self.metrics.workers.set(len(self._live()))
+
+    def _reap(self, slot: int, reason: Optional[str] = None) -> _Worker:
+        worker = self.slots[slot]
+        worker.process.join()
+        self.slots[slot] = None
+        self.metrics.exits.labels(reason or exit_reason(worker.process.exitcode)).inc()
+        self.metrics.workers.set(len(self._live()))
+        return worker
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        for slot, worker in enumerate(self.slots):
+            if worker is not None:
+                if worker.process.exitcode is None:
+                    if not self.booted and now - worker.started >= MIN_UPTIME:
+                        self.booted = True
+                    continue
+                self._reap(slot)
+                code = worker.process.exitcode
+                if code != 0 and not self.booted:
+                    # Most likely a configuration error every worker will hit
+                    logger.error("Worker %d failed before any worker started; stopping", worker.process.pid)
+                    self.failed = True
+                    self._stop.set()
+                    return
+                if now - worker.started < MIN_UPTIME:
+                    self.failures[slot] += 1
+                else:
+                    self.failures[slot] = 0
+                delay = min(MAX_RESTART_DELAY, 0.5 * 2 ** (self.failures[slot] - 1)) if self.failures[slot] else 0.0
+                self.restart_at[slot] = now + delay
+                level = logging.INFO if code == 0 else logging.WARNING
+                logger.log(level, "Worker %d exited with code %s; restarting in %.1fs", worker.process.pid, code, delay)
+            if now >= self.restart_at[slot]:
+                self._spawn(slot, "restart")
+
+    def _drain(self) -> None:
+        live = {slot: worker for slot, worker in enumerate(self.slots) if worker is not None}
+        logger.info("Draining %d worker(s) for up to %ss", len(live), self.graceful_timeout)
+        for worker in live.values():
+            worker.process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + SHUTDOWN_GRACE
+        while live and not self._force.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait([worker.process.sentinel for worker in live.values()], timeout=min(remaining, 0.5))
+            for slot in [slot for slot, worker in live.items() if worker.process.exitcode is not None]:
+                self._reap(slot)
+                del live[slot]
+        for slot, worker in live.items():
+            logger.warning("Worker %d did not drain in time; killing it", worker.process.pid)
+            worker.process.kill()
+            self._reap(slot, "killed")
+
+    def run(self) -> int:
+        """Supervise the workers until a shutdown signal; returns the exit status."""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.handle_exit)
+        logger.info("Started supervisor process [%d]", os.getpid())
+        for slot in range(len(self.slots)):
+            self._spawn(slot, "initial")
+
+        while not self._stop.is_set():
+            wait([worker.process.sentinel for worker in self._live()], timeout=0.5)
+            self._check()
+
+        self._drain()
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("Stopped supervisor process [%d]", os.getpid())
+        return 1 if self.failed else 0
+
+def main() -> int:
+    settings = get_settings()
+    cpus = available_cpus()
+    workers = settings.api_workers or cpus
+    hash_workers = settings.password_hash_workers
+
+    # Settings are read again by each worker; pass derived values through
+    # the environment so they see the same ones
+    temporary_dir = None
+    if workers > 1 and not settings.prometheus_multiproc_dir:
+        temporary_dir = tempfile.mkdtemp(prefix="ghn-metrics-")
+        os.environ[ENV_VAR] = temporary_dir
+    os.environ["API_WORKERS"] = str(workers)
+    if hash_workers is None:
+        hash_workers = max(1, cpus // workers)
+        os.environ["PASSWORD_HASH_WORKERS"] = str(hash_workers)
+    get_settings.cache_clear()
+
+    metrics_dir = configure_multiprocess_dir()
+    if metrics_dir is not None:
+        reset_multiprocess_dir(metrics_dir)
+    metrics = LifecycleMetrics()
+
+    config = build_config(get_settings(), workers)
+    somaxconn = _somaxconn()
+    if somaxconn is not None and somaxconn < config.backlog:
+        logger.warning("Listen backlog %d is capped by net.core.somaxconn=%d", config.backlog, somaxconn)
+
+    try:
+        if workers > 1 and not settings.secret_key:
+            logger.error("SECRET_KEY must be set to run more than one worker: each would sign tokens with its own key")
+            return STARTUP_FAILURE
+        logger.info(
+            "Serving with %d worker(s) on %d CPU(s), loop=%s http=%s, %d password hashing process(es) per worker",
+            workers, cpus, config.loop, config.http, hash_workers,
+        )
+        if workers == 1:
+            import uvicorn
+
+            metrics.starts.labels("initial").inc()
+            metrics.workers.set(1)
+            server = uvicorn.Server(config)
+            server.run()
+            return 0 if server.started else STARTUP_FAILURE
+
+        if settings.api_reuse_port:
+            # Fail here rather than in every worker if the port is taken
+            bind_reuse_port(config.host, config.port).close()
+            logger.info("Listening on %s:%d with SO_REUSEPORT", config.host, config.port)
+            sock = None
+        else:
+            sock = config.bind_socket()
+        supervisor = Supervisor(
+            config,
+            workers,
+            metrics,
+            sock=sock,
+            reuse_port=settings.api_reuse_port,
+            graceful_timeout=settings.api_graceful_timeout,
+        )
+        return supervisor.run()
+    finally:
+        if temporary_dir is not None:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--host", help="overrides API_HOST")
+    parser.add_argument("--port", type=int, help="overrides API_PORT")
+    parser.add_argument("--workers", type=int, help="overrides API_WORKERS; 0 sizes to the available CPUs")
+    parser.add_argument("--reuse-port", action=argparse.BooleanOptionalAction, default=None, help="overrides API_REUSE_PORT")
+    args = parser.parse_args()
+
+    overrides = {
+        "API_HOST": args.host,
+        "API_PORT": args.port,
+        "API_WORKERS": args.workers,
+        "API_REUSE_PORT": None if args.reuse_port is None else str(args.reuse_port).lower(),
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+    sys.exit(main())
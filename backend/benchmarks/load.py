@@ -0,0 +1,338 @@
+"""
+Open-loop load generator for the API.
+
+Sends requests at a fixed arrival rate, whether or not earlier ones have
+finished, and reports latency percentiles and throughput per route.
+Latency is measured from when each request was scheduled, not from when it
+was actually sent. If the generator or the server falls behind, that
+queueing shows up in the numbers instead of quietly lowering the offered
+load.
+
+Targets:
+- in-process (default): drives the ASGI app through httpx, lifespan
+  included. No network is involved, but the app and the generator share
+  one event loop.
+- --uvicorn: starts ``uvicorn main:app`` on a free local port and drives it
+  over HTTP.
+- --serve: the same with the production launcher, ``python -m app.serve``.
+- --url: drives an already running server.
+
+Results can be written as JSON and compared against an earlier run:
+    python -m benchmarks.load --rps 200 --duration 30 --output before.json
+    python -m benchmarks.load --rps 200 --duration 30 --compare before.json
+
+Usage (from backend/):
+    python -m benchmarks.load --rps 100 --duration 20 --routes health_check,me
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+@dataclass
+class Context:
+    """Per-run state shared by the route builders, e.g. the test user's token."""
+    email: str
+    password: str
+    token: Optional[str] = None
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    path: str
+    weight: float
+    build: Callable[[Context], Dict[str, Any]] = lambda ctx: {}
+    expected_status: int = 200
+
+def _bearer(ctx: Context) -> Dict[str, Any]:
+    return {"headers": {"Authorization": f"Bearer {ctx.token}"}}
+
+def _login_form(ctx: Context) -> Dict[str, Any]:
+    return {"data": {"username": ctx.email, "password": ctx.password}}
+
+ROUTES: Dict[str, Route] = {
+    route.name: route
+    for route in (
+        Route("health_check", "GET", "/health/check", weight=5),
+        Route("me", "GET", "/auth/me", weight=4, build=_bearer),
+        Route("login", "POST", "/auth/login", weight=1, build=_login_form),
+        Route("metrics", "GET", "/metrics", weight=0),
+    )
+}
+DEFAULT_ROUTES = "health_check,me,login"
+
+@dataclass
+class RouteResult:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(result: RouteResult, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(result.latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": result.errors,
+        "statuses": {str(code): count for code, count in sorted(result.statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+async def setup_user(client: httpx.AsyncClient, ctx: Context) -> None:
+    """Register a fresh user and log in, so authenticated routes have a token."""
+    response = await client.post(
+        "/auth/register",
+        json={"email": ctx.email, "full_name": "Load Test", "password": ctx.password},
+    )
+    if response.status_code not in (201, 400):
+        raise RuntimeError(f"Registering the load test user failed: {response.status_code} {response.text}")
+    response = await client.post("/auth/login", data={"username": ctx.email, "password": ctx.password})
+    response.raise_for_status()
+    ctx.token = response.json()["access_token"]
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    routes: List[Route],
+    ctx: Context,
+    rps: float,
+    duration: float,
+    max_inflight: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Offer rps requests per second for duration seconds and collect results."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    weights = [route.weight for route in routes]
+    results = {route.name: RouteResult() for route in routes}
+    total = int(rps * duration)
+    interval = 1.0 / rps
+    inflight: set = set()
+    dropped = 0
+
+    async def send(route: Route, scheduled: float) -> None:
+        result = results[route.name]
+        try:
+            response = await client.request(route.method, route.path, **route.build(ctx))
+        except httpx.HTTPError:
+            result.errors += 1
+            return
+        result.latencies.append(loop.time() - scheduled)
+        result.statuses[response.status_code] += 1
+        if response.status_code != route.expected_status:
+            result.errors += 1
+
+    start = loop.time()
+    sent = 0
+    while sent < total:
+        # Fire everything that is due, then sleep until the next slot
+        due = min(total, int((loop.time() - start) / interval) + 1)
+        while sent < due:
+            scheduled = start + sent * interval
+            sent += 1
+            if len(inflight) >= max_inflight:
+                dropped += 1
+                continue
+            route = rng.choices(routes, weights)[0]
+            task = loop.create_task(send(route, scheduled))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        await asyncio.sleep(max(0.0, start + sent * interval - loop.time()))
+    if inflight:
+        await asyncio.gather(*inflight)
+    elapsed = loop.time() - start
+
+    overall = RouteResult()
+    for result in results.values():
+        overall.latencies.extend(result.latencies)
+        overall.statuses.update(result.statuses)
+        overall.errors += result.errors
+    return {
+        "routes": {name: summarize(result, elapsed) for name, result in results.items()},
+        "total": {**summarize(overall, elapsed), "offered": total, "dropped": dropped},
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+@asynccontextmanager
+async def in_process_client() -> AsyncIterator[httpx.AsyncClient]:
+    from main import create_app
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+
+@asynccontextmanager
+async def http_client(base_url: str, max_inflight: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        yield client
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@asynccontextmanager
+async def local_server(command: List[str]) -> AsyncIterator[str]:
+    """Run a server command from backend/ on a free port for the duration of the block."""
+    port = _free_port()
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, "-m", *command, "--port", str(port)], cwd=backend_dir)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            for _ in range(300):
+                if process.poll() is not None:
+                    raise RuntimeError(f"{command[0]} exited during startup")
+                try:
+                    if (await client.get("/health/check")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError(f"{command[0]} did not become ready within 30s")
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'route':<14}{'reqs':>8}{'errors':>8}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    rows = list(report["routes"].items()) + [("total", report["total"])]
+    for name, r in rows:
+        fmt = lambda value: f"{value:>8.1f}ms" if value is not None else f"{'-':>10}"
+        print(
+            f"{name:<14}{r['requests']:>8}{r['errors']:>8}{r['throughput_rps']:>9.1f}"
+            f"{fmt(r['p50_ms'])}{fmt(r['p95_ms'])}{fmt(r['p99_ms'])}"
+        )
+    if report["total"]["dropped"]:
+        print(f"\n{report['total']['dropped']} requests not sent: --max-inflight reached")
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Percentile and throughput changes per route relative to a saved run."""
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'}:")
+    print(f"{'route':<14}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}")
+    for name, r in list(report["routes"].items()) + [("total", report["total"])]:
+        base = baseline["routes"].get(name) if name != "total" else baseline["total"]
+        if not base:
+            continue
+        def change(key: str) -> str:
+            if not r.get(key) or not base.get(key):
+                return f"{'-':>10}"
+            return f"{(r[key] / base[key] - 1) * 100:>+9.1f}%"
+        print(f"{name:<14}{change('p50_ms')}{change('p95_ms')}{change('p99_ms')}{change('throughput_rps')}")
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    routes = [ROUTES[name] for name in args.routes.split(",")]
+    if not any(route.weight for route in routes):
+        routes = [Route(r.name, r.method, r.path, 1, r.build, r.expected_status) for r in routes]
+    ctx = Context(email=f"loadtest-{uuid.uuid4().hex[:12]}@example.com", password=uuid.uuid4().hex)
+
+    if args.url:
+        target = args.url
+        client_cm = http_client(args.url, args.max_inflight)
+        server_cm = None
+    elif args.uvicorn:
+        target = "uvicorn"
+        extra_args = args.uvicorn_args.split() if args.uvicorn_args else []
+        server_cm = local_server(["uvicorn", "main:app", "--log-level", "warning", *extra_args])
+        client_cm = None
+    elif args.serve:
+        target = "app.serve"
+        server_cm = local_server(["app.serve"])
+        client_cm = None
+    else:
+        target = "in-process"
+        client_cm = in_process_client()
+        server_cm = None
+
+    async def drive(client: httpx.AsyncClient) -> Dict[str, Any]:
+        await setup_user(client, ctx)
+        if args.warmup:
+            await run_open_loop(client, routes, ctx, args.rps, args.warmup, args.max_inflight, args.seed)
+        return await run_open_loop(client, routes, ctx, args.rps, args.duration, args.max_inflight, args.seed)
+
+    if server_cm is not None:
+        async with server_cm as base_url:
+            async with http_client(base_url, args.max_inflight) as client:
+                report = await drive(client)
+    else:
+        async with client_cm as client:
+            report = await drive(client)
+
+    report["meta"] = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": target,
+        "rps": args.rps,
+        "duration": args.duration,
+        "routes": args.routes,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rps", type=float, default=100, help="offered requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unmeasured load first")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help=f"comma-separated, from: {', '.join(ROUTES)}")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="requests beyond this are counted as dropped")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the route mix")
+    parser.add_argument("--url", help="drive a running server at this base URL")
+    parser.add_argument("--uvicorn", action="store_true", help="start uvicorn main:app locally and drive it")
+    parser.add_argument("--uvicorn-args", default="", help="extra uvicorn arguments, e.g. '--workers 4'")
+    parser.add_argument("--serve", action="store_true", help="start python -m app.serve locally and drive it")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
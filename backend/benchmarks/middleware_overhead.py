@@ -0,0 +1,173 @@
+"""
+Microbenchmark for per-request middleware overhead.
+
+Compares the previous two-layer BaseHTTPMiddleware stack (the ``log_requests``
+HTTP middleware plus ``PrometheusMiddleware``) with the single pure-ASGI
+RequestMetricsMiddleware. Requests are driven straight through the ASGI
+interface, so no network or server time is included.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Callable, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.logging import logger
+from app.core.monitoring import RequestMetricsMiddleware, overhead_stats
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+def build_legacy_app() -> FastAPI:
+    """The request logging and metrics stack as it was before RequestMetricsMiddleware."""
+    app = build_app()
+    registry = CollectorRegistry()
+    request_count = Counter(
+        'http_request_count', 'HTTP Request Count',
+        ['method', 'endpoint', 'status_code'], registry=registry
+    )
+    request_latency = Histogram(
+        'http_request_latency_seconds', 'HTTP Request Latency',
+        ['method', 'endpoint'], registry=registry
+    )
+
+    class PrometheusMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next: Callable):
+            method = request.method
+            path = request.url.path
+            start_time = time.time()
+            response = await call_next(request)
+            duration = time.time() - start_time
+            status_code = response.status_code
+            request_count.labels(method=method, endpoint=path, status_code=status_code).inc()
+            request_latency.labels(method=method, endpoint=path).observe(duration)
+            return response
+
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        logger.info(
+            f"Incoming {request.method} {request.url.path}",
+            extra={
+                "headers": dict(request.headers),
+                "client": request.client.host if request.client else "unknown",
+            }
+        )
+        response = await call_next(request)
+        duration = time.time() - start_time
+        logger.info(
+            f"Completed {request.method} {request.url.path} - {response.status_code}",
+            extra={
+                "duration": f"{duration:.2f}s",
+                "status_code": response.status_code,
+            }
+        )
+        return response
+
+    return app
+
+def build_asgi_app() -> FastAPI:
+    app = build_app()
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [
+        (b"host", b"localhost"),
+        (b"user-agent", b"benchmark"),
+        (b"accept", b"*/*"),
+    ],
+    "client": ("127.0.0.1", 50000),
+    "server": ("127.0.0.1", 8000),
+}
+
+async def run(app: FastAPI, requests: int) -> List[int]:
+    """Send requests through the app and return per-request durations in ns."""
+    async def send(message):
+        pass
+
+    durations = []
+    for _ in range(requests):
+        # First receive() delivers the (empty) body; later calls wait, as a
+        # connected client would, until the middleware stops listening.
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        start = time.perf_counter_ns()
+        await app(dict(SCOPE), receive, send)
+        durations.append(time.perf_counter_ns() - start)
+    return durations
+
+def summarize(durations: List[int]) -> dict:
+    durations = sorted(durations)
+    return {
+        "mean_us": statistics.fmean(durations) / 1000,
+        "p50_us": durations[len(durations) // 2] / 1000,
+        "p99_us": durations[int(len(durations) * 0.99)] / 1000,
+    }
+
+async def main(requests: int, warmup: int) -> None:
+    stacks = {
+        "bare": build_app(),
+        "legacy (2x BaseHTTPMiddleware)": build_legacy_app(),
+        "RequestMetricsMiddleware": build_asgi_app(),
+    }
+    results = {}
+    for name, app in stacks.items():
+        await run(app, warmup)
+        results[name] = summarize(await run(app, requests))
+
+    baseline = results["bare"]["mean_us"]
+    print(f"{'stack':<34}{'mean':>10}{'p50':>10}{'p99':>10}{'overhead':>11}")
+    for name, r in results.items():
+        print(
+            f"{name:<34}{r['mean_us']:>8.1f}us{r['p50_us']:>8.1f}us"
+            f"{r['p99_us']:>8.1f}us{r['mean_us'] - baseline:>9.1f}us"
+        )
+    print(f"\nIn-process overhead counter: {overhead_stats.mean_ns / 1000:.1f}us/request")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Measure the middleware, not handler I/O
+    logger.handlers.clear()
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    asyncio.run(main(args.requests, args.warmup))
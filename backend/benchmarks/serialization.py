@@ -0,0 +1,93 @@
+"""
+Microbenchmark for per-response JSON serialization.
+
+For every schema in app.models.schemas, times turning a handler's return
+value into response bytes three ways:
+
+- validated: a dict validated against response_model, then rendered by
+  Starlette's stdlib-json JSONResponse (FastAPI's default path)
+- validated+fast: the same validation, rendered by FastJSONResponse
+- model: an already-validated model returned via model_response(), which
+  skips validation and uses the model's own serializer
+
+Usage (from backend/):
+    python -m benchmarks.serialization --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Type
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, model_response
+from app.models import schemas
+
+NOW = datetime(2025, 2, 8, 10, 45, tzinfo=timezone.utc)
+
+SAMPLES: Dict[Type[BaseModel], Dict[str, Any]] = {
+    schemas.UserBase: {"email": "user@example.com", "full_name": "John Doe"},
+    schemas.UserCreate: {"email": "user@example.com", "full_name": "John Doe", "password": "s3cret-pass"},
+    schemas.UserResponse: {"email": "user@example.com", "full_name": "John Doe", "id": 1, "created_at": NOW},
+    schemas.UserInDB: {
+        "email": "user@example.com", "full_name": "John Doe", "id": 1, "created_at": NOW,
+        "hashed_password": "scrypt$16384$8$1$c2FsdHNhbHRzYWx0c2FsdA$a2V5a2V5a2V5a2V5a2V5a2V5a2V5a2V5a2U",
+    },
+    schemas.Token: {"access_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9." + "x" * 160, "token_type": "bearer"},
+    schemas.TokenData: {"email": "user@example.com"},
+    schemas.HealthCheck: {"status": "healthy", "version": "0.1.0", "timestamp": NOW},
+    schemas.ErrorResponse: {"detail": "Email already registered", "status_code": 400, "timestamp": NOW},
+}
+
+async def time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """Mean microseconds per call; func may return an awaitable."""
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+async def bench_schema(schema: Type[BaseModel], data: Dict[str, Any], iterations: int) -> Dict[str, float]:
+    field = create_response_field(name=f"Response_{schema.__name__}", type_=schema)
+    model = schema.model_validate(data)
+
+    async def validated():
+        content = await serialize_response(field=field, response_content=data)
+        return JSONResponse(content).body
+
+    async def validated_fast():
+        content = await serialize_response(field=field, response_content=data)
+        return FastJSONResponse(content).body
+
+    def model_only():
+        return model_response(model).body
+
+    # All three paths must agree on the JSON they produce
+    assert FastJSONResponse(await serialize_response(field=field, response_content=data)).body \
+        == model_only()
+
+    results = {}
+    for name, func in (("validated", validated), ("validated+fast", validated_fast), ("model", model_only)):
+        await time_per_call(func, iterations // 10)
+        results[name] = await time_per_call(func, iterations)
+    return results
+
+async def main(iterations: int) -> None:
+    print(f"{'schema':<16}{'validated':>12}{'validated+fast':>16}{'model':>10}{'speedup':>9}")
+    for schema, data in SAMPLES.items():
+        r = await bench_schema(schema, data, iterations)
+        print(
+            f"{schema.__name__:<16}{r['validated']:>10.2f}us{r['validated+fast']:>14.2f}us"
+            f"{r['model']:>8.2f}us{r['validated'] / r['model']:>8.1f}x"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
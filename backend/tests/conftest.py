@@ -0,0 +1,60 @@
+"""
+Shared fixtures for the GHN backend tests.
+
+Settings are read from the environment once, when the app modules are first
+imported, so the test environment is set up here before any of them are:
+a throwaway SQLite database, cheap scrypt parameters and an admin token.
+The tests run from a temporary directory so the log files and the SQLite
+database never land in the source tree.
+"""
+import os
+import tempfile
+import uuid
+
+import httpx
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="ghn-tests-")
+os.chdir(_workdir)
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    "SECRET_KEY": "test-secret-key-of-at-least-32-bytes",
+    "ADMIN_TOKEN": "test-admin-token",
+    "PASSWORD_HASH_N": "1024",
+    "PASSWORD_HASH_WORKERS": "1",
+    "API_WORKERS": "1",
+    "HEALTH_SAMPLE_INTERVAL": "60",
+})
+for name in ("CACHE_URL", "PROMETHEUS_MULTIPROC_DIR", "SENTRY_DSN"):
+    os.environ.pop(name, None)
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def app():
+    from app.factory import create_app
+    application = create_app()
+    async with application.router.lifespan_context(application):
+        yield application
+
+@pytest.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as client:
+        yield client
+
+PASSWORD = "correct-horse"
+
+@pytest.fixture
+async def user_email(client):
+    """Email of a freshly registered user whose password is PASSWORD."""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/auth/register", json={
+        "email": email, "full_name": "Test User", "password": PASSWORD,
+    })
+    assert response.status_code == 201, response.text
+    return email
@@ -0,0 +1,32 @@
+import pytest
+
+from app.routes import admin
+
+pytestmark = pytest.mark.anyio
+
+ADMIN_TOKEN = "test-admin-token"
+
+async def get_latency(client, token=None):
+    headers = {"X-Admin-Token": token} if token is not None else {}
+    return await client.get("/admin/latency", headers=headers)
+
+async def test_admin_routes_require_token(client):
+    assert (await get_latency(client)).status_code == 403
+
+async def test_admin_routes_reject_wrong_token(client):
+    response = await get_latency(client, "not-the-token")
+    assert response.status_code == 403
+
+async def test_admin_routes_accept_token(client):
+    response = await get_latency(client, ADMIN_TOKEN)
+    assert response.status_code == 200
+    assert "classes" in response.json()
+
+async def test_admin_routes_hidden_without_token_setting(client, monkeypatch):
+    monkeypatch.setattr(admin.settings, "admin_token", None)
+    response = await get_latency(client, ADMIN_TOKEN)
+    assert response.status_code == 404
+
+async def test_admin_routes_not_in_schema(client):
+    paths = (await client.get("/openapi.json")).json()["paths"]
+    assert not any(path.startswith("/admin") for path in paths)
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    FixedLimit,
+    GradientLimit,
+    get_admission_controller,
+    skip_latency_sample,
+)
+
+pytestmark = pytest.mark.anyio
+
+def controller(limit: int = 1) -> AdmissionController:
+    return AdmissionController(
+        ("api", "health"), reserved=("health",),
+        initial_limit=limit, min_limit=1, max_limit=8, reserved_limit=1,
+    )
+
+class Gate:
+    """An ASGI app that holds each request until released."""
+
+    def __init__(self):
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.entered.set()
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+async def call(app, path: str = "/api"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path}
+    await app(scope, receive, send)
+    return messages
+
+def classify(path: str) -> str:
+    return "health" if path.startswith("/health") else "api"
+
+async def test_sheds_over_limit_and_keeps_health_lane():
+    gate = Gate()
+    lanes = controller(limit=1)
+    app = AdmissionControlMiddleware(gate, lanes, classify, retry_after=2)
+
+    held = asyncio.ensure_future(call(app))
+    await gate.entered.wait()
+    shed = await call(app)
+    gate.release.set()
+    health = await call(app, "/health/check")
+    await held
+
+    assert shed[0]["status"] == 503
+    assert dict(shed[0]["headers"])[b"retry-after"] == b"2"
+    assert health[0]["status"] == 200
+    assert lanes.lane("api").stats.shed == 1
+    assert lanes.lane("api").inflight == 0
+
+async def test_shed_responses_do_not_share_headers():
+    lanes = controller()
+    lanes.lane("api").limiter = FixedLimit(0)
+    app = AdmissionControlMiddleware(Gate(), lanes, classify)
+
+    first = (await call(app))[0]["headers"]
+    first.append((b"x-request-id", b"stale"))
+    second = (await call(app))[0]["headers"]
+
+    assert second is not first
+    assert b"x-request-id" not in dict(second)
+
+async def test_failed_and_unsampled_requests_release_without_sample():
+    lanes = controller(limit=4)
+    lane = lanes.lane("api")
+
+    async def failing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    async def streamed(scope, receive, send):
+        skip_latency_sample(scope)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    with pytest.raises(RuntimeError):
+        await call(AdmissionControlMiddleware(failing, lanes, classify))
+    await call(AdmissionControlMiddleware(streamed, lanes, classify))
+
+    assert lane.inflight == 0
+    assert lane.limiter.baseline is None
+
+def test_gradient_limit_backs_off_when_latency_rises():
+    limit = GradientLimit(initial=32, min_limit=4, max_limit=64)
+    for _ in range(50):
+        limit.on_sample(0.01, inflight=32)
+    steady = limit.limit
+    for _ in range(20):
+        limit.on_sample(0.2, inflight=steady)
+
+    assert steady >= 32
+    assert limit.limit < steady / 2
+    assert limit.limit >= 4
+
+async def test_shed_responses_through_app_get_one_request_id(
+    client, monkeypatch
+):
+    lane = get_admission_controller().lane("other")
+    monkeypatch.setattr(lane, "limiter", FixedLimit(0))
+
+    responses = [await client.get("/openapi.json") for _ in range(5)]
+
+    request_ids = set()
+    for response in responses:
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert len(response.headers.get_list("x-request-id")) == 1
+        request_ids.add(response.headers["x-request-id"])
+    assert len(request_ids) == 5
+    assert (await client.get("/health/check")).status_code == 200
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.passwords import (
+    HashParams,
+    get_password_hasher,
+    parse_hash,
+    unmatchable_hash,
+    verify_password,
+)
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "correct-horse"
+
+async def login(client, email, password=PASSWORD):
+    form = {"username": email, "password": password}
+    return await client.post("/auth/login", data=form)
+
+async def test_login_returns_token(client, user_email):
+    response = await login(client, user_email)
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+async def test_unknown_email_costs_the_same_as_wrong_password(
+    client, user_email
+):
+    hasher = get_password_hasher()
+
+    before = hasher.stats.submitted
+    wrong = await login(client, user_email, "not-it")
+    wrong_hashes = hasher.stats.submitted - before
+
+    before = hasher.stats.submitted
+    unknown = await login(client, "nobody@example.com", "not-it")
+    unknown_hashes = hasher.stats.submitted - before
+
+    assert wrong.status_code == unknown.status_code == 401
+    assert wrong.json() == unknown.json()
+    # Both run exactly one scrypt verify, so they take as long
+    assert wrong_hashes == unknown_hashes == 1
+
+def test_unmatchable_hash_costs_a_full_verify():
+    params = HashParams(n=1024, r=8, p=1)
+    encoded = unmatchable_hash(params)
+    assert parse_hash(encoded)[0] == params
+    assert verify_password(PASSWORD, encoded, params) == (False, None)
@@ -0,0 +1,24 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_status_reports_event_loop_component(client):
+    response = await client.get("/health/status")
+    assert response.status_code == 200
+    components = response.json()["components"]
+    assert components["event_loop"]["status"] in ("healthy", "degraded")
+    assert "p99_ms" in components["event_loop"]["details"]
+    assert "database" in components
+
+async def test_documented_examples_match_handlers(client):
+    paths = (await client.get("/openapi.json")).json()["paths"]
+
+    def content(path):
+        return paths[path]["get"]["responses"]["200"]["content"]
+
+    check = content("/health/check")["application/json"]["example"]
+    assert check["status"] == "healthy"
+    examples = content("/health/status")["application/json"]["examples"]
+    degraded = examples["event_loop_degraded"]["value"]
+    assert degraded["components"]["event_loop"]["status"] == "degraded"
+    assert examples["healthy"]["value"]["status"] == "healthy"
@@ -0,0 +1,112 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.cache import AsyncTTLCache
+from app.core.http_cache import (
+    HTTPCacheMiddleware,
+    HTTPCacheStats,
+    cacheable,
+    etag_matches,
+    http_cache_stats,
+    response_cache,
+    strong_etag,
+)
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+def test_etag_matching_is_weak():
+    etag = strong_etag(b"body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(b"W/" + etag, etag)
+    assert etag_matches(b'"other", ' + etag, etag)
+    assert etag_matches(b"*", etag)
+    assert not etag_matches(b'"other"', etag)
+
+async def test_openapi_revalidates_with_etag(client):
+    first = await client.get("/openapi.json")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    same = await client.get("/openapi.json", headers={"If-None-Match": etag})
+    weak = await client.get(
+        "/openapi.json", headers={"If-None-Match": f"W/{etag}"}
+    )
+    other = await client.get(
+        "/openapi.json", headers={"If-None-Match": '"something-else"'}
+    )
+
+    assert same.status_code == weak.status_code == 304
+    assert same.content == b""
+    assert same.headers["etag"] == etag
+    assert other.status_code == 200
+    assert other.content == first.content
+
+async def test_max_age_responses_are_served_from_cache(client):
+    before = http_cache_stats.served_from_cache
+    first = await client.get("/health/check")
+    second = await client.get("/health/check")
+
+    assert first.headers["cache-control"] == "public, max-age=5"
+    assert second.content == first.content
+    assert http_cache_stats.served_from_cache == before + 1
+
+    etag = first.headers["etag"]
+    revalidated = await client.get(
+        "/health/check", headers={"If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+
+async def call(app, path: str, method: str = "GET"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": method, "path": path, "root_path": "",
+        "query_string": b"", "headers": [],
+    }
+    await app(scope, receive, send)
+    return messages
+
+async def test_only_cacheable_get_200s_are_tagged():
+    @cacheable(max_age=60)
+    async def missing(request):
+        return PlainTextResponse("gone", status_code=404)
+
+    @cacheable(max_age=60)
+    async def found(request):
+        return PlainTextResponse("here")
+
+    async def plain(request):
+        return PlainTextResponse("plain")
+
+    stats = HTTPCacheStats()
+    app = HTTPCacheMiddleware(
+        Starlette(routes=[
+            Route("/missing", missing),
+            Route("/found", found, methods=["GET", "POST"]),
+            Route("/plain", plain),
+        ]),
+        cache=AsyncTTLCache("test", ttl=0, max_entries=8),
+        stats=stats,
+    )
+
+    for path, method in (("/missing", "GET"), ("/plain", "GET"),
+                         ("/found", "POST")):
+        headers = dict((await call(app, path, method))[0]["headers"])
+        assert b"etag" not in headers, path
+    found_headers = dict((await call(app, "/found"))[0]["headers"])
+    assert found_headers[b"etag"] == strong_etag(b"here")
+    assert stats.stored == 1
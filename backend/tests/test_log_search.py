@@ -0,0 +1,79 @@
+import pytest
+
+from app.core import log_search
+from app.core.log_search import FileIndex, LogQuery, LogSearch, parse_level
+
+def record(second: int, level: str, message: str) -> str:
+    minute, second = divmod(second, 60)
+    stamp = f"2025-02-08 04:{minute:02d}:{second:02d},000"
+    return f"{stamp} - ghn - {level} - {message}\n"
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Several blocks from a few kilobytes of log
+    monkeypatch.setattr(log_search, "BLOCK_BYTES", 512)
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "ghn.log"
+    path.write_text("".join(
+        record(i, "INFO", f"Completed GET /items/{i} - 200")
+        for i in range(100)
+    ))
+    return path
+
+def search(searcher: LogSearch, **filters) -> list:
+    return list(searcher.search(LogQuery(**filters)))
+
+def index_of(searcher: LogSearch) -> FileIndex:
+    return searcher.refresh()["ghn.log"]
+
+def test_search_by_level_and_text(small_blocks, log_file):
+    error = record(100, "ERROR", "Error processing GET /items/7")
+    with log_file.open("a") as f:
+        f.write(error)
+    searcher = LogSearch(log_file)
+
+    errors = search(searcher, level=parse_level("ERROR"))
+    assert [entry.text for entry in errors] == [error.rstrip()]
+    found = search(searcher, contains=b"/items/42 ")
+    assert [entry.path for entry in found] == ["/items/42"]
+
+def test_append_extends_index_from_last_block(small_blocks, log_file):
+    searcher = LogSearch(log_file)
+    before = index_of(searcher)
+    assert len(before.blocks) > 2
+
+    # A traceback continuing the last record, then new records
+    with log_file.open("a") as f:
+        f.write("Traceback (most recent call last):\n  ValueError: boom\n")
+        f.write(record(100, "WARNING", "Completed GET /slow - 503"))
+        f.write(record(101, "INFO", "Completed GET /late - 200"))
+    after = index_of(searcher)
+
+    # Blocks before the last one are kept; the last is rebuilt to the end
+    assert after.blocks[:len(before.blocks) - 1] == before.blocks[:-1]
+    assert after.blocks[-1].end == after.size == log_file.stat().st_size
+    rebuilt = index_of(LogSearch(log_file, index_dir=log_file.parent / "new"))
+    assert after.blocks == rebuilt.blocks
+
+    last = search(searcher, contains=b"/items/99 ")
+    assert last[0].text.endswith("ValueError: boom")
+    failed = search(searcher, statuses=[(500, 599)])
+    assert [entry.status for entry in failed] == [503]
+    late = search(searcher, path="/late")
+    assert [entry.path for entry in late] == ["/late"]
+
+def test_index_is_reused_from_sidecar(small_blocks, log_file):
+    built = index_of(LogSearch(log_file))
+    sidecars = list((log_file.parent / ".index").glob("ghn.log-*.idx"))
+    assert len(sidecars) == 1
+
+    # A new process reads the sidecar instead of scanning the file
+    assert LogSearch(log_file)._load(built.fingerprint) == built
+
+def test_partial_last_line_is_not_indexed(small_blocks, log_file):
+    complete = log_file.stat().st_size
+    with log_file.open("a") as f:
+        f.write("2025-02-08 04:59:59,000 - ghn - INFO - half a li")
+    assert index_of(LogSearch(log_file)).size == complete
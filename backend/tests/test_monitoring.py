@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.logging import get_log_context
+from app.core.monitoring import RequestMetricsMiddleware
+
+pytestmark = pytest.mark.anyio
+
+def count(labels) -> float:
+    value = REGISTRY.get_sample_value("http_request_count_total", labels)
+    return value or 0.0
+
+async def call(app, headers=(), path: str = "/items"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path,
+        "headers": list(headers), "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+    return messages
+
+async def test_request_id_added_without_touching_sender_headers():
+    shared = [(b"content-type", b"text/plain")]
+
+    async def inner(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": shared})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    app = RequestMetricsMiddleware(inner)
+    first = await call(app)
+    second = await call(app, headers=[(b"x-request-id", b"from-client")])
+
+    assert shared == [(b"content-type", b"text/plain")]
+    first_ids = [v for k, v in first[0]["headers"] if k == b"x-request-id"]
+    second_ids = [v for k, v in second[0]["headers"] if k == b"x-request-id"]
+    assert len(first_ids) == 1
+    assert second_ids == [b"from-client"]
+
+async def test_cancelled_request_is_recorded_and_context_reset():
+    async def disconnected(scope, receive, send):
+        raise asyncio.CancelledError()
+
+    labels = {"method": "GET", "endpoint": "unmatched", "status_code": "500"}
+    before = count(labels)
+    context = get_log_context()
+
+    with pytest.raises(asyncio.CancelledError):
+        await call(RequestMetricsMiddleware(disconnected), path="/gone")
+
+    assert count(labels) == before + 1
+    assert get_log_context() == context
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.core.profiling import OTHER_STACKS, WAITING, StackSampler
+
+pytestmark = pytest.mark.anyio
+
+async def profiled_request(sampler: StackSampler, route: str) -> None:
+    handle = sampler.begin()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        sampler.end(handle, route)
+
+async def test_waiting_request_is_sampled():
+    sampler = StackSampler(interval=0.002, max_stacks=100)
+    try:
+        await profiled_request(sampler, "/items")
+    finally:
+        sampler.stop()
+
+    profile = sampler.routes["/items"]
+    assert profile.requests == 1
+    assert profile.samples > 0
+    collapsed = sampler.collapsed()
+    assert collapsed.startswith("/items;")
+    assert f"profiled_request;asyncio.tasks:sleep;{WAITING}" in collapsed
+
+async def test_sampler_restarts_after_stop():
+    sampler = StackSampler(interval=0.002, max_stacks=100)
+    await profiled_request(sampler, "/first")
+    sampler.stop()
+
+    # A later application lifespan reuses the cached sampler
+    try:
+        await profiled_request(sampler, "/second")
+    finally:
+        sampler.stop()
+
+    assert sampler.routes["/second"].samples > 0
+
+async def test_stacks_over_limit_are_grouped():
+    sampler = StackSampler(interval=0.002, max_stacks=1)
+    for route_stack in ("a;b", "a;c", "a;d"):
+        handle = sampler.begin()
+        sampler._active[handle].samples[route_stack] += 1
+        sampler.end(handle, "/items")
+
+    stacks = sampler.routes["/items"].stacks
+    assert stacks == {"a;b": 1, OTHER_STACKS: 2}
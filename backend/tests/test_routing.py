@@ -0,0 +1,60 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route
+
+from app.core.profiling import ProfilingMiddleware, StackSampler
+from app.core.routing import RouteTemplates
+
+pytestmark = pytest.mark.anyio
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+async def item(request):
+    return PlainTextResponse(request.path_params["id"])
+
+def starlette_app() -> Starlette:
+    return Starlette(routes=[
+        Route("/plain", ok),
+        Mount("/api", routes=[Route("/items/{id}", item)]),
+    ])
+
+async def call(app, path: str) -> dict:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+    }
+    await app(scope, receive, send)
+    return scope
+
+async def test_plain_routes_and_mounts_have_templates():
+    app = starlette_app()
+    templates = RouteTemplates()
+
+    assert templates(await call(app, "/plain")) == "/plain"
+    assert templates(await call(app, "/api/items/7")) == "/api/items/{id}"
+    assert templates(await call(app, "/missing")) is None
+
+async def test_fastapi_routes_use_their_template(app):
+    templates = RouteTemplates()
+    scope = await call(app, "/health/check")
+    assert templates(scope) == "/health/check"
+
+async def test_profiler_labels_routes_like_the_metrics():
+    sampler = StackSampler(interval=0.002, max_stacks=100)
+    app = ProfilingMiddleware(starlette_app(), sampler, sample_rate=1.0)
+    try:
+        await call(app, "/api/items/7")
+        await call(app, "/plain")
+        await call(app, "/missing")
+    finally:
+        sampler.stop()
+
+    assert set(sampler.routes) == {"/api/items/{id}", "/plain", "unmatched"}
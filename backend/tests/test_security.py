@@ -0,0 +1,66 @@
+import time
+
+import jwt
+import pytest
+
+from app.config import Settings
+from app.core import security
+from app.core.security import SigningKeys, TokenVerifier
+from app.core.tiered_cache import InMemoryTier
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "correct-horse"
+SECRET = "shared-secret-of-at-least-32-bytes"
+
+def make_token(keys: SigningKeys, subject: str = "user@example.com") -> str:
+    payload = {"sub": subject, "exp": int(time.time()) + 600}
+    return jwt.encode(payload, keys.signing_key, algorithm=keys.algorithm)
+
+async def test_logout_revokes_token(client, user_email):
+    form = {"username": user_email, "password": PASSWORD}
+    login = await client.post("/auth/login", data=form)
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+    logout = await client.post("/auth/logout", headers=headers)
+    assert logout.status_code == 204
+    assert (await client.get("/auth/me", headers=headers)).status_code == 401
+
+async def test_revocation_reaches_other_verifiers():
+    keys = SigningKeys("HS256", SECRET)
+    store = InMemoryTier()
+    revoking = TokenVerifier(keys, revocations=store, recheck_interval=0)
+    other = TokenVerifier(keys, revocations=store, recheck_interval=0)
+    token = make_token(keys)
+
+    await other.verify(token)
+    await revoking.verify(token)
+    await revoking.revoke(token)
+
+    with pytest.raises(jwt.InvalidTokenError):
+        await revoking.verify(token)
+    # Cached claims are re-checked against the shared store
+    with pytest.raises(jwt.InvalidTokenError):
+        await other.verify(token)
+    # A verifier that never saw the token checks the store before decoding
+    fresh = TokenVerifier(keys, revocations=store)
+    with pytest.raises(jwt.InvalidTokenError):
+        await fresh.verify(token)
+
+async def test_cached_claims_are_trusted_within_recheck_interval():
+    keys = SigningKeys("HS256", SECRET)
+    store = InMemoryTier()
+    revoking = TokenVerifier(keys, revocations=store)
+    other = TokenVerifier(keys, revocations=store, recheck_interval=3600)
+    token = make_token(keys)
+
+    await other.verify(token)
+    await revoking.revoke(token)
+    assert (await other.verify(token))["sub"] == "user@example.com"
+
+def test_secret_key_required_with_several_workers(monkeypatch):
+    settings = Settings(secret_key=None, api_workers=2)
+    monkeypatch.setattr(security, "get_settings", lambda: settings)
+    with pytest.raises(RuntimeError, match="SECRET_KEY"):
+        security._build_verifier()
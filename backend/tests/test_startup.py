@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.startup import create_startup_profile
+
+@pytest.mark.parametrize("value, enabled", [
+    ("1", True),
+    ("true", True),
+    ("Yes", True),
+    ("on", True),
+    ("0", False),
+    ("false", False),
+    ("no", False),
+    ("", False),
+])
+def test_startup_profile_flag(monkeypatch, value, enabled):
+    monkeypatch.setenv("GHN_STARTUP_PROFILE", value)
+    assert create_startup_profile().enabled is enabled
+
+def test_startup_profile_off_by_default(monkeypatch):
+    monkeypatch.delenv("GHN_STARTUP_PROFILE", raising=False)
+    assert not create_startup_profile().enabled
+
+def test_enabled_profile_records_phases():
+    profile = create_startup_profile()
+    profile.enabled = True
+    with profile.phase("import.settings"):
+        pass
+    assert [name for name, _, _ in profile.phases] == ["import.settings"]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.tiered_cache import InMemoryTier, TieredCache
+
+pytestmark = pytest.mark.anyio
+
+def json_cache() -> TieredCache:
+    return TieredCache(
+        "test", InMemoryTier(),
+        serialize=lambda value: json.dumps(value).encode(),
+        deserialize=json.loads,
+    )
+
+async def test_load_racing_invalidation_is_not_cached():
+    cache = json_cache()
+    database = {"key": None}
+    loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_load():
+        value = database["key"]
+        loaded.set()
+        await release.wait()
+        return value
+
+    async def load():
+        return database["key"]
+
+    stale = asyncio.ensure_future(cache.get_or_load("key", slow_load))
+    await loaded.wait()
+    database["key"] = {"name": "written"}
+    await cache.invalidate("key")
+    fresh = asyncio.ensure_future(cache.get_or_load("key", load))
+    release.set()
+
+    # The reader that started before the write may see the old value
+    assert await stale is None
+    assert await fresh == {"name": "written"}
+    # ...but it is not cached over the new one, in either tier
+    assert await cache.get_or_load("key", load) == {"name": "written"}
+    assert await cache.remote.get("test:key") == b'{"name": "written"}'
+
+async def test_concurrent_misses_share_one_load():
+    cache = json_cache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": calls}
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("key", load) for _ in range(10))
+    )
+    assert calls == 1
+    assert results == [{"n": 1}] * 10
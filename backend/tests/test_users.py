@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from app.models.schemas import UserCreate
+from app.repositories.users import (
+    get_profile,
+    get_profile_cache,
+    get_user_repository,
+)
+
+pytestmark = pytest.mark.anyio
+
+def new_user() -> UserCreate:
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    return UserCreate(
+        email=email, full_name="Test User", password="correct-horse"
+    )
+
+async def test_create_invalidates_cached_absence(app):
+    user = new_user()
+    assert await get_profile(user.email) is None
+
+    await get_user_repository().create(user, "not-a-real-hash")
+
+    profile = await get_profile(user.email)
+    assert profile is not None and profile.email == user.email
+
+async def test_create_many_invalidates_each_created_user(app):
+    users = [new_user(), new_user()]
+    for user in users:
+        assert await get_profile(user.email) is None
+
+    pairs = [(user, "not-a-real-hash") for user in users]
+    created = await get_user_repository().create_many(pairs)
+
+    assert all(user is not None for user in created)
+    for user in users:
+        assert (await get_profile(user.email)).email == user.email
+
+async def test_update_password_invalidates_profile(app):
+    user = new_user()
+    created = await get_user_repository().create(user, "not-a-real-hash")
+    await get_profile(user.email)
+    invalidations = get_profile_cache().stats.invalidations
+
+    await get_user_repository().update_password(created.id, "another-hash")
+
+    assert get_profile_cache().stats.invalidations == invalidations + 1
@@ -20,33 +20,24 @@ export const options = {
 const BASE_URL = __ENV.API_URL || 'http://localhost:8000';
 
 export default function () {
-  // Health check
-  const healthCheck = http.get(`${BASE_URL}/health`);
+  // Health check (also reports the API version)
+  const healthCheck = http.get(`${BASE_URL}/health/check`);
   check(healthCheck, {
     'health check returns 200': (r) => r.status === 200,
-  });
-
-  // API version check
-  const versionCheck = http.get(`${BASE_URL}/version`);
-  check(versionCheck, {
-    'version check returns 200': (r) => r.status === 200,
     'version is present': (r) => r.json().version !== undefined,
   });
 
-  // Simulated auth request
-  const authPayload = JSON.stringify({
-    email: 'test@example.com',
-    password: 'testpassword',
-  });
-
-  const authCheck = http.post(`${BASE_URL}/auth/login`, authPayload, {
-    headers: { 'Content-Type': 'application/json' },
+  // Auth request; /auth/login takes an OAuth2 password form
+  const authCheck = http.post(`${BASE_URL}/auth/login`, {
+    username: __ENV.TEST_EMAIL || 'test@example.com',
+    password: __ENV.TEST_PASSWORD || 'testpassword',
+  }, {
     tags: { type: 'auth' },
   });
 
   check(authCheck, {
     'auth returns 200': (r) => r.status === 200,
-    'auth returns token': (r) => r.json().token !== undefined,
+    'auth returns token': (r) => r.json().access_token !== undefined,
   }) || errorRate.add(1);
 
   sleep(1);